@@ -240,9 +240,33 @@ class Cosmology(object):
         else:
             return (val,err,err)
     
+    __cache = None
+    @property
+    def cache(self):
+        """
+        A :class:`~astropysics.utils.gen.LRUCache` used to store results of
+        calculations that depend on the cosmological parameters (e.g.
+        :func:`astropysics.coords.funcs.cosmo_z_to_dist`). It is emptied
+        whenever this cosmology's parameters are exported to the module (e.g.
+        by :func:`choose_cosmology`, :func:`update_cosmology`, or setting a
+        parameter with autoupdate on).
+        """
+        if self.__cache is None:
+            from .utils.gen import LRUCache
+            object.__setattr__(self,'_Cosmology__cache',LRUCache(cosmology_cache_size))
+        return self.__cache
+    
+    def clearCache(self):
+        """
+        Empties this cosmology's result :attr:`cache`.
+        """
+        if self.__cache is not None:
+            self.__cache.clear()
+    
     def _exportParams(self):
         pd=dict([(p,getattr(self,p)) for p in self.params])
         globals().update(pd)
+        self.clearCache()
         
     def _removeParams(self):
         from warnings import warn
@@ -511,6 +535,9 @@ class WMAP3AllCosmology(FRWCosmology):
     omegaM_err = property(lambda self:self.omegaB_err+self.omegaC_err)
 
 
+#maximum number of items in each Cosmology's result cache
+cosmology_cache_size = 256 
+
 __current_cosmology=WMAP7BAOH0Cosmology() #default value
 __current_cosmology._exportParams()
 __cosmo_registry={}
@@ -532,6 +559,9 @@ def register_cosmology(cosmocls,name=None):
         raise TypeError("Supplied object to register is not a class")
     
     __cosmo_registry[name]=cosmocls
+    #a class may be re-registered under an existing name, so clear the results
+    #that were cached for the current cosmology
+    __current_cosmology.clearCache()
     
 #register all Cosmologies in this module
 for o in locals().values():
@@ -600,6 +630,16 @@ def get_cosmology(name=None):
     else:
         return __cosmo_registry[name]
     
+def get_cosmology_cache():
+    """
+    Retrieves the result cache for the currently in use Cosmology (see
+    :attr:`Cosmology.cache`). The maximum number of items in a new cache is set
+    by the module variable `cosmology_cache_size`.
+    
+    :returns: A :class:`~astropysics.utils.gen.LRUCache` object.
+    """
+    return __current_cosmology.cache
+    
 def update_cosmology():
     """
     updates the package-level variables for changes in the current Cosmology 
@@ -705,23 +705,33 @@ class _CoosysMeta(ABCMeta):
                 for vfc,vtc in zip(v.fromclasses,v.toclasses):
                     fromclass = cls if vfc == 'self' else vfc
                     toclass = cls if vtc == 'self' else vtc
-                    CoordinateSystem.registerTransform(fromclass,toclass,v.f,v.transtype)
+                    CoordinateSystem.registerTransform(fromclass,toclass,v.f,v.transtype,depends=v.depends)
                 setattr(cls,k,staticmethod(v.f))
                 
+    def __setattr__(cls,name,value):
+        ABCMeta.__setattr__(cls,name,value)
+        #class-level settings that the transforms use invalidate cached matricies
+        if name in getattr(cls,'_transformparams_',()):
+            CoordinateSystem._invalidateTransformCache()
+                
 class _TransformerMethodDeco(object):
     """
     A class representing methods used for registering transforms  for the class
     the are in.
     """
-    def __init__(self,f,fromclass,toclass,transtype=None):
+    def __init__(self,f,fromclass,toclass,transtype=None,depends=None):
         self.f = f
         self.fromclasses = [fromclass]
         self.toclasses = [toclass]
         self.transtype = transtype
+        self.depends = depends
+
 
+#Default for optmizing convert functions
+_convertoptimizedefault = True
 
-#Default for optmizing convert functions - currently false because it's not smart enough
-_convertoptimizedefault = False
+#: Maximum number of composed transformation matricies to cache
+smatrix_cache_size = 256
 
 class CoordinateSystem(object):
     """
@@ -745,6 +755,10 @@ class CoordinateSystem(object):
       Note that *smaller* weights are preferred paths (e.g. a larger weight is
       less likely to be visited).  See 
       :meth:`CoordinateSystem.getTransformGraph` for more details.
+      
+    * The :attr:`_transformparams_` class variable can be set to a sequence of
+      the names of class attributes that the registered transforms depend on.
+      Setting any of these attributes will clear the cached transforms.
     
     """
     from collections import defaultdict as _defaultdict
@@ -762,7 +776,7 @@ class CoordinateSystem(object):
     
     @staticmethod
     def registerTransform(fromclass,toclass,func=None,transtype=None,
-                          overwrite=True):
+                          overwrite=True,depends=None):
         """
         Register a function to transform coordinates from one system to another.
         
@@ -796,6 +810,16 @@ class CoordinateSystem(object):
             If True, any already existing function will be silently overriden.
             Otherwise, a ValueError is raised.
         :type overwrite: boolean
+        :param depends: 
+            Declares what the output of `func` depends on, which determines
+            whether it can be composed with other transforms and cached (see
+            :meth:`LatLongCoordinates.convert`). Can be 'constant' if `func`
+            always returns the same result, 'epoch' if the result depends only
+            on the epoch of the input coordinates (and class attributes listed
+            in the :attr:`_transformparams_` attribute of the coordinate
+            classes), or None if it may depend on the coordinate values
+            themselves.
+        :type depends: string or None
         
         **Examples**::
         
@@ -830,7 +854,7 @@ class CoordinateSystem(object):
                     f.fromclasses.append(fromclass)
                     f.toclasses.append(toclass)
                 elif callable(f):
-                    return _TransformerMethodDeco(f,fromclass,toclass,transtype)
+                    return _TransformerMethodDeco(f,fromclass,toclass,transtype,depends)
                 else:
                     raise TypeError('Tried to apply registerTransform to a non-callable')
                 
@@ -840,6 +864,8 @@ class CoordinateSystem(object):
             if not issubclass(fromclass,CoordinateSystem) or not issubclass(toclass,CoordinateSystem):
                raise TypeError('to/from classes for registerTransform must be CoordinateSystems')
            
+            if depends not in (None,'constant','epoch'):
+                raise ValueError('invalid transform dependence %s'%depends)
             if not overwrite and (toclass in CoordinateSystem._converters[fromclass]):
                 #format requires 2.6
                 #raise ValueError('function already exists to convert {0} to {1}'.format(fromclass,toclass))
@@ -854,9 +880,11 @@ class CoordinateSystem(object):
                 lfunc = lambda cobj:ttf(func(cobj),cobj,toclass)
                 lfunc.basetrans = func
                 lfunc.transtype = transtype
+                lfunc.depends = depends
                 CoordinateSystem._converters[fromclass][toclass] = lfunc
             else:
                 func.transtype = None
+                func.depends = depends
                 CoordinateSystem._converters[fromclass][toclass] = func
         
         CoordinateSystem._invalidateTransformCache()
@@ -960,7 +988,9 @@ class CoordinateSystem(object):
                             coof = lambda cobj:func(btfunc(cobj),cobj,k2)
                             coof.transtype = typename
                             coof.basetrans = btfunc
+                            coof.depends = getattr(v2,'depends',None)
                             CoordinateSystem._converters[k][k2] = coof
+                CoordinateSystem._invalidateTransformCache()
             CoordinateSystem._transtypes[typename] = func
             return func
             
@@ -979,7 +1009,8 @@ class CoordinateSystem(object):
     def getTransformPath(fromsys,tosys):
         """
         Determines the transformation path from one coordinate system to another
-        for use with :meth:`convert`.
+        for use with :meth:`convert`.  The path is looked up from the plans
+        memoized by :meth:`getTransformPlan` .
         
         :param fromsys: The starting coordinate system class
         :param tosys: The target coordinate system class
@@ -991,26 +1022,99 @@ class CoordinateSystem(object):
         
         :except NotImplementedError: If no path can be found.
         """
+        path,convs = CoordinateSystem.getTransformPlan(fromsys,tosys)
+        if len(convs) == 1:
+            return convs[0]
+        else:
+            return list(path)
+        
+    _transformplans = {}
+    _transformplanstats = {'hits':0,'misses':0,'invalidations':0}
+    @staticmethod
+    def getTransformPlan(fromsys,tosys):
+        """
+        Compiles the transformation from one coordinate system to another into
+        the sequence of registered converter functions that must be applied.
+        
+        The plan is memoized for each (`fromsys`,`tosys`) pair so that the
+        transformation graph only needs to be searched the first time a
+        particular conversion is requested.  The memoized plans are discarded
+        whenever the registered transforms change (e.g. through
+        :meth:`registerTransform` or :meth:`delTransform`). See
+        :meth:`getTransformPlanStats` for the cache statistics.
+        
+        :param fromsys: The starting coordinate system class
+        :param tosys: The target coordinate system class
+        :returns: 
+            A 2-tuple (path,converters) where `path` is a tuple of the
+            coordinate classes along the path (*including* `fromsys` and
+            `tosys`), and `converters` is a tuple of the converter functions to
+            apply in order (one less than the length of `path`).
+        
+        :except NotImplementedError: If no path can be found.
+        """
+        key = (fromsys,tosys)
+        stats = CoordinateSystem._transformplanstats
+        try:
+            plan = CoordinateSystem._transformplans[key]
+            stats['hits'] += 1
+            return plan
+        except KeyError:
+            stats['misses'] += 1
+        
         if tosys in CoordinateSystem._converters[fromsys]:
-            return CoordinateSystem._converters[fromsys][tosys]
+            path = (fromsys,tosys)
         else:
-            failstr = 'cannot convert coordinate system %s to %s'%(fromsys.__name__,tosys.__name__)
+            path = tuple(CoordinateSystem._findTransformPath(fromsys,tosys))
+        convs = tuple([CoordinateSystem._converters[c1][c2] for c1,c2 in zip(path[:-1],path[1:])])
+        
+        plan = CoordinateSystem._transformplans[key] = (path,convs)
+        return plan
+    
+    @staticmethod
+    def getTransformPlanStats():
+        """
+        Returns statistics for the transform plan cache used by
+        :meth:`getTransformPlan` .
+        
+        :returns: 
+            A dictionary with keys 'hits' and 'misses' (the number of plan
+            lookups that were/were not already compiled), 'invalidations' (the
+            number of times the cache has been cleared due to changes in the
+            registered transforms), and 'size' (the number of plans currently
+            cached).
+        """
+        stats = dict(CoordinateSystem._transformplanstats)
+        stats['size'] = len(CoordinateSystem._transformplans)
+        return stats
+    
+    @staticmethod
+    def _findTransformPath(fromsys,tosys):
+        """
+        Searches the transformation graph for the shortest path between two
+        coordinate systems.
+        """
+        failstr = 'cannot convert coordinate system %s to %s'%(fromsys.__name__,tosys.__name__)
+        try:
+            import networkx as nx
+            
+            CoordinateSystem.getTransformGraph() #makes sure the graph is built
+            g = CoordinateSystem._transgraph
             try:
-                import networkx as nx
-                
-                g = CoordinateSystem.getTransformGraph()
                 if nx.__version__>'1.4':
                     path = nx.shortest_path(g,fromsys,tosys,weight=True)
                 else:
                     path = nx.shortest_path(g,fromsys,tosys,weighted=True)
-                if not path:
-                    raise NotImplementedError(failstr+'; no transform path could be found')
-                return path
-            except ImportError,e:
-                if e.args[0] == 'No module named networkx':
-                    raise NotImplementedError(failstr+'; networkx not installed')
-                else:
-                    raise
+            except (nx.NetworkXException,KeyError):
+                path = None
+            if not path:
+                raise NotImplementedError(failstr+'; no transform path could be found')
+            return path
+        except ImportError,e:
+            if e.args[0] == 'No module named networkx':
+                raise NotImplementedError(failstr+'; networkx not installed')
+            else:
+                raise
         
     _transgraph = None
     @staticmethod
@@ -1048,6 +1152,8 @@ class CoordinateSystem(object):
         from collections import defaultdict
         CoordinateSystem._transformcache = defaultdict(dict)
         CoordinateSystem._transgraph = None
+        CoordinateSystem._transformplans.clear()
+        CoordinateSystem._transformplanstats['invalidations'] += 1
 
     def convert(self,tosys):
         """
@@ -1062,17 +1168,12 @@ class CoordinateSystem(object):
         :except: raises :exc:`NotImplementedError` if conversion is not present
         """
         
-        convpath = CoordinateSystem.getTransformPath(self.__class__,tosys)
+        convpath,convfuncs = CoordinateSystem.getTransformPlan(self.__class__,tosys)
         
-        if callable(convpath):
-            return convpath(self)
-        else:
-            currobj = self
-            currsys = self.__class__
-            for intersys in convpath[1:-1]:
-                currobj = CoordinateSystem._converters[currsys][intersys](currobj)
-                currsys = intersys
-            return CoordinateSystem._converters[currsys][tosys](currobj)
+        currobj = self
+        for cfunc in convfuncs:
+            currobj = cfunc(currobj)
+        return currobj
 
 class EpochalCoordinates(CoordinateSystem):
     """
@@ -1269,6 +1370,12 @@ class LatLongCoordinates(CoordinateSystem):
         def transform(incoord):
             ... compute the elements of a 3x3 transformation matrix...
             return np.mat([[a,b,c],[d,e,f],[g,h,i]])
+    
+    If the matrix is the same for all coordinates, or depends only on the
+    epoch, this should be declared by passing ``depends='constant'`` or
+    ``depends='epoch'`` to :meth:`CoordinateSystem.registerTransform`. This
+    allows :meth:`convert` to multiply consecutive transformation matricies
+    together and cache the result.
         
     *Subclassing*
     
@@ -1495,9 +1602,12 @@ class LatLongCoordinates(CoordinateSystem):
     def _smatrix(m,coord,tocls):
         newcoord = tocls()
         newcoord.lat = coord._lat
-        newcoord.laterr = coord._laterr
         newcoord.long = coord._long
-        newcoord.longerr = coord._longerr
+        #errors are copied because matrixRotate updates them in-place
+        if coord._laterr is not None:
+            newcoord.laterr = coord._laterr.degrees
+        if coord._longerr is not None:
+            newcoord.longerr = coord._longerr.degrees
         newcoord.matrixRotate(m)
         return newcoord
         
@@ -1563,25 +1673,11 @@ class LatLongCoordinates(CoordinateSystem):
         #propogate errors if they are present
         
         if laterr != 0 or longerr != 0:
-            #TODO: check formulae
-            #all of these are first order taylor expansions about the value
-            dx = sqrt((laterr*sb*cl)**2+(longerr*cb*sl)**2)
-            dy = sqrt((laterr*sb*sl)**2+(longerr*cb*cl)**2)
-            dz = abs(laterr*cb)
-            
-            dv = np.matrix((dx,dy,dz))
-            dxp,dyp,dzp = np.sqrt(np.power(m,2)*np.power(dv,2))
-            
-            #intermediate variables for dlatp - each of the partial derivatives
-            chi = 1/(1+(zp/sp)**2) 
-            #common factor chi not included below
-            dbdx = x*z*sp**-3
-            dbdy = y*z*sp**-3
-            dbdz = 1/sp
-            
-            dlatp = chi*sqrt((dxp*dbdx)**2 + (dyp*dbdy)**2 + (dzp*dbdz)**2)
-            dlongp = sqrt((dxp*yp*xp**-2)**2 + (dyp/xp)**2)/(1 + (yp/xp)**2) #indep of z
-            
+            latp,longp,dlatp,dlongp = matrix_rotate_arrays(m,lat,long,laterr,
+                                                           longerr,fixrange)
+            latp,longp = float(latp),float(longp)
+            dlatp,dlongp = float(dlatp),float(dlongp)
+            fixrange = False #already done
         else:
             laterr = None
             
@@ -1594,8 +1690,8 @@ class LatLongCoordinates(CoordinateSystem):
             self.lat.radians = latp
             self.long.radians = longp
             if laterr is not None:
-                self.laterr.radians = dlatp
-                self.longerr.radians = dlongp
+                self.laterr = AngularSeparation(np.degrees(dlatp))
+                self.longerr = AngularSeparation(np.degrees(dlongp))
         
         if laterr is None:
             return latp,longp
@@ -1608,23 +1704,22 @@ class LatLongCoordinates(CoordinateSystem):
         :class:`CoordinateSystem` object possibly with optimizations for
         matrix-based transformation of :class:`LatLongCoordinates` objects.
         
-        .. warning::
-            The transformation optimizations used if `optimize` is True are only
-            correct if the conversion matricies are independent of the
-            coordinate values themselves (e.g. are linear and
-            epoch-independent). Examples that are good for optimization include
-            FK4->FK5->ICRS (all are epoch-independent).
-            
-            In the future, this system will be smarter about
-            knowing when it is safe to optimize, but for now, only use it if
-            you're sure it will work correctly.
+        If `optimize` is True, consecutive 'smatrix' transforms that were
+        registered as independent of the coordinate values (using the `depends`
+        argument of :meth:`CoordinateSystem.registerTransform`) are multiplied
+        together into a single matrix. The composed matricies are cached for
+        each combination of coordinate systems and (if necessary) epoch, so
+        e.g. repeated FK4->FK5->ICRS->Galactic conversions are done as a single
+        cached rotation. Transforms that may depend on the coordinate values
+        are always applied one at a time.
         
         :param tosys: 
             The new coordinate system class. Should be a subclass of
             :class:`CoordinateSystem` .
         :param bool optimize: 
-            If True, speed up the transformation by composing matricies where
-            possible. If False, the standard transformation is performed.
+            If True, speed up the transformation by composing and caching
+            matricies where possible. If False, the standard transformation is
+            performed.
         :returns: A new object of a class determined by `tosys`
         
         
@@ -1634,66 +1729,74 @@ class LatLongCoordinates(CoordinateSystem):
             return self
         
         if optimize:
-            cache = CoordinateSystem._transformcache['smatrix']
-            
-            #add this object to the cache if its missing
-            if self.__class__ not in cache:
-                cache[self.__class__] = {}
-                
-            if tosys not in cache[self.__class__]:
-                convs = CoordinateSystem.getTransformPath(self.__class__,tosys)
-                
-                if callable(convs): #direct transform
-                    convs = [convs]
-                else:
-                    convclasses = convs
-                    convfuncs = [CoordinateSystem._converters[c1][c2] for c1,c2 in zip(convclasses[:-1],convclasses[1:])]
-                    convs = []
-                    
-                    #now we populate convs with converter functions that are 
-                    #either multplied-together matricies if they are smatrix
-                    #converters or the actual converter function otherwise
-                    combinedmatrix = None
-                    lastcls = None
-                    for cls,cfunc in zip(convclasses[:-1],convfuncs):
-                        #note that cls here is the *previous* conversion's end 
-                        #class/current conversion's start class...
-                        if cfunc.transtype=='smatrix':
-                            mt = cfunc.basetrans(self)
-                            
-                            if hasattr(mt,'nocache') and mt.nocache:
-                                cache = None
-                            
-                            if combinedmatrix is None:
-                                combinedmatrix = mt
-                            else:
-                                combinedmatrix = mt * combinedmatrix
-                        else:
-                            if combinedmatrix is None:
-                                convs.append(cfunc)
-                            else:
-                                convs.append(_OptimizerSmatrixer(combinedmatrix,cls))
-                                convs.append(cfunc)
-                                
-                    if combinedmatrix is not None:
-                        convs.append(_OptimizerSmatrixer(combinedmatrix,convclasses[-1]))
-                
-                #now cache this transform for future use unless it was banned above
-                if cache is not None:
-                    cache[self.__class__][tosys] = convs
-                
-            else:
-                convs = cache[self.__class__][tosys]
-            
-            #now actually do the transforms
             coord = self
-            for conv in convs:
+            for conv in self._getOptimizedConverters(tosys):
                 coord = conv(coord)
             return coord
-        
         else:
             return CoordinateSystem.convert(self,tosys)
         
+    def _getOptimizedConverters(self,tosys):
+        """
+        Returns the list of converters used by :meth:`convert` if `optimize` is
+        True. The matricies are computed the same way as for a stepwise
+        conversion: only the first transform sees the epoch of this object, as
+        the intermediate objects created by 'smatrix' transforms have the
+        default epoch for their class.
+        """
+        convclasses,convfuncs = CoordinateSystem.getTransformPlan(self.__class__,tosys)
+        
+        epochdep = len(convfuncs)>0 and convfuncs[0].transtype=='smatrix' and \
+                   getattr(convfuncs[0],'depends',None) == 'epoch'
+        key = (self.__class__,tosys,getattr(self,'_epoch',None) if epochdep else None)
+        
+        cache = CoordinateSystem._transformcache.get('smatrix',None)
+        if cache is None:
+            from ..utils.gen import LRUCache
+            cache = CoordinateSystem._transformcache['smatrix'] = LRUCache(smatrix_cache_size)
+        try:
+            return cache[key]
+        except KeyError:
+            pass
+        
+        #now we populate convs with converter functions that are either
+        #multplied-together matricies if they are smatrix converters or the
+        #actual converter function otherwise
+        convs = []
+        combinedmatrix = None
+        cacheable = True
+        proxy = self #object that a stepwise conversion would pass to cfunc
+        for cls,tocls,cfunc in zip(convclasses[:-1],convclasses[1:],convfuncs):
+            #note that cls here is the *previous* conversion's end class/current
+            #conversion's start class...
+            depends = getattr(cfunc,'depends',None)
+            if cfunc.transtype=='smatrix' and proxy is None and depends == 'constant':
+                proxy = cls()
+            
+            if cfunc.transtype=='smatrix' and proxy is not None and depends is not None:
+                mt = cfunc.basetrans(proxy)
+                if getattr(mt,'nocache',False):
+                    cacheable = False
+                if combinedmatrix is None:
+                    combinedmatrix = mt
+                else:
+                    combinedmatrix = mt * combinedmatrix
+            else:
+                if combinedmatrix is not None:
+                    convs.append(_OptimizerSmatrixer(combinedmatrix,cls))
+                    combinedmatrix = None
+                convs.append(cfunc)
+                
+            proxy = tocls() if cfunc.transtype=='smatrix' else None
+                    
+        if combinedmatrix is not None:
+            convs.append(_OptimizerSmatrixer(combinedmatrix,convclasses[-1]))
+        
+        #now cache this transform for future use unless it was banned above
+        if cacheable:
+            cache[key] = convs
+        return convs
+        
 class _OptimizerSmatrixer(object):
     """
     Used internally to do the optimization of :meth`LatLongCoordinates.convert`
@@ -2032,7 +2135,8 @@ class GCRSCoordinates(EquatorialCoordinatesBase):
     origin at the earth geocenter.
         
     .. warning:: 
-        Abberation of starlight not yet included in transforms.
+        Abberation of starlight not yet included in transforms. It is included
+        by :func:`convert_time_series`.
         
     """
     
@@ -2248,23 +2352,218 @@ class RectangularGCRSCoordinates(RectangularCoordinates,EpochalCoordinates):
             return RectangularGCRSCoordinates(xp,yp,zp,epoch,unit=unit)
     
     
+#<-------------------Epoch caches for precession/nutation--------------------->
+
+#: Epochs are rounded to a multiple of this many years before computing (and
+#: caching) precession, nutation, and CIO locator values. 0 means the values
+#: are only re-used for exactly the same epoch. Set with :func:`set_epoch_cache`
+epoch_cache_tolerance = 0
+#: Maximum number of epochs for which to cache each precession/nutation quantity
+epoch_cache_size = 64
+_epoch_caches = {}
+
+def set_epoch_cache(tolerance=None,maxsize=None):
+    """
+    Sets the parameters of the caches used for precession matricies, nutation
+    matricies, and CIO locator terms. Conversions to equinox-of-date or
+    intermediate (CIRS) frames at an epoch already in the cache require only a
+    matrix multiplication. All caches are cleared when this is called.
+    
+    :param tolerance: 
+        The epoch quantization in years - epochs are rounded to the nearest
+        multiple of `tolerance` before computing and caching, so epochs closer
+        than this share the same matricies. If 0, only identical epochs are
+        re-used. If None, the tolerance is unchanged.
+    :type tolerance: float or None
+    :param maxsize: 
+        The maximum number of epochs to cache for each quantity, or None to
+        leave unchanged.
+    :type maxsize: int or None
+    
+    :except ValueError: If `tolerance` is negative.
+    
+    **Examples**
+    
+    To share matricies for epochs within ~30 seconds of each other (an error
+    well below that of the IAU 2000B nutation model)::
+    
+        set_epoch_cache(tolerance=1e-6)
+    
+    """
+    global epoch_cache_tolerance,epoch_cache_size
+    
+    if tolerance is not None:
+        if tolerance < 0:
+            raise ValueError('epoch cache tolerance cannot be negative')
+        epoch_cache_tolerance = tolerance
+    if maxsize is not None:
+        epoch_cache_size = int(maxsize)
+    _epoch_caches.clear()
+    #composed transform matricies were computed with the old values
+    CoordinateSystem._invalidateTransformCache()
+    
+def get_epoch_cache(name):
+    """
+    Returns the cache for the precession/nutation quantity `name`.
+    
+    :param str name: 
+        The name of the cached function - one of
+        '_precession_matrix_J2000_Capitaine', '_nutation_matrix',
+        '_CIOLocator', or '_CMatrix'.
+    
+    :returns: 
+        A :class:`~astropysics.utils.gen.LRUCache` mapping quantized epochs to
+        cached values (including :attr:`hits` and :attr:`misses` statistics).
+    """
+    from ..utils.gen import LRUCache
+    
+    cache = _epoch_caches.get(name,None)
+    if cache is None:
+        cache = _epoch_caches[name] = LRUCache(epoch_cache_size)
+    return cache
+
+def _epoch_cached(func):
+    """
+    Decorator that caches the output of a function of epoch in the epoch cache
+    for that function, with the epoch quantized by
+    :data:`epoch_cache_tolerance`. An epoch of None or an array of epochs is
+    passed through uncached.
+    """
+    name = func.__name__
+    def cached(epoch):
+        if epoch is None or np.ndim(epoch) > 0:
+            return func(epoch)
+        
+        tol = epoch_cache_tolerance
+        if tol:
+            key = int(round(epoch/tol))
+            epoch = key*tol
+        else:
+            key = epoch = float(epoch)
+        
+        cache = get_epoch_cache(name)
+        try:
+            return cache[key]
+        except KeyError:
+            res = func(epoch)
+            if isinstance(res,np.ndarray):
+                #the same object is returned to all callers
+                res.flags.writeable = False
+            cache[key] = res
+            return res
+    cached.__name__ = name
+    cached.__doc__ = func.__doc__
+    return cached
+    
+    
+#: Maximum memory in bytes for the (terms x times) intermediate arrays used when
+#: evaluating nutation and CIO locator series for arrays of times
+nutation_series_maxmem = 2**25
+
+def _rotation_matrices(angles,axis):
+    """
+    Generates a stack of rotation matricies with the same convention as
+    :func:`astropysics.utils.alg.rotation_matrix` for an array of `angles` in
+    radians about 'x','y', or 'z'.
+    
+    :returns: An (N,3,3) array
+    """
+    angles = np.asarray(angles,dtype=float).ravel()
+    s = np.sin(angles)
+    c = np.cos(angles)
+    m = np.zeros((angles.size,3,3))
+    i,j = {'x':(1,2),'y':(2,0),'z':(0,1)}[axis]
+    k = 3-i-j
+    m[:,k,k] = 1
+    m[:,i,i] = m[:,j,j] = c
+    m[:,i,j] = s
+    m[:,j,i] = -s
+    return m
+
+def _matrix_stack_product(*ms):
+    """
+    Multiplies together (N,3,3) stacks of matricies (or single 3x3 matricies)
+    from left to right.
+    """
+    res = np.asarray(ms[0])
+    for m in ms[1:]:
+        m = np.asarray(m)
+        res = np.einsum('...ij,...jk->...ik',res,m)
+    return res
+
+def _series_chunks(nterms,ntimes,maxmem=None):
+    """
+    Yields slices of the time axis such that the (terms x times) arrays used
+    for evaluating a series (the arguments and their sines and cosines) fit in
+    `maxmem` bytes.
+    """
+    if maxmem is None:
+        maxmem = nutation_series_maxmem
+    step = max(1,int(maxmem//(3*8*max(nterms,1))))
+    for i in range(0,ntimes,step):
+        yield slice(i,min(i+step,ntimes))
+
+def _trig_series(mults,fundargs,sincoeffs,coscoeffs,maxmem=None):
+    """
+    Evaluates the series sum(sincoeffs*sin(arg) + coscoeffs*cos(arg)), where
+    arg = mults . fundargs , for an array of times. The times are processed in
+    chunks so that the intermediate (terms x times) arrays fit in `maxmem`
+    bytes.
+    
+    :param mults: (nterms,nargs) multipliers of the fundamental arguments
+    :param fundargs: (nargs,ntimes) fundamental arguments in radians
+    :param sincoeffs: (nseries,nterms) coefficients of the sine terms
+    :param coscoeffs: (nseries,nterms) coefficients of the cosine terms
+    :param maxmem: memory limit in bytes or None for :data:`nutation_series_maxmem`
+    
+    :returns: (nseries,ntimes) array of the series sums
+    """
+    mults = np.asarray(mults,dtype=float)
+    fundargs = np.asarray(fundargs,dtype=float)
+    sincoeffs = np.atleast_2d(sincoeffs)
+    coscoeffs = np.atleast_2d(coscoeffs)
+    ntimes = fundargs.shape[1]
+    
+    res = np.empty((sincoeffs.shape[0],ntimes))
+    for sl in _series_chunks(mults.shape[0],ntimes,maxmem):
+        arg = np.dot(mults,fundargs[:,sl])
+        res[:,sl] = np.dot(sincoeffs,np.sin(arg)) + np.dot(coscoeffs,np.cos(arg))
+    return res
+
+def _precession_angles_Capitaine(epoch):
+    """
+    The precession angles zeta,z,theta in degrees from Capitaine et al. 2003
+    as written in the USNO Circular 179 for a Julian epoch or array of epochs.
+    """
+    T = (np.asarray(epoch,dtype=float)-2000.0)/100.0
+    #from USNO circular
+    pzeta = (-0.0000003173,-0.000005971,0.01801828,0.2988499,2306.083227,2.650545)
+    pz = (-0.0000002904,-0.000028596,0.01826837,1.0927348,2306.077181,-2.650545)
+    ptheta = (-0.0000001274,-0.000007089,-0.04182264,-0.4294934,2004.191903,0)
+    zeta = np.polyval(pzeta,T)/3600.0
+    z = np.polyval(pz,T)/3600.0
+    theta = np.polyval(ptheta,T)/3600.0
+    return zeta,z,theta
+
+@_epoch_cached
 def _precession_matrix_J2000_Capitaine(epoch):
         """
         Computes the precession matrix from J2000 to the given Julian Epoch.
         Expression from from Capitaine et al. 2003 as written in the USNO
         Circular 179.  This should match the IAU 2006 standard from SOFA 
         (although this has not yet been tested)
+        
+        If `epoch` is an array, an (N,3,3) array of matricies is returned.
         """
         from ..utils import rotation_matrix
         
-        T = (epoch-2000.0)/100.0
-        #from USNO circular
-        pzeta = (-0.0000003173,-0.000005971,0.01801828,0.2988499,2306.083227,2.650545)
-        pz = (-0.0000002904,-0.000028596,0.01826837,1.0927348,2306.077181,-2.650545)
-        ptheta = (-0.0000001274,-0.000007089,-0.04182264,-0.4294934,2004.191903,0)
-        zeta = np.polyval(pzeta,T)/3600.0
-        z = np.polyval(pz,T)/3600.0
-        theta = np.polyval(ptheta,T)/3600.0
+        zeta,z,theta = _precession_angles_Capitaine(epoch)
+        
+        if np.ndim(epoch) > 0:
+            zeta,z,theta = np.radians(zeta),np.radians(z),np.radians(theta)
+            return _matrix_stack_product(_rotation_matrices(-z,'z'),
+                                         _rotation_matrices(theta,'y'),
+                                         _rotation_matrices(-zeta,'z'))
         
         return rotation_matrix(-z,'z') *\
                rotation_matrix(theta,'y') *\
@@ -2277,7 +2576,7 @@ def _load_nutation_data(datafn,seriestype):
     
     Seriestype can be 'lunisolar' or 'planetary'
     """
-    from ..utils.io import get_package_data
+    from ..utils.io import get_package_data_arrays
     
     if seriestype == 'lunisolar':
         dtypes = [('nl',int),
@@ -2312,49 +2611,140 @@ def _load_nutation_data(datafn,seriestype):
     else:
         raise ValueError('requested invalid nutation series type')
     
-    lines = [l for l in get_package_data(datafn).split('\n') if not l.startswith('#') if not l.strip()=='']
+    def parser(content):
+        lines = [l for l in content.split('\n') if not l.startswith('#') if not l.strip()=='']
+        
+        lists = [[] for n in dtypes]
+        for l in lines:
+            for i,e in enumerate(l.split(' ')):
+                lists[i].append(dtypes[i][1](e))
+        return {'data':np.rec.fromarrays(lists,names=[e[0] for e in dtypes])}
     
-    lists = [[] for n in dtypes]
-    for l in lines:
-        for i,e in enumerate(l.split(' ')):
-            lists[i].append(dtypes[i][1](e))
-    return np.rec.fromarrays(lists,names=[e[0] for e in dtypes])
+    return get_package_data_arrays(datafn,parser)['data'].view(np.recarray)
 
-_nut_data_00a_ls = _load_nutation_data('iau00a_nutation_ls.tab','lunisolar')
-_nut_data_00a_pl = _load_nutation_data('iau00a_nutation_pl.tab','planetary')
-def _nutation_components20062000A(epoch):
+_nutation_data = {}
+_nutation_data_files = {'00a_ls':('iau00a_nutation_ls.tab','lunisolar'),
+                        '00a_pl':('iau00a_nutation_pl.tab','planetary'),
+                        '00b':('iau00b_nutation.tab','lunisolar')}
+def _get_nutation_data(name):
+    """
+    Returns the nutation series `name` ('00a_ls', '00a_pl', or '00b'), loading
+    it on first use.
+    """
+    try:
+        return _nutation_data[name]
+    except KeyError:
+        dat = _nutation_data[name] = _load_nutation_data(*_nutation_data_files[name])
+        return dat
+    
+def _nutation_times(intime,asepoch):
     """
-    :returns: eps,dpsi,deps in radians
+    Converts scalar or array input times for the nutation functions to a 1D
+    array of JDs and a function to give outputs the same shape as the input.
     """
     from ..obstools import epoch_to_jd
+    
+    jd = epoch_to_jd(intime) if asepoch else intime
+    jd = np.asarray(jd,dtype=float)
+    shape = jd.shape
+    if shape == ():
+        outshape = lambda a:a[0]
+    else:
+        outshape = lambda a:a.reshape(shape)
+    return jd.ravel(),outshape
+
+def _nutation_components20062000A(intime,asepoch=True,maxmem=None):
+    """
+    Computes the nutation components for the IAU 2000A nutation model with the
+    IAU 2006 precession corrections, following the SOFA nut06a routine.
+    
+    :param intime: time(s) to compute the nutation components as a JD or epoch
+    :type intime: scalar or array-like
+    :param asepoch: if True, `intime` is interpreted as an epoch, otherwise JD
+    :type asepoch: bool
+    :param maxmem: 
+        memory limit for the series evaluation, or None to use
+        :data:`nutation_series_maxmem`
+    
+    :returns: eps,dpsi,deps in radians (arrays if `intime` is an array)
+    """
+    from ..constants import asecperrad
+    from ..obstools import jd2000
     from .funcs import obliquity
+    from .ephems import _mean_anomaly_of_moon,_mean_anomaly_of_sun,\
+                        _mean_long_of_moon_minus_ascnode,_long_earth,\
+                        _mean_elongation_of_moon_from_sun,_long_venus,\
+                        _mean_long_asc_node_moon,_long_prec
     
-    epsa = obliquity(epoch_to_jd(epoch),2006)
+    jd,outshape = _nutation_times(intime,asepoch)
+    epsa = np.radians(obliquity(jd,2006))
+    t = (jd-jd2000)/36525
     
-    raise NotImplementedError('2006/2000A nutation model not implemented')
-
-    return epsa,dpsi,deps
+    #lunisolar series with the IERS 2003 fundamental arguments
+    fundargs = (_mean_anomaly_of_moon(t),_mean_anomaly_of_sun(t),
+                _mean_long_of_moon_minus_ascnode(t),
+                _mean_elongation_of_moon_from_sun(t),
+                _mean_long_asc_node_moon(t))
+    dat = _get_nutation_data('00a_ls')
+    mults = (dat.nl,dat.nlp,dat.nF,dat.nD,dat.nOm)
+    zeros = np.zeros(len(dat))
+    psi0,psit,eps0,epst = _trig_series(np.transpose(mults),fundargs,
+                                       (dat.ps,dat.pst,dat.es,zeros),
+                                       (dat.pc,zeros,dat.ec,dat.ect),maxmem)
+    dpsils = psi0 + psit*t
+    depsls = eps0 + epst*t
+    
+    #planetary series - the Delaunay arguments and Neptune longitude here are
+    #the MHB2000 versions, the rest are IERS 2003
+    fundargs = (np.fmod(2.35555598 + 8328.6914269554*t,_twopi),
+                np.fmod(1.627905234 + 8433.466158131*t,_twopi),
+                np.fmod(5.198466741 + 7771.3771468121*t,_twopi),
+                np.fmod(2.18243920 - 33.757045*t,_twopi),
+                np.fmod(4.402608842 + 2608.7903141574*t,_twopi), #Mercury
+                _long_venus(t),
+                _long_earth(t),
+                np.fmod(6.203480913 + 334.0612426700*t,_twopi), #Mars
+                np.fmod(0.599546497 + 52.9690962641*t,_twopi), #Jupiter
+                np.fmod(0.874016757 + 21.3299104960*t,_twopi), #Saturn
+                np.fmod(5.481293872 + 7.4781598567*t,_twopi), #Uranus
+                np.fmod(5.321159000 + 3.8127774000*t,_twopi), #Neptune
+                _long_prec(t))
+    dat = _get_nutation_data('00a_pl')
+    mults = (dat.nl,dat.nF,dat.nD,dat.nOm,dat.nme,dat.nve,dat.nea,dat.nma,
+             dat.nju,dat.nsa,dat.nur,dat.nne,dat.npa)
+    dpsipl,depspl = _trig_series(np.transpose(mults),fundargs,(dat.sp,dat.se),
+                                 (dat.cp,dat.ce),maxmem)
+    
+    p1uasecperrad = asecperrad*1e7 #0.1 microasrcsecperrad
+    dpsi = (dpsils + dpsipl)/p1uasecperrad
+    deps = (depsls + depspl)/p1uasecperrad
+    
+    #IAU 2006 corrections to the 2000A values (from the J2 rate)
+    fj2 = -2.7774e-6*t
+    dpsi += dpsi*(0.4697e-6 + fj2)
+    deps += deps*fj2
+    
+    return outshape(epsa),outshape(dpsi),outshape(deps) #all in radians
 
 
     
-_nut_data_00b = _load_nutation_data('iau00b_nutation.tab','lunisolar')
-def _nutation_components2000B(intime,asepoch=True):
+def _nutation_components2000B(intime,asepoch=True,maxmem=None):
     """
-    :param intime: time to compute the nutation components as a JD or epoch
-    :type intime: scalar
+    :param intime: time(s) to compute the nutation components as a JD or epoch
+    :type intime: scalar or array-like
     :param asepoch: if True, `intime` is interpreted as an epoch, otherwise JD
     :type asepoch: bool
+    :param maxmem: 
+        memory limit for the series evaluation, or None to use
+        :data:`nutation_series_maxmem`
     
-    :returns: eps,dpsi,deps in radians
+    :returns: eps,dpsi,deps in radians (arrays if `intime` is an array)
     """
     from ..constants import asecperrad
-    from ..obstools import epoch_to_jd,jd2000
+    from ..obstools import jd2000
     from .funcs import obliquity
     
-    if asepoch:
-        jd = epoch_to_jd(intime)
-    else:
-        jd = intime
+    jd,outshape = _nutation_times(intime,asepoch)
     epsa = np.radians(obliquity(jd,2000))
     t = (jd-jd2000)/36525
     
@@ -2371,33 +2761,44 @@ def _nutation_components2000B(intime,asepoch=True):
     Om = ((450160.398036 + -6962890.5431*t)%1296000)/asecperrad
     
     #compute nutation series using array loaded from data directory
-    dat = _nut_data_00b
-    arg = dat.nl*el + dat.nlp*elp + dat.nF*F + dat.nD*D + dat.nOm*Om
-    sarg = np.sin(arg)
-    carg = np.cos(arg)
+    dat = _get_nutation_data('00b')
+    mults = (dat.nl,dat.nlp,dat.nF,dat.nD,dat.nOm)
+    zeros = np.zeros(len(dat))
+    psi0,psit,eps0,epst = _trig_series(np.transpose(mults),(el,elp,F,D,Om),
+                                       (dat.ps,dat.pst,dat.es,zeros),
+                                       (dat.pc,zeros,dat.ec,dat.ect),maxmem)
     
     p1uasecperrad = asecperrad*1e7 #0.1 microasrcsecperrad
-    dpsils = np.sum((dat.ps + dat.pst*t)*sarg + dat.pc*carg)/p1uasecperrad
-    depsls = np.sum((dat.ec + dat.ect*t)*carg + dat.es*sarg)/p1uasecperrad
+    dpsils = (psi0 + psit*t)/p1uasecperrad
+    depsls = (eps0 + epst*t)/p1uasecperrad
     #fixed offset in place of planetary tersm
     masecperrad = asecperrad*1e3 #milliarcsec per rad
     dpsipl = -0.135/masecperrad
     depspl =  0.388/masecperrad
     
-    return epsa,dpsils+dpsipl,depsls+depspl #all in radians
+    #all in radians
+    return outshape(epsa),outshape(dpsils+dpsipl),outshape(depsls+depspl)
                
+@_epoch_cached
 def _nutation_matrix(epoch):
     """
     Nutation matrix generated from nutation components.
     
     Matrix converts from mean coordinate to true coordinate as
     r_true = M * r_mean
+    
+    If `epoch` is an array, an (N,3,3) array of matricies is returned.
     """
     from ..utils import rotation_matrix
     
-    #TODO: implement higher precision 2006/2000A model if requested/needed
+    #TODO: use higher precision 2006/2000A model if requested/needed
     epsa,dpsi,deps = _nutation_components2000B(epoch) #all in radians
     
+    if np.ndim(epoch) > 0:
+        return _matrix_stack_product(_rotation_matrices(-(epsa + deps),'x'),
+                                     _rotation_matrices(-dpsi,'z'),
+                                     _rotation_matrices(epsa,'x'))
+    
     return rotation_matrix(-(epsa + deps),'x',False) *\
            rotation_matrix(-dpsi,'z',False) *\
            rotation_matrix(epsa,'x',False)
@@ -2409,40 +2810,59 @@ def _load_CIO_locator_data(datafn):
     
     returns polycoeffs,termsarr (starting with 0th)
     """
-    from ..utils.io import get_package_data
+    from ..utils.io import get_package_data_arrays
+    
+    def parser(content):
+        lines = [l for l in content.split('\n') if not l.startswith('#') if not l.strip()=='']
+        coeffs = []
+        sincs = []
+        coscs = []
+        res = {}
+        
+        inorder = None
+        for l in lines:
+            if 'Polynomial coefficients:' in l:
+                polys = l.replace('Polynomial coefficients:','').split(',')
+                res['polys'] = np.array(polys,dtype=float)
+            elif 'order' in l:
+                if inorder is not None:
+                    res['ns%i'%inorder] = np.array(coeffs,dtype=int)
+                    res['sco%i'%inorder] = np.array(sincs,dtype=float)
+                    res['cco%i'%inorder] = np.array(coscs,dtype=float)
+                    coeffs = []
+                    sincs = []
+                    coscs = []
+                    inorder += 1
+                else:
+                    inorder = 0
+            elif inorder is not None:
+                ls = l.split()
+                coeffs.append(ls[:8])
+                sincs.append(ls[8])
+                coscs.append(ls[9])
+        if inorder is not None:
+            res['ns%i'%inorder] = np.array(coeffs,dtype=int)
+            res['sco%i'%inorder] = np.array(sincs,dtype=float)
+            res['cco%i'%inorder] = np.array(coscs,dtype=float)
+        return res
     
-    lines = [l for l in get_package_data(datafn).split('\n') if not l.startswith('#') if not l.strip()=='']
-    coeffs = []
-    sincs = []
-    coscs = []
+    res = get_package_data_arrays(datafn,parser)
     orders = []
-    
-    inorder = False
-    for l in lines:
-        if 'Polynomial coefficients:' in l:
-            polys = l.replace('Polynomial coefficients:','').split(',')
-            polys = np.array(polys,dtype=float)
-        elif 'order' in l:
-            if inorder:
-                orders.append((np.array(coeffs,dtype=int),
-                               np.array(sincs,dtype=float),
-                               np.array(coscs,dtype=float)))
-                coeffs = []
-                sincs = []
-                coscs = []
-            inorder = True
-        elif inorder:
-            ls = l.split()
-            coeffs.append(ls[:8])
-            sincs.append(ls[8])
-            coscs.append(ls[9])
-    if inorder:
-        orders.append((np.array(coeffs,dtype=int),
-                       np.array(sincs,dtype=float),
-                       np.array(coscs,dtype=float)))
-        
-    return polys,orders
-_CIO_locator_data = _load_CIO_locator_data('iau00_cio_locator.tab')  
+    while 'ns%i'%len(orders) in res:
+        i = len(orders)
+        orders.append((res['ns%i'%i],res['sco%i'%i],res['cco%i'%i]))
+        
+    return res['polys'],orders
+
+_CIO_locator_data = None
+def _get_CIO_locator_data():
+    """
+    Returns the CIO locator series terms, loading them on first use.
+    """
+    global _CIO_locator_data
+    if _CIO_locator_data is None:
+        _CIO_locator_data = _load_CIO_locator_data('iau00_cio_locator.tab')
+    return _CIO_locator_data
 
 
 class CIRSCoordinates(EquatorialCoordinatesBase):
@@ -2485,6 +2905,7 @@ class CIRSCoordinates(EquatorialCoordinatesBase):
         EpochalLatLongCoordinates.transformToEpoch(self,newepoch)
     
     @staticmethod    
+    @_epoch_cached
     def _CMatrix(epoch):
         """
         The GCRS->CIRS transformation matrix
@@ -2493,14 +2914,7 @@ class CIRSCoordinates(EquatorialCoordinatesBase):
         if epoch is None:
             return B
         else:
-            from math import sin,cos,atan,atan2,sqrt
-            from ..utils import rotation_matrix
-            
-            P = _precession_matrix_J2000_Capitaine(epoch)
-            N = _nutation_matrix(epoch)
-            
-            
-            x,y,z = (N*P*B).A[2]
+            x,y,z = CIRSCoordinates._CIPxyz(epoch)
             xsq,ysq = x**2,y**2
             bz = 1/(1+z)
             s = CIRSCoordinates._CIOLocator(epoch)
@@ -2514,12 +2928,14 @@ class CIRSCoordinates(EquatorialCoordinatesBase):
             #                                                     [d,e,f],
             #                                                     [g,h,i]]) 
             
-            si = sin(s)
-            co = cos(s)
+            si = np.sin(s)
+            co = np.cos(s)
             
             M = [[a*co - d*si,b*co - e*si,c*co - f*si],
                  [a*si + d*co,b*si + e*co,c*si + f*co],
                  [     g,          h,          i     ]]     
+            if np.ndim(epoch) > 0: #(3,3,N) -> (N,3,3)
+                return np.array(M).transpose(2,0,1)
             return np.mat(M)
         
 #            #SOFA implementation using spherical angles - numerically identical
@@ -2532,6 +2948,7 @@ class CIRSCoordinates(EquatorialCoordinatesBase):
 #                   rotation_matrix(e,'z',False)
         
     @staticmethod
+    @_epoch_cached
     def _CIOLocator(epoch):
         """
         Returns the CIO locator s for the provided epoch. s is the difference in
@@ -2547,15 +2964,10 @@ class CIRSCoordinates(EquatorialCoordinatesBase):
                             _mean_long_asc_node_moon,_long_prec
         
         #first need to find x and y for the CIP, as s+XY/2 is needed
-        B = ICRSCoordinates.frameBiasJ2000
-        P = _precession_matrix_J2000_Capitaine(epoch)
-        N = _nutation_matrix(epoch)
-        
-        #N*P*B takes GCRS to true, so CIP is bottom row
-        x,y,z = (N*P*B).A[2]
+        x,y,z = CIRSCoordinates._CIPxyz(epoch)
         
         #T = (epoch_to_jd(epoch) - jd2000)/36525
-        T = (epoch-2000)/100
+        T = (np.asarray(epoch,dtype=float)-2000)/100
         
         fundargs = [] #fundamental arguments
         
@@ -2568,22 +2980,40 @@ class CIRSCoordinates(EquatorialCoordinatesBase):
         fundargs.append(_long_earth(T))
         fundargs.append(_long_prec(T))
         
-        fundargs = np.array(fundargs)
+        fundargs = np.array(fundargs,ndmin=2).reshape(len(fundargs),-1)
         
-        polys,orders = _CIO_locator_data
-        newpolys = polys.copy() #copy 0-values to add to
+        polys,orders = _get_CIO_locator_data()
+        #copy 0-values to add to, one column per time
+        newpolys = np.repeat(polys[:,np.newaxis],fundargs.shape[1],1)
         
         for i,o in enumerate(orders):
             ns,sco,cco = o
-            a = np.dot(ns,fundargs)
-            newpolys[i] += np.sum(sco*np.sin(a) + cco*np.cos(a))
+            newpolys[i] += _trig_series(ns,fundargs,sco,cco)[0]
+        
+        s = np.polyval(newpolys[::-1],T.ravel())/asecperrad - x*y/2.0
+        return s.reshape(T.shape) if T.shape else s[0]
+    
+    @staticmethod
+    def _CIPxyz(epoch):
+        """
+        Returns the x,y,z GCRS components of the Celestial Intermediate Pole
+        for the provided epoch (or arrays of components for an array of
+        epochs).
+        """
+        B = ICRSCoordinates.frameBiasJ2000
+        P = _precession_matrix_J2000_Capitaine(epoch)
+        N = _nutation_matrix(epoch)
         
-        return np.polyval(newpolys[::-1],T)/asecperrad - x*y/2.0
+        #N*P*B takes GCRS to true, so CIP is bottom row
+        if np.ndim(epoch) > 0:
+            return _matrix_stack_product(N,P,B)[:,2,:].T
+        else:
+            return (N*P*B).A[2]
     
-    @CoordinateSystem.registerTransform(GCRSCoordinates,'self',transtype='smatrix')
+    @CoordinateSystem.registerTransform(GCRSCoordinates,'self',transtype='smatrix',depends='epoch')
     def _fromGCRS(gcrsc):
         return CIRSCoordinates._CMatrix(gcrsc.epoch)
-    @CoordinateSystem.registerTransform('self',GCRSCoordinates,transtype='smatrix')
+    @CoordinateSystem.registerTransform('self',GCRSCoordinates,transtype='smatrix',depends='epoch')
     def _toGCRS(cirssys):
         return CIRSCoordinates._CMatrix(cirssys.epoch).T
             
@@ -2631,7 +3061,7 @@ class EquatorialCoordinatesEquinox(EquatorialCoordinatesBase):
             self.matrixRotate(A*B)
         EpochalLatLongCoordinates.transformToEpoch(self,newepoch)
         
-    @CoordinateSystem.registerTransform(GCRSCoordinates,'self',transtype='smatrix')
+    @CoordinateSystem.registerTransform(GCRSCoordinates,'self',transtype='smatrix',depends='epoch')
     def _fromGCRS(gcrsc):
         B = ICRSCoordinates.frameBiasJ2000
         if gcrsc.epoch is None:
@@ -2640,11 +3070,11 @@ class EquatorialCoordinatesEquinox(EquatorialCoordinatesBase):
             P = _precession_matrix_J2000_Capitaine(gcrsc.epoch)
             N = _nutation_matrix(gcrsc.epoch)
             return N*P*B 
-    @CoordinateSystem.registerTransform('self',GCRSCoordinates,transtype='smatrix')
+    @CoordinateSystem.registerTransform('self',GCRSCoordinates,transtype='smatrix',depends='epoch')
     def _toGCRS(eqsys):
         return EquatorialCoordinatesEquinox._fromGCRS(eqsys).T
           
-    @CoordinateSystem.registerTransform('self',CIRSCoordinates,transtype='smatrix')
+    @CoordinateSystem.registerTransform('self',CIRSCoordinates,transtype='smatrix',depends='epoch')
     def _toCIRS(eqsys):
         if eqsys.epoch is None:
             return np.eye(3).view(np.matrix)
@@ -2657,7 +3087,7 @@ class EquatorialCoordinatesEquinox(EquatorialCoordinatesBase):
             eqo = equation_of_the_origins(jd)*15.  #hours>degrees
             return rotation_matrix(-eqo,'z',True)
     
-    @CoordinateSystem.registerTransform(CIRSCoordinates,'self',transtype='smatrix')
+    @CoordinateSystem.registerTransform(CIRSCoordinates,'self',transtype='smatrix',depends='epoch')
     def _fromCIRS(cirssys):
         return EquatorialCoordinatesEquinox._toCIRS(cirssys).T
             
@@ -2700,6 +3130,7 @@ class ITRSCoordinates(EpochalLatLongCoordinates):
     __slots__ = tuple('_dpc') 
     #_dpc is included for transformation to/from Equatorial-like systems
     _longrange_ = (-180,180)
+    _transformparams_ = ('polarmotion',)
     
     polarmotion = None
     """
@@ -2767,7 +3198,7 @@ class ITRSCoordinates(EpochalLatLongCoordinates):
             res._dpc = self._dpc
         return res
     
-    @CoordinateSystem.registerTransform(CIRSCoordinates,'self',transtype='smatrix')
+    @CoordinateSystem.registerTransform(CIRSCoordinates,'self',transtype='smatrix',depends='epoch')
     def _fromEqC(eqc):
         from .funcs import earth_rotation_angle
         from ..obstools import epoch_to_jd
@@ -2784,7 +3215,7 @@ class ITRSCoordinates(EpochalLatLongCoordinates):
         else:
             return np.eye(3).view(np.matrix)
     
-    @CoordinateSystem.registerTransform(EquatorialCoordinatesEquinox,'self',transtype='smatrix')
+    @CoordinateSystem.registerTransform(EquatorialCoordinatesEquinox,'self',transtype='smatrix',depends='epoch')
     def _fromEqE(eqe):
         from .funcs import greenwich_sidereal_time
         from ..utils import rotation_matrix
@@ -2805,13 +3236,13 @@ class ITRSCoordinates(EpochalLatLongCoordinates):
         else:
             return np.eye(3).view(np.matrix)  
     
-    @CoordinateSystem.registerTransform('self',CIRSCoordinates,transtype='smatrix')
+    @CoordinateSystem.registerTransform('self',CIRSCoordinates,transtype='smatrix',depends='epoch')
     def _toEqC(itrsc):
         #really we want inverse, but rotations are unitary -> inv==transpose
         #we provide itrsc in the call because the epoch is needed
         return ITRSCoordinates._fromEqC(itrsc).T 
     
-    @CoordinateSystem.registerTransform('self',EquatorialCoordinatesEquinox,transtype='smatrix')
+    @CoordinateSystem.registerTransform('self',EquatorialCoordinatesEquinox,transtype='smatrix',depends='epoch')
     def _toEqE(itrsc):
         #really we want inverse, but rotations are unitary -> inv==transpose
         #we provide itrsc in the call because the epoch is needed
@@ -2875,7 +3306,7 @@ class FK5Coordinates(EquatorialCoordinatesEquinox):
             self.matrixRotate(self._precessionMatrixJ(self.epoch,newepoch))
         EpochalLatLongCoordinates.transformToEpoch(self,newepoch)
         
-    @CoordinateSystem.registerTransform(ICRSCoordinates,'self',transtype='smatrix')
+    @CoordinateSystem.registerTransform(ICRSCoordinates,'self',transtype='smatrix',depends='epoch')
     def _fromICRS(icrsc):
         """
         B-matrix from USNO circular 179 
@@ -2895,7 +3326,7 @@ class FK5Coordinates(EquatorialCoordinatesEquinox):
         else:
             return FK5Coordinates._precessionMatrixJ(2000,icrsc.epoch)*B
     
-    @CoordinateSystem.registerTransform('self',ICRSCoordinates,transtype='smatrix')
+    @CoordinateSystem.registerTransform('self',ICRSCoordinates,transtype='smatrix',depends='epoch')
     def _toICRS(fk5c):
         return FK5Coordinates._fromICRS(fk5c).T
     
@@ -2979,7 +3410,7 @@ class FK4Coordinates(EquatorialCoordinatesEquinox):
                rotation_matrix(-zeta,'z')
         
                
-    @CoordinateSystem.registerTransform('self',FK5Coordinates,transtype='smatrix')
+    @CoordinateSystem.registerTransform('self',FK5Coordinates,transtype='smatrix',depends='epoch')
     def _toFK5(fk4c):
         from ..obstools import epoch_to_jd,jd_to_epoch
         
@@ -3011,7 +3442,7 @@ class FK4Coordinates(EquatorialCoordinatesEquinox):
         else:
             return B
     
-    @CoordinateSystem.registerTransform(FK5Coordinates,'self',transtype='smatrix')
+    @CoordinateSystem.registerTransform(FK5Coordinates,'self',transtype='smatrix',depends='epoch')
     def _fromFK5(fk5c):
         #need inverse because Murray's matrix is *not* a true rotation matrix
         return FK4Coordinates._toFK5(fk5c).I
@@ -3032,6 +3463,7 @@ class EclipticCoordinatesCIRS(EpochalLatLongCoordinates):
     __slots__ = ()
     _longlatnames_ = ('lamb','beta')
     _longrange_ = (0,360)
+    _transformparams_ = ('obliqyear',)
     
     obliqyear = 2006
     
@@ -3043,14 +3475,14 @@ class EclipticCoordinatesCIRS(EpochalLatLongCoordinates):
         EpochalLatLongCoordinates.__init__(self,lamb,beta,lamberr,betaerr,epoch)
         self.distanceau = distanceau
         
-    @CoordinateSystem.registerTransform('self',CIRSCoordinates,transtype='smatrix')
+    @CoordinateSystem.registerTransform('self',CIRSCoordinates,transtype='smatrix',depends='epoch')
     def _toEq(eclsc):
         from .funcs import obliquity
         from ..utils import rotation_matrix
         
         return rotation_matrix(-obliquity(eclsc.jdepoch,EclipticCoordinatesCIRS.obliqyear),'x')
         
-    @CoordinateSystem.registerTransform(CIRSCoordinates,'self',transtype='smatrix')
+    @CoordinateSystem.registerTransform(CIRSCoordinates,'self',transtype='smatrix',depends='epoch')
     def _fromEq(eqc):
         from .funcs import obliquity
         from ..utils import rotation_matrix
@@ -3085,6 +3517,7 @@ class EclipticCoordinatesEquinox(EpochalLatLongCoordinates):
     __slots__ = ()
     _longlatnames_ = ('lamb','beta')
     _longrange_ = (0,360)
+    _transformparams_ = ('obliqyear',)
     
     obliqyear = 1980
     
@@ -3096,14 +3529,14 @@ class EclipticCoordinatesEquinox(EpochalLatLongCoordinates):
         EpochalLatLongCoordinates.__init__(self,lamb,beta,lamberr,betaerr,epoch)
         self.distanceau = distanceau
         
-    @CoordinateSystem.registerTransform('self',EquatorialCoordinatesEquinox,transtype='smatrix')
+    @CoordinateSystem.registerTransform('self',EquatorialCoordinatesEquinox,transtype='smatrix',depends='epoch')
     def _toEq(eclsc):
         from .funcs import obliquity
         from ..utils import rotation_matrix
         
         return rotation_matrix(-obliquity(eclsc.jdepoch,EclipticCoordinatesEquinox.obliqyear),'x')
         
-    @CoordinateSystem.registerTransform(EquatorialCoordinatesEquinox,'self',transtype='smatrix')
+    @CoordinateSystem.registerTransform(EquatorialCoordinatesEquinox,'self',transtype='smatrix',depends='epoch')
     def _fromEq(eqc):
         from .funcs import obliquity
         from ..utils import rotation_matrix
@@ -3228,7 +3661,7 @@ class GalacticCoordinates(EpochalLatLongCoordinates):
         """
         EpochalLatLongCoordinates.transformToEpoch(self,newepoch)
     
-    @CoordinateSystem.registerTransform(FK5Coordinates,'self',transtype='smatrix')
+    @CoordinateSystem.registerTransform(FK5Coordinates,'self',transtype='smatrix',depends='epoch')
     def _fromFK5(fk5coords):
         from ..utils import rotation_matrix
         
@@ -3238,14 +3671,13 @@ class GalacticCoordinates(EpochalLatLongCoordinates):
               rotation_matrix(90 - GalacticCoordinates._ngp_J2000.dec.d,'y') *\
               rotation_matrix(GalacticCoordinates._ngp_J2000.ra.d,'z') *\
               FK5Coordinates._precessionMatrixJ(epoch,2000)
-        mat.nocache = True #can't cache because of the need to get the epoch
         return mat
     
-    @CoordinateSystem.registerTransform('self',FK5Coordinates,transtype='smatrix')
+    @CoordinateSystem.registerTransform('self',FK5Coordinates,transtype='smatrix',depends='epoch')
     def _toFK5(galcoords):
         return GalacticCoordinates._fromFK5(galcoords).T
     
-    @CoordinateSystem.registerTransform(FK4Coordinates,'self',transtype='smatrix')
+    @CoordinateSystem.registerTransform(FK4Coordinates,'self',transtype='smatrix',depends='epoch')
     def _fromFK4(fk4coords):
         from ..utils import rotation_matrix
         
@@ -3255,10 +3687,9 @@ class GalacticCoordinates(EpochalLatLongCoordinates):
               rotation_matrix(90 - GalacticCoordinates._ngp_B1950.dec.d,'y') *\
               rotation_matrix(GalacticCoordinates._ngp_B1950.ra.d,'z') *\
               FK4Coordinates._precessionMatrixB(epoch,1950)
-        mat.nocache = True #can't cache because of the need to get the epoch
         return mat
     
-    @CoordinateSystem.registerTransform('self',FK4Coordinates,transtype='smatrix')
+    @CoordinateSystem.registerTransform('self',FK4Coordinates,transtype='smatrix',depends='epoch')
     def _toFK4(galcoords):
         return GalacticCoordinates._fromFK4(galcoords).T
         
@@ -3277,11 +3708,11 @@ class SupergalacticCoordinates(EpochalLatLongCoordinates):
         """
         EpochalLatLongCoordinates.transformToEpoch(self,newepoch)
     
-    @CoordinateSystem.registerTransform('self',GalacticCoordinates,transtype='smatrix')
+    @CoordinateSystem.registerTransform('self',GalacticCoordinates,transtype='smatrix',depends='constant')
     def _toGal(sgalcoords):
         return SupergalacticCoordinates._fromGal(sgalcoords).T
     
-    @CoordinateSystem.registerTransform(GalacticCoordinates,'self',transtype='smatrix')
+    @CoordinateSystem.registerTransform(GalacticCoordinates,'self',transtype='smatrix',depends='constant')
     def _fromGal(galcoords):
         from ..utils import rotation_matrix
         
@@ -3374,8 +3805,585 @@ Builtin Coordinate System Transforms
     """+postbuiltin
     __doc__ = __doc__.replace('{transformdiagram}',warningstr)
     del warningstr
+
+
+#<-----------------------------Coordinate arrays------------------------------->
+
+def matrix_rotate_arrays(matrix,lat,long,laterr=None,longerr=None,fixrange=True):
+    """
+    Applies unitary rotation matricies to arrays of latitudes and longitudes,
+    propogating errors if they are given. This is the vectorized equivalent of
+    :meth:`LatLongCoordinates.matrixRotate` - all of the positions are rotated
+    and their errors propogated as whole-array operations.
+    
+    :param matrix: 
+        The transformation matrix in cartesian coordinates. Either a single 3x3
+        matrix applied to all positions, or an (N,3,3) array with a separate
+        matrix for each position (e.g. for positions at different epochs).
+    :param lat: Latitudes in radians.
+    :type lat: scalar or array-like
+    :param long: Longitudes in radians.
+    :type long: scalar or array-like
+    :param laterr: Latitude errors in radians or None for no errors.
+    :type laterr: scalar, array-like, or None
+    :param longerr: Longitude errors in radians or None for no errors.
+    :type longerr: scalar, array-like, or None
+    :param fixrange: 
+        If True the latitude is on (-pi/2,pi/2) and the longitude is on
+        (0,2pi). Otherwise the longitude is on (-pi,pi).
+    :type fixrange: boolean
+    
+    :returns: 
+        (lat,long,laterr,longerr) as arrays of radians after the transformation
+        is applied. `laterr` and `longerr` are None if neither input error is
+        given.
+        
+    :except ValueError: If `matrix` is not 3x3 or an (N,3,3) array.
     
+    """
+    m = np.asarray(matrix,dtype=float)
+    if m.shape[-2:] != (3,3) or m.ndim > 3:
+        raise ValueError('matrix must be 3x3 or an Nx3x3 array')
+    
+    lat = np.asarray(lat,dtype=float)
+    long = np.asarray(long,dtype=float)
+    
+    sb = np.sin(lat)
+    cb = np.cos(lat)
+    sl = np.sin(long)
+    cl = np.cos(long)
+    
+    #spherical w/ r=1 > cartesian
+    x = cb*cl
+    y = cb*sl
+    z = sb
+    
+    #do transform - m[...,i,j] is a scalar or an array over the positions
+    xp = m[...,0,0]*x + m[...,0,1]*y + m[...,0,2]*z
+    yp = m[...,1,0]*x + m[...,1,1]*y + m[...,1,2]*z
+    zp = m[...,2,0]*x + m[...,2,1]*y + m[...,2,2]*z
+    
+    #cartesian > spherical - arctan2 already gives latp on (-pi/2,pi/2)
+    sp = np.hypot(xp,yp) #cylindrical radius
+    latp = np.arctan2(zp,sp)
+    longp = np.arctan2(yp,xp)
+    if fixrange:
+        longp %= _twopi
+    
+    if laterr is None and longerr is None:
+        return latp,longp,None,None
+    
+    laterr = 0 if laterr is None else np.asarray(laterr,dtype=float)
+    longerr = 0 if longerr is None else np.asarray(longerr,dtype=float)
+    
+    #all of these are first order taylor expansions about the value
+    dx2 = (laterr*sb*cl)**2 + (longerr*cb*sl)**2
+    dy2 = (laterr*sb*sl)**2 + (longerr*cb*cl)**2
+    dz2 = (laterr*cb)**2
+    
+    m2 = m*m
+    dxp = np.sqrt(m2[...,0,0]*dx2 + m2[...,0,1]*dy2 + m2[...,0,2]*dz2)
+    dyp = np.sqrt(m2[...,1,0]*dx2 + m2[...,1,1]*dy2 + m2[...,1,2]*dz2)
+    dzp = np.sqrt(m2[...,2,0]*dx2 + m2[...,2,1]*dy2 + m2[...,2,2]*dz2)
+    
+    #partial derivatives of the spherical angles w.r.t. the rotated cartesian
+    dlatp = np.sqrt((dxp*xp*zp)**2 + (dyp*yp*zp)**2 + (dzp*sp*sp)**2)/sp
+    dlongp = np.hypot(dxp*yp,dyp*xp)/(sp*sp) #indep of z
+    
+    return latp,longp,dlatp,dlongp
+
+
+class CoordinateArray(object):
+    """
+    An array of positions in a single :class:`LatLongCoordinates` system, stored
+    as contiguous float arrays (in degrees) rather than as one object per
+    position.  Any :class:`LatLongCoordinates` subclass (e.g.
+    :class:`ICRSCoordinates`, :class:`FK5Coordinates`,
+    :class:`GalacticCoordinates`, :class:`ITRSCoordinates`) can be used as the
+    coordinate system.
+
+    :meth:`convert` uses the same transforms registered with
+    :meth:`CoordinateSystem.registerTransform` as the individual objects, but
+    'smatrix' transforms are applied to all of the positions at once as a single
+    matrix product (see :func:`matrix_rotate_arrays`).  The positions may share
+    a single epoch or each have their own, in which case a stack of matricies
+    (one per position) is used.
+
+    The longitude and latitude arrays are available as :attr:`long` and
+    :attr:`lat`, and also under the names used by the coordinate class (e.g.
+    ``ra`` and ``dec`` or ``l`` and ``b``)::
+
+        >>> from astropysics.coords import CoordinateArray,FK5Coordinates
+        >>> ca = CoordinateArray(FK5Coordinates,[10,20],[-5,5])
+        >>> ca.ra
+        array([ 10.,  20.])
+        >>> len(ca)
+        2
+        >>> ca[1].ra.d
+        20.0
+
+    """
+
+    def __init__(self,coordclass,long,lat,longerr=None,laterr=None,epoch=None,
+                      distancepc=None,distancepcerr=None,copy=True):
+        """
+        :param coordclass:
+            The :class:`LatLongCoordinates` subclass these positions are in.
+        :param long: Array of longitudes in degrees.
+        :param lat: Array of latitudes in degrees.
+        :param longerr: Longitude errors in degrees or None for no errors.
+        :param laterr: Latitude errors in degrees or None for no errors.
+        :param epoch:
+            The epoch of the positions, or None to use the default epoch of
+            `coordclass` (ignored if `coordclass` is not epochal). May also be
+            an array with an epoch for each position.
+        :param distancepc: Distances in parsecs or None for no distances.
+        :param distancepcerr: Distance errors in parsecs or None.
+        :param copy:
+            If False, float arrays (including views such as fields of a
+            structured array) are used directly rather than copied, so changes
+            to the arrays are visible in both places.
+
+        :except TypeError: If `coordclass` is not a :class:`LatLongCoordinates`.
+        :except ValueError: If the arrays cannot be broadcast together.
+        """
+        if not (isinstance(coordclass,type) and issubclass(coordclass,LatLongCoordinates)):
+            raise TypeError('coordclass must be a LatLongCoordinates subclass')
+        self.coordclass = coordclass
+        self._copy = copy
+
+        self.long = np.array(long,dtype=float,ndmin=1,copy=copy).reshape(-1)
+        self.lat = self._asArray(lat)
+        self.longerr = self._asArray(longerr)
+        self.laterr = self._asArray(laterr)
+        self.distancepc = self._asArray(distancepc)
+        self.distancepcerr = self._asArray(distancepcerr)
+
+        if issubclass(coordclass,EpochalCoordinates):
+            if epoch is None:
+                epoch = coordclass().epoch
+            if epoch is None or np.isscalar(epoch):
+                self.epoch = None if epoch is None else float(epoch)
+            else:
+                self.epoch = self._asArray(epoch)
+        else:
+            self.epoch = None
+
+    def _asArray(self,val):
+        if val is None:
+            return None
+        val = np.array(val,dtype=float,copy=self._copy)
+        if val.shape != self.long.shape:
+            val = np.ascontiguousarray(np.broadcast_arrays(val,self.long)[0])
+        return val
+
+    def __getattr__(self,name):
+        #only called if normal lookup fails - maps e.g. ra/dec/raerr to long/lat
+        try:
+            longname,latname = self.__dict__['coordclass']._longlatnames_
+        except KeyError:
+            raise AttributeError(name)
+        aliases = {longname:'long',latname:'lat',
+                   longname+'err':'longerr',latname+'err':'laterr'}
+        if name in aliases:
+            return self.__dict__[aliases[name]]
+        raise AttributeError("'%s' object has no attribute '%s'"%(self.__class__.__name__,name))
+
+    def __len__(self):
+        return self.long.size
+
+    def __getitem__(self,key):
+        if isinstance(key,(int,long,np.integer)):
+            return self._makeObject(key)
+        else:
+            return self._subArray(key)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._makeObject(i)
+
+    def __repr__(self):
+        return '<%s of %i %s>'%(self.__class__.__name__,len(self),self.coordclass.__name__)
+
+    def _subArray(self,key):
+        def sub(arr):
+            return None if arr is None else arr[key]
+        epoch = self.epoch
+        if isinstance(epoch,np.ndarray):
+            epoch = epoch[key]
+        return CoordinateArray(self.coordclass,self.long[key],self.lat[key],
+                               sub(self.longerr),sub(self.laterr),epoch,
+                               sub(self.distancepc),sub(self.distancepcerr))
+
+    def _makeObject(self,i):
+        obj = self.coordclass()
+        obj._long.degrees = self.long[i]
+        obj._lat.degrees = self.lat[i]
+        if self.longerr is not None:
+            obj.longerr = AngularSeparation(self.longerr[i])
+        if self.laterr is not None:
+            obj.laterr = AngularSeparation(self.laterr[i])
+        if self.distancepc is not None:
+            derr = 0 if self.distancepcerr is None else self.distancepcerr[i]
+            obj.distancepc = (self.distancepc[i],derr)
+        if isinstance(obj,EpochalCoordinates):
+            if isinstance(self.epoch,np.ndarray):
+                obj._epoch = float(self.epoch[i])
+            else:
+                obj._epoch = self.epoch
+        return obj
+
+    def toObjects(self):
+        """
+        Generates a list of individual coordinate objects for these positions.
+
+        :returns: A list of `coordclass` objects
+        """
+        return [self._makeObject(i) for i in range(len(self))]
+
+    @staticmethod
+    def fromObjects(objs,coordclass=None):
+        """
+        Creates a :class:`CoordinateArray` from a sequence of
+        :class:`LatLongCoordinates` objects.
+
+        :param objs: A sequence of :class:`LatLongCoordinates` objects.
+        :param coordclass:
+            The coordinate class for the new array - objects not in this system
+            will be converted to it. If None, the class of the first object is
+            used.
+
+        :returns: 
+            A :class:`CoordinateArray`. If the objects do not all share the same
+            epoch, its epoch is an array with the epoch of each object.
+
+        :except ValueError: If `objs` is empty and `coordclass` is None.
+        """
+        objs = list(objs)
+        if coordclass is None:
+            if len(objs)==0:
+                raise ValueError('cannot infer coordinate class from no objects')
+            coordclass = objs[0].__class__
+        objs = [o if o.__class__ is coordclass else o.convert(coordclass) for o in objs]
+
+        n = len(objs)
+        long = np.degrees(np.fromiter((o._long._decval for o in objs),float,n))
+        lat = np.degrees(np.fromiter((o._lat._decval for o in objs),float,n))
+
+        if any([o._longerr is not None or o._laterr is not None for o in objs]):
+            longerr = np.fromiter((0 if o._longerr is None else o._longerr.degrees for o in objs),float,n)
+            laterr = np.fromiter((0 if o._laterr is None else o._laterr.degrees for o in objs),float,n)
+        else:
+            longerr = laterr = None
+
+        dists = [o.distancepc for o in objs]
+        if any([d is not None for d in dists]):
+            distancepc = np.array([np.inf if d is None else d[0] for d in dists])
+            distancepcerr = np.array([0 if d is None else d[1] for d in dists])
+        else:
+            distancepc = distancepcerr = None
+
+        epoch = None
+        if issubclass(coordclass,EpochalCoordinates) and n > 0:
+            epoch = objs[0]._epoch
+            if any([o._epoch != epoch for o in objs]):
+                epoch = np.array([o._epoch for o in objs],dtype=float)
+
+        return CoordinateArray(coordclass,long,lat,longerr,laterr,epoch,
+                               distancepc,distancepcerr)
+
+    @staticmethod
+    def _fieldNames(coordclass,names):
+        longname,latname = coordclass._longlatnames_
+        fnames = {'long':longname,'lat':latname,'longerr':longname+'err',
+                  'laterr':latname+'err','distancepc':'distancepc',
+                  'distancepcerr':'distancepcerr','epoch':'epoch'}
+        if names is not None:
+            fnames.update(names)
+        return fnames
+
+    _structattrs = ('long','lat','longerr','laterr','distancepc','distancepcerr',
+                    'epoch')
+
+    def toStructuredArray(self,names=None):
+        """
+        Generates a numpy structured array with a row for each position.
+
+        :param names:
+            A dictionary mapping any of 'long', 'lat', 'longerr', 'laterr',
+            'distancepc', 'distancepcerr', or 'epoch' to the field name to use
+            for that column. By default the names used by the coordinate class
+            are used for the coordinates (e.g. 'ra','dec','raerr', and
+            'decerr'), and the attribute names for the others.
+
+        :returns:
+            A structured :class:`numpy.ndarray` with float fields for the
+            coordinates in degrees, and for the errors, distances, and epoch if
+            they are present.  Use ``.view(numpy.recarray)`` for a record array.
+
+        **Examples**
+
+        >>> from astropysics.coords import CoordinateArray,FK5Coordinates
+        >>> arr = CoordinateArray(FK5Coordinates,[10,20],[-5,5]).toStructuredArray()
+        >>> arr.dtype.names
+        ('ra', 'dec', 'epoch')
+        >>> CoordinateArray.fromStructuredArray(arr,FK5Coordinates)[1].ra.d
+        20.0
+
+        """
+        fnames = self._fieldNames(self.coordclass,names)
+        attrs = [a for a in self._structattrs if getattr(self,a) is not None]
+        arr = np.empty(len(self),dtype=[(fnames[a],float) for a in attrs])
+        for a in attrs:
+            arr[fnames[a]] = getattr(self,a)
+        return arr
+
+    @staticmethod
+    def fromStructuredArray(arr,coordclass,names=None,copy=False):
+        """
+        Creates a :class:`CoordinateArray` from a numpy structured array or
+        record array (e.g. a FITS table or the output of
+        :meth:`toStructuredArray`).
+
+        :param arr: The structured array with the positions in degrees.
+        :param coordclass:
+            The :class:`LatLongCoordinates` subclass these positions are in.
+        :param names:
+            A dictionary mapping the attributes to field names as for
+            :meth:`toStructuredArray`. Fields for the errors, distances, and
+            epoch are optional, and are ignored if not present in `arr`.
+        :param copy:
+            If False, float64 fields are used as views into `arr` without
+            copying the data.
+
+        :returns: A :class:`CoordinateArray`
+
+        :except ValueError: If the longitude or latitude field is missing.
+        """
+        fnames = CoordinateArray._fieldNames(coordclass,names)
+        fields = arr.dtype.names or ()
+        for a in ('long','lat'):
+            if fnames[a] not in fields:
+                raise ValueError('field %s not present in array'%fnames[a])
+        kwargs = {}
+        for a in CoordinateArray._structattrs:
+            if fnames[a] in fields:
+                kwargs[a] = arr[fnames[a]]
+        return CoordinateArray(coordclass,copy=copy,**kwargs)
+
+    def convert(self,tosys):
+        """
+        Converts all of these positions to a new coordinate system.  The
+        transformation path and registered transforms are the same as for
+        :meth:`LatLongCoordinates.convert` with individual objects, but the
+        composed 'smatrix' transforms are applied to the whole array as one
+        matrix product. If the positions have different epochs, the matrix for
+        each distinct epoch is computed once and applied as a stack. Steps that
+        are not 'smatrix' transforms, or that may depend on the coordinate
+        values, fall back on converting each position individually.
+
+        :param tosys:
+            The new coordinate system class. Should be a subclass of
+            :class:`LatLongCoordinates` .
+        :returns: A new :class:`CoordinateArray` with `tosys` as its class.
+
+        :except: raises :exc:`NotImplementedError` if converters are not present
+        """
+        if tosys is self.coordclass:
+            return self
+
+        if isinstance(self.epoch,np.ndarray):
+            uepochs,epochidx = np.unique(self.epoch,return_inverse=True)
+        else:
+            uepochs,epochidx = [self.epoch],None
+        epochconvs = []
+        for ep in uepochs:
+            proxy = self.coordclass()
+            if isinstance(proxy,EpochalCoordinates):
+                proxy._epoch = None if ep is None else float(ep)
+            epochconvs.append(proxy._getOptimizedConverters(tosys))
+
+        #the conversion proceeds with either a (lat,long,laterr,longerr) tuple
+        #in radians for the current system or a list of objects
+        latlong = tuple([None if a is None else np.radians(a) for a in
+                         (self.lat,self.long,self.laterr,self.longerr)])
+        currsys = self.coordclass
+        epoch = self.epoch
+        objs = None
+
+        #the sequence of converter types is the same for all epochs
+        for i,conv in enumerate(epochconvs[0]):
+            if objs is None and isinstance(conv,_OptimizerSmatrixer):
+                if epochidx is None:
+                    m = conv.combinedmatrix
+                else:
+                    m = np.array([c[i].combinedmatrix for c in epochconvs])[epochidx]
+                latlong = matrix_rotate_arrays(m,*latlong)
+                #objects created by smatrix transforms have the default epoch
+                currsys = conv.tocls
+                epoch = None
+            else:
+                if objs is None:
+                    objs = CoordinateArray(currsys,np.degrees(latlong[1]),
+                                np.degrees(latlong[0]),_opt_degrees(latlong[3]),
+                                _opt_degrees(latlong[2]),epoch,self.distancepc,
+                                self.distancepcerr).toObjects()
+                objs = [conv(o) for o in objs]
+
+        if objs is not None:
+            res = CoordinateArray.fromObjects(objs,tosys)
+        else:
+            long = _wrap_long(np.degrees(latlong[1]),tosys)
+            res = CoordinateArray(tosys,long,np.degrees(latlong[0]),
+                                  _opt_degrees(latlong[3]),_opt_degrees(latlong[2]),
+                                  None,self.distancepc,self.distancepcerr)
+
+        if issubclass(tosys,EpochalCoordinates):
+            res.epoch = self.epoch
+        return res
+
+def _opt_degrees(val):
+    return None if val is None else np.degrees(val)
+
+def _wrap_long(long,coordclass):
+    longrange = coordclass._longrange_
+    if longrange is not None and longrange[1]-longrange[0] == 360:
+        long = (long - longrange[0]) % 360 + longrange[0]
+    return long
+
+#: Schwarzschild radius of the Sun in AU
+_srs_au = 1.97412574336e-8
+
+def _aberrate(u,v,sundist):
+    """
+    Applies stellar aberration (including the gravitational term for the Sun)
+    to unit vectors `u` for an observer moving at `v` (in units of c) at
+    `sundist` AU from the Sun, following SOFA iauAb. `u` is (...,T,3) and `v`
+    and `sundist` are (T,3) and (T,).
+    """
+    bm1 = np.sqrt(1 - np.sum(v*v,axis=-1))
+    pdv = np.sum(u*v,axis=-1)
+    w1 = 1 + pdv/(1 + bm1)
+    w2 = _srs_au/sundist
+    p = u*bm1[...,None] + w1[...,None]*v + w2[...,None]*(v - pdv[...,None]*u)
+    return p/np.sqrt(np.sum(p*p,axis=-1))[...,None]
+
+def _unaberrate(up,v,sundist,niter=3):
+    """
+    Inverts :func:`_aberrate` by fixed-point iteration.
+    """
+    u = up
+    for i in range(niter):
+        u = u - (_aberrate(u,v,sundist) - up)
+        u = u/np.sqrt(np.sum(u*u,axis=-1))[...,None]
+    return u
+
+def convert_time_series(coords,epochs,tosys,aberration=True,maxmem=2**27):
+    """
+    Converts an array of positions to a new coordinate system at each of a
+    series of times, along the chain :class:`ICRSCoordinates` ->
+    :class:`GCRSCoordinates` -> :class:`CIRSCoordinates` ->
+    :class:`ITRSCoordinates` (or the reverse).  The Earth's position and
+    velocity, the CIO-based precession/nutation matrix, the Earth Rotation Angle
+    and polar motion are computed once for each time, and the resulting
+    rotations are then applied to all of the positions at once.
+    
+    Unlike conversions of the individual coordinate objects, each step of the
+    chain uses the epoch of the time series, and stellar aberration is included
+    (if `aberration` is True) in the ICRS<->GCRS step. Annual parallax is
+    applied if `coords` has distances.  Light deflection is not included.
+    
+    :param coords: 
+        The positions to convert.  If not in one of the systems above, they are
+        first converted to :class:`ICRSCoordinates`.
+    :type coords: :class:`CoordinateArray`
+    :param epochs: The (Julian) epochs at which to compute the positions.
+    :type epochs: scalar or array-like
+    :param tosys: 
+        The system to convert to - one of :class:`ICRSCoordinates`,
+        :class:`GCRSCoordinates`, :class:`CIRSCoordinates`, or
+        :class:`ITRSCoordinates`.
+    :param bool aberration: 
+        If True, stellar aberration due to the Earth's barycentric velocity is
+        applied between ICRS and GCRS.
+    :param int maxmem: 
+        The approximate maximum number of bytes to use for each temporary
+        (positions x times) array - positions are processed in chunks to
+        stay within this limit.
+    
+    :returns: 
+        (long,lat) arrays in degrees for `tosys` with shape (npositions,ntimes)
+        
+    :except ValueError: If `tosys` is not one of the systems listed above.
     
+    """
+    from .ephems import earth_pos_vel
+    from ..obstools import epoch_to_jd
+    from ..constants import c
+    from .funcs import earth_rotation_angle
+    
+    systems = (ICRSCoordinates,GCRSCoordinates,CIRSCoordinates,ITRSCoordinates)
+    if tosys not in systems:
+        raise ValueError('tosys must be ICRS, GCRS, CIRS, or ITRS coordinates')
+    if coords.coordclass not in systems:
+        coords = coords.convert(ICRSCoordinates)
+    i0,i1 = systems.index(coords.coordclass),systems.index(tosys)
+    
+    epochs = np.array(epochs,dtype=float,ndmin=1).ravel()
+    jds = epoch_to_jd(epochs)
+    
+    #per-time quantities
+    if min(i0,i1) == 0 and max(i0,i1) > 0:
+        earthpos,earthvel = earth_pos_vel(jds,True) #barycentric AU
+        earthvel = earthvel/(c*1e-5) #units of c
+        sundist = np.sum(earth_pos_vel(jds,False)[0]**2,axis=1)**0.5
+    
+    M = np.tile(np.eye(3),(epochs.size,1,1))
+    lo,hi = max(min(i0,i1),1),max(i0,i1)
+    if lo <= 1 < hi:
+        M = _matrix_stack_product(CIRSCoordinates._CMatrix(epochs),M)
+    if lo <= 2 < hi:
+        era = np.radians(earth_rotation_angle(jds,degrees=True))
+        W = np.array([ITRSCoordinates._WMatrix(e) for e in epochs])
+        M = _matrix_stack_product(W,_rotation_matrices(era,'z'),M)
+    if i1 < i0:
+        M = M.transpose(0,2,1)
+        
+    lat,long = np.radians(coords.lat),np.radians(coords.long)
+    cb = np.cos(lat)
+    p = np.array((cb*np.cos(long),cb*np.sin(long),np.sin(lat))).T
+    if coords.distancepc is not None and np.any(np.isfinite(coords.distancepc)):
+        from ..constants import auperpc
+        dist = np.where(np.isfinite(coords.distancepc),coords.distancepc*auperpc,np.inf)
+    else:
+        dist = None
+        
+    outlong = np.empty((p.shape[0],epochs.size))
+    outlat = np.empty((p.shape[0],epochs.size))
+    chunk = max(1,maxmem//(epochs.size*3*8))
+    for j in range(0,p.shape[0],chunk):
+        u = np.repeat(p[j:j+chunk,None,:],epochs.size,axis=1)
+        d = None if dist is None else dist[j:j+chunk,None,None]
+        if i0 == 0 and i1 > 0: #ICRS->GCRS
+            if d is not None:
+                u = np.where(np.isfinite(d),u*np.where(np.isfinite(d),d,1)-earthpos,u)
+                u /= np.sqrt(np.sum(u*u,axis=-1))[...,None]
+            if aberration:
+                u = _aberrate(u,earthvel,sundist)
+        u = np.einsum('tij,ntj->nti',M,u)
+        if i1 == 0 and i0 > 0: #GCRS->ICRS
+            if aberration:
+                u = _unaberrate(u,earthvel,sundist)
+            if d is not None:
+                u = np.where(np.isfinite(d),u*np.where(np.isfinite(d),d,1)+earthpos,u)
+                u /= np.sqrt(np.sum(u*u,axis=-1))[...,None]
+        x,y,z = u[...,0],u[...,1],u[...,2]
+        outlat[j:j+chunk] = np.arctan2(z,np.hypot(x,y))
+        outlong[j:j+chunk] = np.arctan2(y,x)
+        
+    return _wrap_long(np.degrees(outlong),tosys),np.degrees(outlat)
+
+
 #<--------------------------Convinience Functions------------------------------>
 
     
@@ -3411,17 +4419,29 @@ def objects_to_coordinate_arrays(posobjs,coords='auto',degrees=True):
     for all coordinate systems except for Equatorial, which will use 'ra,dec'
     
     if `degrees` is True, returned arrays are in degrees, otherwise radians
+    
+    `posobjs` may also be a :class:`CoordinateArray`, in which case the arrays
+    are taken directly from it without creating any objects.
     """
     if coords=='auto':
         coordnames = None
     else:
         coordnames = coords.split(',')
         
+    if isinstance(posobjs,CoordinateArray):
+        if coordnames is None:
+            if issubclass(posobjs.coordclass,EquatorialCoordinatesBase):
+                coordnames = ('ra','dec')
+            else:
+                coordnames = ('lat','long')
+        arrs = [getattr(posobjs,c) for c in coordnames]
+        return np.array(arrs if degrees else np.radians(arrs))
+        
     coords = []
     if degrees:
         for o in posobjs:
             if coordnames is None:
-                if isinstance(o,EquatorialCoordinates):
+                if isinstance(o,EquatorialCoordinatesBase):
                     coords.append((o.ra.d,o.dec.d))
                 else:
                     coords.append((o.lat.d,o.long.d))
@@ -3430,7 +4450,7 @@ def objects_to_coordinate_arrays(posobjs,coords='auto',degrees=True):
     else:
         for o in posobjs:
             if coordnames is None:
-                if isinstance(o,EquatorialCoordinates):
+                if isinstance(o,EquatorialCoordinatesBase):
                     coords.append((o.ra.r,o.dec.r))
                 else:
                     coords.append((o.lat.r,o.long.r))
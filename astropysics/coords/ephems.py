@@ -100,9 +100,14 @@ class EphemerisObject(object):
       instantaneous velocities for the coordinate at the current value of 
       :attr:`jd`.  If this is not implemented, calling it will raise a 
       :exc:`NotImplementedError`.
-    
+
+    * Subclasses may implement a :meth:`_positionArrays` method to compute
+      coordinates for an array of jds without using :attr:`jd` (see
+      :meth:`positions`).  If this is not implemented, :meth:`positions` falls
+      back on :meth:`__call__`.
+
     """
-    
+
     __metaclass__ = ABCMeta
     
     name = '' #put here so it ends up in autogenerated documentation
@@ -255,8 +260,89 @@ class EphemerisObject(object):
             return res[0]
         else:
             return res
-                
-    
+
+    def positions(self,jds,coordarray=False):
+        """
+        Computes the coordinates of this object for an array of julian dates.
+        Unlike :meth:`__call__`, this neither uses nor changes the :attr:`jd`
+        attribute, and for most subclasses the positions are computed for all
+        of the `jds` at once with array operations rather than building one
+        coordinate object per time.
+
+        :param jds: A sequence of julian dates or a scalar JD.
+        :param bool coordarray:
+            If True, the result is returned as a
+            :class:`astropysics.coords.coordsys.CoordinateArray` with one
+            position (and epoch) per JD instead of as a tuple of arrays.
+
+        :returns:
+            If `coordarray` is False, a tuple of contiguous 1D arrays in the
+            same order as `jds` - (x,y,z) if the object's output coordinates
+            are rectangular, or (long,lat) in degrees otherwise.  Otherwise, a
+            :class:`astropysics.coords.coordsys.CoordinateArray`.
+
+        :except ValueError:
+            If `coordarray` is True and the output coordinates have no
+            latitude/longitude equivalent.
+
+        """
+        from .coordsys import RectangularCoordinates
+
+        jds = np.array(jds,dtype=float,ndmin=1).ravel()
+        if self._validrange is not None:
+            from warnings import warn
+            minjd,maxjd = self._validrange
+            if minjd is not None and np.any(jds < minjd):
+                warn('{0} JDs are below the valid range for this EphemerisObject'.format(np.sum(jds < minjd)),EphemerisAccuracyWarning)
+            if maxjd is not None and np.any(jds > maxjd):
+                warn('{0} JDs are above the valid range for this EphemerisObject'.format(np.sum(jds > maxjd)),EphemerisAccuracyWarning)
+
+        coordclass,arrs = self._positionArrays(jds)
+        if coordarray:
+            return _position_arrays_to_coordarray(coordclass,arrs,jds)
+        elif issubclass(coordclass,RectangularCoordinates):
+            return arrs
+        else:
+            return arrs[:2]
+
+    def _positionArrays(self,jds):
+        """
+        Computes the coordinates of the object at each of the `jds` for
+        :meth:`positions`.  Subclasses should override this with a version
+        that does not use :attr:`jd` - the default implementation simply calls
+        :meth:`__call__` and extracts the coordinates from the resulting
+        objects.
+
+        :param jds: A 1D array of julian dates.
+
+        :returns:
+            (coordclass,arrs) where `coordclass` is the coordinate class the
+            positions are in, and `arrs` is (x,y,z) if `coordclass` is a
+            :class:`astropysics.coords.coordsys.RectangularCoordinates`
+            subclass (in AU if the class has units), or (long,lat,distancepc)
+            otherwise, with longitude and latitude in degrees and `distancepc`
+            None if there are no distances.
+        """
+        from .coordsys import RectangularCoordinates
+
+        cs = self(jds)
+        coordclass = cs[0].__class__
+        if issubclass(coordclass,RectangularCoordinates):
+            if hasattr(cs[0],'unit'):
+                for c in cs:
+                    c.unit = 'au'
+            arrs = tuple([np.array([getattr(c,n) for c in cs]) for n in 'xyz'])
+        else:
+            long = np.array([c.long.d for c in cs])
+            lat = np.array([c.lat.d for c in cs])
+            if getattr(cs[0],'distancepc',None) is None:
+                distpc = None
+            else:
+                distpc = np.array([c.distancepc[0] for c in cs])
+            arrs = (long,lat,distpc)
+        return coordclass,arrs
+
+
     @abstractmethod
     def _getCoordObj(self):
         """
@@ -285,7 +371,42 @@ class EphemerisObject(object):
             If velocities are not implemented for this class.
         """
         raise NotImplementedError
-    
+
+def _position_arrays_to_coordarray(coordclass,arrs,jds):
+    """
+    Converts the output of :meth:`EphemerisObject._positionArrays` to a
+    :class:`astropysics.coords.coordsys.CoordinateArray`.  Rectangular
+    coordinates are converted to the matching latitude/longitude system, with
+    the distance from the origin as the position's distance.
+    """
+    from .coordsys import CoordinateArray,RectangularCoordinates,\
+                          RectangularICRSCoordinates,ICRSCoordinates,\
+                          RectangularGCRSCoordinates,GCRSCoordinates,\
+                          EpochalCoordinates
+    from ..constants import aupercm,cmperpc
+    from ..obstools import jd_to_epoch
+
+    if issubclass(coordclass,RectangularCoordinates):
+        llclasses = {RectangularICRSCoordinates:ICRSCoordinates,
+                     RectangularGCRSCoordinates:GCRSCoordinates}
+        if coordclass not in llclasses:
+            raise ValueError('No latitude/longitude system available for %s'%coordclass.__name__)
+        x,y,z = arrs
+        rxy = np.hypot(x,y)
+        long = np.degrees(np.arctan2(y,x))%360
+        lat = np.degrees(np.arctan2(z,rxy))
+        distpc = np.hypot(rxy,z)/(cmperpc*aupercm) #rectangular outputs are in AU
+        coordclass = llclasses[coordclass]
+    else:
+        long,lat,distpc = arrs
+
+    if issubclass(coordclass,EpochalCoordinates):
+        epoch = jd_to_epoch(jds)
+    else:
+        epoch = None
+    return CoordinateArray(coordclass,long,lat,epoch=epoch,distancepc=distpc,
+                           copy=False)
+
 class ProperMotionObject(EphemerisObject):
     """
     An object with linear proper motion relative to a specified epoch.
@@ -371,7 +492,19 @@ class ProperMotionObject(EphemerisObject):
         else:
             return self.coordclass(self.ra,self.dec,distancepc=self.distancepc,
                                            epoch=jd_to_epoch(self.jd))
-            
+
+    def _positionArrays(self,jds):
+        from ..constants import asecperrad,cmperpc,secperyr
+
+        dyr = (jds - self._jd0)/365.25
+        ra = self.ra0 + np.degrees(dyr*self.dra/asecperrad)
+        dec = self.dec0 + np.degrees(dyr*self.ddec/asecperrad)
+        if self.distpc0 is None:
+            distpc = None
+        else:
+            distpc = self.distpc0 + dyr*self.rv*secperyr*1e5/cmperpc
+        return self.coordclass,(ra,dec,distpc)
+
     
 class KeplerianObject(EphemerisObject):
     """
@@ -400,10 +533,10 @@ class KeplerianObject(EphemerisObject):
     """
     
     Etol = None #default set in constructor
-    r""" Desired accuracy for iterative calculation of eccentric anamoly (or
-    true anomaly) from mean anomaly. If None, default tolerance is used
-    (1.5e-8), or if 0, an analytic approximation will be used (:math:`E \approx
-    M + e (1 + e \cos M ) \sin M`). This approximation can be 10x faster to
+    r""" Desired accuracy in radians for iterative calculation of eccentric
+    anamoly (or true anomaly) from mean anomaly. If None, default tolerance is
+    used (1.5e-8), or if 0, an analytic approximation will be used (:math:`E
+    \approx M + e (1 + e \cos M ) \sin M`). This approximation is faster to
     compute but fails for e close to 1.
     """
     
@@ -448,7 +581,7 @@ class KeplerianObject(EphemerisObject):
         
         self.outcoords = kwargs.pop('outcoords',RectangularCoordinates)
         self.outtransfunc = kwargs.pop('outtransfunc',None)
-        self.Etol = kwargs.pop('Etol',23.43928)
+        self.Etol = kwargs.pop('Etol',None)
         
         
         kwnms = ('a','e','i','Lan','L','Lp','ap','M')
@@ -592,22 +725,13 @@ class KeplerianObject(EphemerisObject):
         Eccentric anamoly in degrees - calculated from mean anamoly with
         accuracy given by :attr:`Etol`.
         """
-        from math import radians,sin,cos,degrees,pi
-        from scipy.optimize import fsolve
-        
+        from math import radians,degrees
+
         M = radians((self.M + 180)%360 - 180)
-        e = self.e #radians
-        E0 = M + e*sin(M)*(1.0 + e*cos(M))
-        
-        if self.Etol==0:
-            Er = E0
-        elif self.Etol is None:
-            Er = fsolve(KeplerianObject._keplerEq,E0,args=(M,e))[0]
-        else:
-            Er = fsolve(KeplerianObject._keplerEq,E0,args=(M,e),xtol=self.Etol)[0]
-        
+        Er = _kepler_eccentric_anomaly(M,self.e,self.Etol)
+
         return degrees(Er)%360
-    
+
     @property
     def nu(self):
         r"""
@@ -693,9 +817,49 @@ class KeplerianObject(EphemerisObject):
         #add epoch info if coordinates have an epoch
         if hasattr(res,'epoch'):
             res.epoch = jd_to_epoch(self.jd)
-            
+
         return res
-    
+
+    def _elementArrays(self,T):
+        """
+        Computes the orbital elements for an array of times. Callable orbital
+        elements must accept arrays of T for this to work.
+
+        :param T: Array of Julian centuries from J2000.
+
+        :returns: a,e,i,Lan,ap,M with angles in degrees.
+        """
+        a = self._a(T)
+        e = self._e(T)
+        i = self._i(T)
+        Lan = self._Lan(T)
+        if hasattr(self,'_M'):
+            ap = self._ap(T)
+            M = self._M(T)
+        else:
+            Lp = self._Lp(T)
+            ap = Lp - Lan
+            M = self._L(T) - Lp
+            if hasattr(self,'_bcsf'):
+                b,c,s,f = self._bcsf
+                M = M + b*T*T + c*np.cos(f*T) + s*np.sin(f*T)
+        return a,e,i,Lan,ap,M
+
+    def _positionArrays(self,jds):
+        from ..obstools import jd2000
+
+        a,e,i,Lan,ap,M = self._elementArrays((jds - jd2000)/36525.)
+        E = _kepler_eccentric_anomaly(np.radians((M + 180)%360 - 180),e,self.Etol)
+        x,y,z = _orbit_to_rectangular(a,e,np.radians(i),np.radians(Lan),
+                                      np.radians(ap),E)
+
+        if self.outtransfunc:
+            x,y,z = self.outtransfunc(x,y,z,jds)
+        #constant elements give scalars, so broadcast up to the jds
+        x,y,z = [np.ascontiguousarray(np.broadcast_arrays(c,jds)[0],dtype=float)
+                 for c in (x,y,z)]
+        return self.outcoords,(x,y,z)
+
     def getPhase(self,viewobj='Earth',illumobj='Sun'):
         """
         Computes the phase of this object. The phase is computed as viwed from
@@ -752,7 +916,594 @@ class KeplerianObject(EphemerisObject):
         s = sqrt(xs*xs+ys*ys+zs*zs)
         
         return (1+(r*r + R*R - s*s)/(2*r*R))/2
-    
+
+def _kepler_eccentric_anomaly(M,e,Etol=None,maxiter=50):
+    r"""
+    Solves Kepler's equation for the eccentric anomaly given arrays of mean
+    anomalies and eccentricities.  Halley's method is applied to all elements
+    at once, and each element is dropped from the iteration once its last
+    correction is smaller than `Etol`.  Because the convergence is cubic, the
+    remaining error is then much less than `Etol`.
+
+    Iteration starts from :math:`E_0 = M + 0.85 e \, {\rm sign}(\sin M)`
+    (Danby 1988) for e > 0.8 so that high eccentricity orbits still converge
+    in a few steps.
+
+    :param M: Mean anomaly in radians.
+    :param e: Eccentricity - must satisfy 0 <= e < 1.
+    :param Etol:
+        Tolerance in radians, or None to use the default of 1.5e-8.  If 0,
+        the analytic approximation described in :attr:`KeplerianObject.Etol` is
+        returned.
+    :param int maxiter: The maximum number of iterations.
+
+    :returns: The eccentric anomaly in radians as an array.
+
+    :except ValueError: If any of the eccentricities are not in [0,1).
+    """
+    M,e = np.broadcast_arrays(np.array(M,dtype=float),np.array(e,dtype=float))
+    if np.any(e < 0) or np.any(e >= 1):
+        raise ValueError('Eccentricities must be in [0,1) to solve for E')
+    shape = M.shape
+    M = M.ravel()
+    e = e.ravel()
+
+    sM = np.sin(M)
+    E = M + e*sM*(1.0 + e*np.cos(M))
+    if Etol==0:
+        return E.reshape(shape)
+    if Etol is None:
+        Etol = 1.5e-8
+
+    hie = e > 0.8
+    E[hie] = M[hie] + 0.85*e[hie]*np.sign(sM[hie])
+
+    idx = np.arange(E.size)
+    for i in range(maxiter):
+        Ei,ei = E[idx],e[idx]
+        esE = ei*np.sin(Ei)
+        f = Ei - esE - M[idx]
+        fp = 1 - ei*np.cos(Ei)
+        dE = -f/fp
+        dE = -f/(fp + dE*esE/2)
+        E[idx] = Ei + dE
+        idx = idx[np.abs(dE) > Etol]
+        if idx.size == 0:
+            break
+    else:
+        from warnings import warn
+        warn('Eccentric anomaly did not converge to {0} for {1} elements'.format(Etol,idx.size),EphemerisAccuracyWarning)
+
+    return E.reshape(shape)
+
+def _orbit_to_rectangular(a,e,i,Lan,ap,E):
+    """
+    Computes rectangular coordinates in the reference plane from orbital
+    elements. All inputs can be arrays, and angles are in radians.
+
+    :returns: x,y,z in the units of `a`.
+    """
+    #orbital plane coordinates
+    xp = a*(np.cos(E)-e)
+    yp = a*np.sqrt(1-e*e)*np.sin(E)
+
+    cw,sw = np.cos(ap),np.sin(ap)
+    co,so = np.cos(Lan),np.sin(Lan)
+    ci,si = np.cos(i),np.sin(i)
+
+    x = (cw*co-sw*so*ci)*xp + (-sw*co - cw*so*ci)*yp
+    y = (cw*so+sw*co*ci)*xp + (-sw*so + cw*co*ci)*yp
+    z = (sw*si)*xp + (cw*si)*yp
+
+    return x,y,z
+
+_gauss_k = 0.01720209895 #Gaussian gravitational constant in rad/day
+
+class KeplerianEnsemble(object):
+    """
+    Orbital elements for many bodies (e.g. an asteroid or comet orbit catalog)
+    stored as arrays, so that positions for all of the bodies can be computed
+    at once.
+
+    Each orbital element is given as an array with one entry per body, or as
+    an array of shape (nbodies,k) with polynomial coefficients of T (Julian
+    centuries from J2000) in increasing power, as for
+    :class:`KeplerianObject`.  Osculating elements such as those in the Minor
+    Planet Center orbit files can be used by giving the mean anomaly `M` at
+    `epoch` - the mean anomaly then advances at the mean motion `n`.
+
+    Elements are relative to the ecliptic and equinox of J2000, with the Sun
+    at the origin.  Positions are output in AU, either heliocentric or
+    geocentric (see :meth:`positions`).
+    """
+
+    def __init__(self,a,e,i,Lan,ap=None,M=None,L=None,Lp=None,epoch=None,
+                      n=None,names=None,Etol=None):
+        """
+        The orbital elements :attr:`a`, :attr:`e`, :attr:`i`, and :attr:`Lan`
+        must be specified, as must either `L` and `Lp` or `ap` and `M`. Angles
+        are in degrees and `a` is in AU.
+
+        :param epoch:
+            The JD (or an array with a JD for each body) at which `M` (or `L`)
+            is given.  If None, the elements are not advanced by the mean
+            motion, so any motion must be in the polynomial coefficients.
+        :param n:
+            The mean motion in degrees per day, either a scalar or one per
+            body.  If None, it is computed from `a` assuming a massless body
+            orbiting the Sun.  Ignored if `epoch` is None.
+        :param names: A sequence of names for the bodies or None.
+        :param Etol:
+            Tolerance for eccentric anomaly (see :attr:`KeplerianObject.Etol`).
+
+        :except TypeError: If necessary orbital elements are missing.
+        :except ValueError: If the element arrays do not have matching lengths.
+        """
+        from ..obstools import jd2000
+
+        for nm,val in (('a',a),('e',e),('i',i),('Lan',Lan)):
+            if val is None:
+                raise TypeError('Need to provide orbital element `%s`'%nm)
+        if L is not None and Lp is not None:
+            if ap is not None or M is not None:
+                raise TypeError('Cannot specify both `L`/`Lp` and `ap`/`M`')
+            elems = (a,e,i,Lan,L,Lp)
+        elif ap is not None and M is not None:
+            if L is not None or Lp is not None:
+                raise TypeError('Cannot specify both `L`/`Lp` and `ap`/`M`')
+            elems = (a,e,i,Lan,ap,M)
+        else:
+            raise TypeError('Need to provide either `L` and `Lp` or `ap` and `M`')
+
+        elems = [np.array(el,dtype=float) for el in elems]
+        nbodies = set([len(el) for el in elems if el.ndim > 0])
+        if len(nbodies) != 1:
+            raise ValueError('orbital element arrays must all have the same length')
+        self._nbodies = nbodies.pop()
+        elems = [self._makeElementArray(el) for el in elems]
+
+        if epoch is not None:
+            #fold the mean motion into the polynomial for M (or L)
+            if n is None:
+                n = np.degrees(_gauss_k)*elems[0][:,0]**-1.5
+            n = np.array(n,dtype=float)*np.ones(self._nbodies)
+            dt = jd2000 - np.array(epoch,dtype=float)
+            mi = 4 if L is not None else 5 #index of L or M
+            if elems[mi].shape[1] < 2:
+                pad = np.zeros((self._nbodies,2-elems[mi].shape[1]))
+                elems[mi] = np.hstack((elems[mi],pad))
+            elems[mi][:,0] += n*dt
+            elems[mi][:,1] += n*36525.
+
+        if L is not None:
+            self._a,self._e,self._i,self._Lan,self._L,self._Lp = elems
+            self._useL = True
+        else:
+            self._a,self._e,self._i,self._Lan,self._ap,self._M = elems
+            self._useL = False
+
+        self.names = None if names is None else list(names)
+        self.Etol = Etol
+
+    def _makeElementArray(self,val):
+        """
+        Converts an element to an (nbodies,k) array of polynomial coefficients.
+        """
+        if val.ndim < 2:
+            return (val*np.ones(self._nbodies)).reshape(self._nbodies,1)
+        elif val.ndim == 2:
+            return val.copy()
+        else:
+            raise ValueError('invalid shape for orbital element array %s'%(val.shape,))
+
+    @staticmethod
+    def _polyEval(coeffs,T):
+        """
+        Evaluates (nbodies,k) polynomial coefficients at the times `T`, giving
+        an (nbodies,len(T)) array.
+        """
+        res = coeffs[:,-1:]*np.ones(T.size)
+        for j in range(coeffs.shape[1]-2,-1,-1):
+            res *= T
+            res += coeffs[:,j:j+1]
+        return res
+
+    def __len__(self):
+        return self._nbodies
+
+    def elements(self,jds):
+        """
+        Computes the orbital elements of all the bodies.
+
+        :param jds: A sequence of julian dates or a scalar JD.
+
+        :returns:
+            a,e,i,Lan,ap,M as arrays of shape (nbodies,len(jds)), with angles
+            in degrees.
+        """
+        from ..obstools import jd2000
+
+        T = (np.array(jds,dtype=float,ndmin=1).ravel() - jd2000)/36525.
+        ev = self._polyEval
+        a,e,i,Lan = [ev(el,T) for el in (self._a,self._e,self._i,self._Lan)]
+        if self._useL:
+            Lp = ev(self._Lp,T)
+            ap = Lp - Lan
+            M = ev(self._L,T) - Lp
+        else:
+            ap = ev(self._ap,T)
+            M = ev(self._M,T)
+        return a,e,i,Lan,ap,M
+
+    def positions(self,jds,geocentric=False,coordarray=False):
+        """
+        Computes the positions of all of the bodies at the specified time(s).
+
+        :param jds: A sequence of julian dates or a scalar JD.
+        :param bool geocentric:
+            If True, the positions are relative to the Earth and in the GCRS
+            (as for the planets from :func:`get_solar_system_ephems`).
+            Otherwise, they are heliocentric with the axes aligned to the ICRS.
+            Note that these are *not* ICRS coordinates, as the origin is the
+            Sun rather than the solar system barycenter.
+        :param bool coordarray:
+            If True, the result is returned as a
+            :class:`astropysics.coords.coordsys.CoordinateArray` of
+            :class:`astropysics.coords.coordsys.GCRSCoordinates`.  Only
+            allowed if `geocentric` is True.
+
+        :returns:
+            If `coordarray` is False, (x,y,z) in AU, as arrays of shape
+            (nbodies,len(jds)), or (nbodies,) if `jds` is a scalar. Otherwise,
+            a :class:`astropysics.coords.coordsys.CoordinateArray` ordered by
+            body and then by time.
+
+        :except ValueError:
+            If `coordarray` is True and `geocentric` is False, as there is no
+            heliocentric coordinate system.
+        """
+        from .coordsys import RectangularGCRSCoordinates
+
+        if coordarray and not geocentric:
+            raise ValueError('heliocentric positions cannot be returned as a CoordinateArray')
+
+        scalar = np.isscalar(jds) or np.shape(jds)==()
+        jds = np.array(jds,dtype=float,ndmin=1).ravel()
+
+        a,e,i,Lan,ap,M = self.elements(jds)
+        E = _kepler_eccentric_anomaly(np.radians((M + 180)%360 - 180),e,self.Etol)
+        x,y,z = _orbit_to_rectangular(a,e,np.radians(i),np.radians(Lan),
+                                      np.radians(ap),E)
+        if geocentric:
+            x,y,z = _ecl_to_gcrs(x,y,z,jds)
+        else:
+            x,y,z = _ecl_to_icrs(x,y,z,jds)
+
+        if coordarray:
+            arrs = (x.ravel(),y.ravel(),z.ravel())
+            return _position_arrays_to_coordarray(RectangularGCRSCoordinates,arrs,
+                                                  np.tile(jds,self._nbodies))
+        elif scalar:
+            return x[:,0],y[:,0],z[:,0]
+        else:
+            return x,y,z
+
+    def getObject(self,idx):
+        """
+        Generates a :class:`KeplerianObject` for one of the bodies, with
+        geocentric GCRS output coordinates.
+
+        :param int idx: The index of the body.
+
+        :returns: A :class:`KeplerianObject`.
+        """
+        from .coordsys import RectangularGCRSCoordinates
+
+        if self.names is None:
+            name = str(idx)
+        else:
+            name = self.names[idx]
+        kw = {'name':name,'outcoords':RectangularGCRSCoordinates,
+              'outtransfunc':_ecl_to_gcrs,'Etol':self.Etol}
+        if self._useL:
+            elnms = ('a','e','i','Lan','L','Lp')
+        else:
+            elnms = ('a','e','i','Lan','ap','M')
+        for nm in elnms:
+            coeffs = getattr(self,'_'+nm)[idx]
+            kw[nm] = tuple(coeffs) if coeffs.size > 1 else (coeffs[0],0)
+        return KeplerianObject(**kw)
+
+class ChebyshevEphemeris(EphemerisObject):
+    """
+    A cached version of another :class:`EphemerisObject`, with the positions
+    represented by piecewise Chebyshev polynomials (in the style of the JPL DE
+    ephemeris files).  The positions of the original object are fit over a
+    range of julian dates with equal-length segments, and the segments are
+    shortened until the fit matches the original object to a requested
+    tolerance.  Later positions are then computed by evaluating a polynomial,
+    which is much faster than most of the models in this module.
+
+    The coefficients can be saved to a file with :meth:`save` and re-loaded
+    with :meth:`load`, or the `fn` argument of the constructor can be used to
+    do this automatically.
+    """
+
+    _fileversion = 1
+
+    def __init__(self,ephobj,jdrange,tol=1e-9,degree=13,segdays=32,fn=None):
+        """
+        :param ephobj: The :class:`EphemerisObject` to fit.
+        :param jdrange:
+            The range of julian dates to fit as (minjd,maxjd). Positions
+            outside this range cannot be computed.
+        :param float tol:
+            The maximum difference between the fit and `ephobj` in AU (or in
+            the units of `ephobj`'s coordinates if they have no units). For
+            latitude/longitude coordinates without distances, the tolerance is
+            on the unit sphere, i.e. in radians.
+        :param int degree: The degree of the Chebyshev polynomials.
+        :param float segdays:
+            The initial length of segments in days - segments are halved until
+            the fit reaches the requested tolerance.
+        :param fn:
+            A file name to use as a cache of the coefficients, or None to not
+            use a file.  If the file exists and was generated with the same
+            object name, range, tolerance, and degree, the coefficients are
+            loaded from the file instead of fitting `ephobj`. Otherwise, the
+            fit is done and saved to this file.
+
+        :except ValueError: If `jdrange` is empty.
+        """
+        import os
+
+        jd0,jd1 = float(jdrange[0]),float(jdrange[1])
+        if not jd1 > jd0:
+            raise ValueError('jdrange must have maxjd > minjd')
+
+        EphemerisObject.__init__(self,ephobj.name,(jd0,jd1))
+        if not jd0 <= self.jd <= jd1:
+            self.jd = jd0
+        self.tol = tol
+        self.degree = degree
+
+        if fn is not None and os.path.exists(fn):
+            try:
+                self._loadCoeffs(fn,True)
+                return
+            except (IOError,ValueError,KeyError):
+                pass #invalid or mismatched cache file - re-fit and overwrite it
+
+        self._fit(ephobj,jd0,jd1,segdays)
+        if fn is not None:
+            self.save(fn)
+
+    def _fit(self,ephobj,jd0,jd1,segdays):
+        from warnings import warn
+
+        n = self.degree + 1
+        #Chebyshev nodes and the matrix that turns values at them into coefficients
+        k = np.arange(n) + 0.5
+        nodes = np.cos(np.pi*k/n)[::-1]
+        coeffmat = np.cos(np.pi*np.outer(k[::-1],np.arange(n))/n)*(2/n)
+        coeffmat[:,0] /= 2
+        #test at the ends and midway between the nodes, where errors are largest
+        tests = np.concatenate(([-1],(nodes[1:] + nodes[:-1])/2,[1]))
+
+        nseg = max(int(np.ceil((jd1 - jd0)/segdays)),1)
+        maxsegs = int(np.ceil((jd1 - jd0)*24)) #one hour segments
+        while True:
+            seglen = (jd1 - jd0)/nseg
+            segstarts = jd0 + seglen*np.arange(nseg)
+            jds = (segstarts[:,np.newaxis] + seglen*(nodes + 1)/2).ravel()
+            coordclass,arrs = ephobj._positionArrays(jds)
+            vals,latlong,hasdist = self._toRectangular(coordclass,arrs)
+            #vals is (3,nseg*n) -> coeffs are (nseg,3,n)
+            vals = vals.reshape(3,nseg,n).transpose(1,0,2)
+            coeffs = np.dot(vals,coeffmat)
+
+            self._coeffs = coeffs
+            self._jd0,self._jd1,self._seglen = jd0,jd1,seglen
+            self.coordclass = coordclass
+            self._latlong,self._hasdist = latlong,hasdist
+
+            testjds = (segstarts[:,np.newaxis] + seglen*(tests + 1)/2).ravel()
+            testjds = testjds[testjds <= jd1]
+            truevals = self._toRectangular(*ephobj._positionArrays(testjds))[0]
+            fitvals = self._evaluate(testjds)
+            maxerr = np.max(np.abs(truevals - fitvals))
+            if maxerr <= self.tol:
+                break
+            elif nseg*2 > maxsegs:
+                warn('Chebyshev fit for {0} only reached tolerance {1}'.format(self.name,maxerr),EphemerisAccuracyWarning)
+                break
+            nseg *= 2
+
+    @staticmethod
+    def _toRectangular(coordclass,arrs):
+        """
+        Converts :meth:`EphemerisObject._positionArrays` output to a (3,N) array
+        to fit, along with flags for lat/long coordinates and for distances.
+        """
+        from .coordsys import RectangularCoordinates
+
+        if issubclass(coordclass,RectangularCoordinates):
+            return np.array(arrs),False,True
+        long,lat,dist = arrs
+        long,lat = np.radians(long),np.radians(lat)
+        r = 1 if dist is None else dist
+        xyz = np.array((r*np.cos(lat)*np.cos(long),r*np.cos(lat)*np.sin(long),
+                        r*np.sin(lat)*np.ones_like(long)))
+        return xyz,True,dist is not None
+
+    def _evaluate(self,jds,deriv=False):
+        """
+        Evaluates the Chebyshev polynomials, giving a (3,len(jds)) array.  If
+        `deriv` is True, the derivatives with respect to JD are given instead.
+        """
+        nseg,ncomp,n = self._coeffs.shape
+        segidx = np.clip(((jds - self._jd0)//self._seglen).astype(int),0,nseg-1)
+        x = 2*(jds - self._jd0 - segidx*self._seglen)/self._seglen - 1
+
+        #Chebyshev polynomials T_k(x) from the recurrence relation
+        T = np.empty((n,x.size))
+        T[0] = 1
+        if n > 1:
+            T[1] = x
+        for k in range(2,n):
+            T[k] = 2*x*T[k-1] - T[k-2]
+        if not deriv:
+            return np.einsum('ick,ki->ci',self._coeffs[segidx],T)
+
+        #dT_k/dx = k U_{k-1}(x), with U the polynomials of the second kind
+        U = np.empty((n,x.size))
+        U[0] = 1
+        if n > 1:
+            U[1] = 2*x
+        for k in range(2,n):
+            U[k] = 2*x*U[k-1] - U[k-2]
+        dT = np.zeros((n,x.size))
+        dT[1:] = np.arange(1,n)[:,np.newaxis]*U[:-1]
+        #dx/djd = 2/seglen
+        return np.einsum('ick,ki->ci',self._coeffs[segidx],dT)*(2/self._seglen)
+
+    def _positionArrays(self,jds):
+        if np.any(jds < self._jd0) or np.any(jds > self._jd1):
+            raise ValueError('JDs outside of the range {0}-{1} of the Chebyshev fit'.format(self._jd0,self._jd1))
+        x,y,z = self._evaluate(jds)
+        if not self._latlong:
+            return self.coordclass,(x,y,z)
+
+        rxy = np.hypot(x,y)
+        long = np.degrees(np.arctan2(y,x))%360
+        lat = np.degrees(np.arctan2(z,rxy))
+        dist = np.hypot(rxy,z) if self._hasdist else None
+        return self.coordclass,(long,lat,dist)
+
+    def getVelocity(self,jd=None,kms=True):
+        """
+        Computes the velocity from the derivative of the Chebyshev polynomials.
+        This is only available if the fit object has rectangular coordinates
+        (in AU).
+
+        :params jd:
+            The julian date at which to compute the velocity, an array of
+            julian dates, or None to use the :attr:`jd` attribute.
+        :params bool kms:
+            If True, velocities are returned in km/s, otherwise AU/yr.
+
+        :returns:
+            vx,vy,vz in km/s if `kms` is True, otherwise AU/yr.  If `jd` is an
+            array, an (N,3) array of velocities is returned.
+
+        :except NotImplementedError:
+            If the fit object has latitude/longitude coordinates.
+        :except ValueError: If `jd` is outside the range of the fit.
+        """
+        from ..constants import aupercm,secperyr
+
+        if self._latlong:
+            raise NotImplementedError('Chebyshev velocities are only available for rectangular coordinates')
+
+        jds = np.array(self.jd if jd is None else jd,dtype=float)
+        jdarr = jds.ravel()
+        if np.any(jdarr < self._jd0) or np.any(jdarr > self._jd1):
+            raise ValueError('JDs outside of the range {0}-{1} of the Chebyshev fit'.format(self._jd0,self._jd1))
+
+        vel = self._evaluate(jdarr,True).T*365.25 #AU/day -> AU/yr
+        if kms:
+            #AU/yr*(   km/AU  *  yr/sec ) = km/sec
+            vel *= (1e-5/aupercm/secperyr)
+        return vel[0] if jds.shape == () else vel
+
+    def _getCoordObj(self):
+        from ..obstools import jd_to_epoch
+
+        arrs = self._positionArrays(np.array([self.jd],dtype=float))[1]
+        if self._latlong:
+            long,lat,dist = [None if a is None else a[0] for a in arrs]
+            res = self.coordclass(long,lat,distancepc=dist)
+        else:
+            res = self.coordclass(*[a[0] for a in arrs])
+            if hasattr(res,'unit'):
+                res.unit = None #convention is that None implies not to do conversions
+                res.unit = 'au'
+        if hasattr(res,'epoch'):
+            res.epoch = jd_to_epoch(self.jd)
+        return res
+
+    def save(self,fn):
+        """
+        Saves the Chebyshev coefficients to a file in numpy .npz format.
+
+        :param fn: The file name to save to.
+        """
+        import os
+
+        d = dict(coeffs=self._coeffs,jdrange=np.array((self._jd0,self._jd1)),
+                 tol=np.array(self.tol),degree=np.array(self.degree),
+                 name=np.array(self.name),version=np.array(self._fileversion),
+                 coordclass=np.array(self.coordclass.__name__),
+                 flags=np.array((self._latlong,self._hasdist)))
+        #write to a temporary file and rename so that other processes never see
+        #a partially-written file
+        tmpfn = '%s.%i.tmp'%(fn,os.getpid())
+        with open(tmpfn,'wb') as f:
+            np.savez(f,**d)
+        os.rename(tmpfn,fn)
+
+    @staticmethod
+    def load(fn):
+        """
+        Loads a :class:`ChebyshevEphemeris` from a file created with
+        :meth:`save`.
+
+        :param fn: The file name to load.
+
+        :returns: A :class:`ChebyshevEphemeris` object.
+        """
+        obj = ChebyshevEphemeris.__new__(ChebyshevEphemeris)
+        obj._loadCoeffs(fn,False)
+        return obj
+
+    def _loadCoeffs(self,fn,check):
+        """
+        Loads the coefficients from `fn`, and if `check` is True, raises a
+        ValueError if the file does not match this object's settings.
+        """
+        from . import coordsys
+
+        npz = np.load(fn)
+        try:
+            jd0,jd1 = npz['jdrange']
+            name = str(npz['name'])
+            tol = float(npz['tol'])
+            degree = int(npz['degree'])
+            if int(npz['version']) != self._fileversion:
+                raise ValueError('Chebyshev ephemeris file version mismatch')
+            if check:
+                if (name,tol,degree) != (self.name,self.tol,self.degree) or \
+                   (jd0,jd1) != self.validjdrange:
+                    raise ValueError('Chebyshev ephemeris file does not match')
+            else:
+                EphemerisObject.__init__(self,name,(jd0,jd1))
+                if not jd0 <= self.jd <= jd1:
+                    self.jd = jd0
+                self.tol = tol
+                self.degree = degree
+            coeffs = npz['coeffs']
+            coordclass = getattr(coordsys,str(npz['coordclass']))
+            latlong,hasdist = npz['flags']
+        finally:
+            npz.close()
+
+        nseg = coeffs.shape[0]
+        self._coeffs = coeffs
+        self._jd0,self._jd1,self._seglen = jd0,jd1,(jd1 - jd0)/nseg
+        self.coordclass = coordclass
+        self._latlong,self._hasdist = bool(latlong),bool(hasdist)
+
+
 def get_solar_system_ephems(objname,jds=None,coordsys=None):
     """
     Retrieves an :class:`EphemerisObject` object or computes the coordinates for
@@ -799,18 +1550,71 @@ def list_solar_system_objects():
     return _ss_ephems.keys()
 
 _ss_ephems = {}
-def set_solar_system_ephem_method(meth=None):
+def set_solar_system_ephem_method(meth=None,jdrange=None,tol=1e-9,cachedir=None):
     """
-    Sets the type of ephemerides to use.  Must be 'keplerian' for now.
+    Sets the type of ephemerides to use.
+
+    :param meth:
+        The method to use. 'keplerian' (or None) uses Keplerian orbits for the
+        planets (see :class:`KeplerianObject`). 'chebyshev' uses the same
+        models, but fits them with Chebyshev polynomials over `jdrange` (see
+        :class:`ChebyshevEphemeris`), so that later evaluation is fast. This
+        fit takes a few seconds unless it is loaded from `cachedir`.
+    :param jdrange:
+        The range of julian dates to fit as (minjd,maxjd) for the 'chebyshev'
+        method, or None to use 1950-2050. Ignored for 'keplerian'.
+    :param float tol:
+        The tolerance of the Chebyshev fits in AU. Ignored for 'keplerian'.
+    :param cachedir:
+        A directory to store the Chebyshev coefficients in, True to use the
+        astropysics data directory (see
+        :func:`astropysics.config.get_data_dir`), or None to not store them.
+        Ignored for 'keplerian'.
+
+    :except ValueError: If `meth` is not a valid method.
     """
     global _ss_ephems
     
     if meth is None:
         meth = 'keplerian'
     if meth=='keplerian':
-        _ss_ephems = _keplerian_ephems()
+        ephs = _keplerian_ephems()
+    elif meth=='chebyshev':
+        import os
+        from ..obstools import calendar_to_jd
+
+        if jdrange is None:
+            jdrange = (calendar_to_jd((1950,1,1)),calendar_to_jd((2050,1,1)))
+        if cachedir is True:
+            from ..config import get_data_dir
+            cachedir = os.path.join(get_data_dir(),'ephemcache')
+        if cachedir is not None and not os.path.isdir(cachedir):
+            os.mkdir(cachedir)
+
+        def cachefn(name,tol):
+            if cachedir is None:
+                return None
+            fnbase = '%s-%.1f-%.1f-%g.npz'%(name,jdrange[0],jdrange[1],tol)
+            return os.path.join(cachedir,fnbase)
+
+        #Evaluating the Earth series is much slower than the Keplerian orbits,
+        #so the planets are fit using a (more accurate) fit for the Earth
+        earth = ChebyshevEphemeris(Earth(),jdrange,tol/10,fn=cachefn('Earth',tol/10))
+        def ecl_to_gcrs(x,y,z,jd):
+            xp,yp,zp = _ecl_to_icrs(x,y,z,jd)
+            xe,ye,ze = earth.positions(jd)
+            return xp-xe,yp-ye,zp-ze
+
+        ephs = _keplerian_ephems()
+        ephs['Moon'] = Moon()
+        for n,eobj in ephs.items():
+            if eobj.outtransfunc is _ecl_to_gcrs:
+                eobj.outtransfunc = ecl_to_gcrs
+            ephs[n] = ChebyshevEphemeris(eobj,jdrange,tol,fn=cachefn(n,tol))
+        ephs['Earth'] = earth
     else:
-        raise ValueError('Solar System ephemerides method %s not available'%s)
+        raise ValueError('Solar System ephemerides method %s not available'%meth)
+    _ss_ephems = ephs
 
     #Add in Simon 94 Moon and SOFA earth pv if needed
     if 'Moon' not in _ss_ephems:
@@ -923,80 +1727,98 @@ def _load_earth_series(datafn='earth_series.tab'):
     """
     Load series terms from VSOP2000 simplified solution
     """
-    from ..utils.io import get_package_data
-    from numpy import array,matrix
+    from ..utils.io import get_package_data_arrays
+    from numpy import array,asmatrix
     from math import sqrt
     
-    lines = [l for l in get_package_data(datafn).split('\n') if not l.startswith('#') if not l=='']
-    
-    lst = None
-    lsts = {}
-    for l in lines:
-        if l.endswith(':'):
-            #new variable
-            lsts[l[:-1]] = lst = []
-        else:
-            ls = l.split(',')
-            if ls[-1]=='':
-                lst.extend(ls[:-1])
+    def parser(content):
+        lines = [l for l in content.split('\n') if not l.startswith('#') if not l=='']
+        
+        lst = None
+        lsts = {}
+        for l in lines:
+            if l.endswith(':'):
+                #new variable
+                lsts[l[:-1]] = lst = []
             else:
-                lst.extend(ls)
-                
-                
-    res = {}
+                ls = l.split(',')
+                if ls[-1]=='':
+                    lst.extend(ls[:-1])
+                else:
+                    lst.extend(ls)
+                    
+                    
+        res = {}
+        
+        #first add all matricies
+        for k,v in lsts.items():
+            if k.endswith('mat'):
+                mat = array(v,dtype=float)
+                n = int(round(sqrt(mat.size)))
+                res[k] = mat.reshape(n,n)
+        
+        #now construct all the x,y,z combination series'
+        coeffnms = set([k[:-1] for k in lsts.keys() if not k.endswith('mat')])
+            
+        #bad any coeff sets where x,y, and z don't match so that the missing entries are 0
+        for cnm in coeffnms:
+            xs = lsts[cnm+'x']
+            ys = lsts[cnm+'y']
+            zs = lsts[cnm+'z']
+            mx = max(max(len(xs),len(ys)),len(zs))
+            
+            if len(xs)<mx:
+                for i in range(mx-len(xs)):
+                    xs.append(0)
+            if len(ys)<mx:
+                for i in range(mx-len(ys)):
+                    ys.append(0)
+            if len(zs)<mx:
+                for i in range(mx-len(zs)):
+                    zs.append(0)
+                    
+            res[cnm+'coeffs'] = array([xs,ys,zs],dtype=float)
+        
+        return res
     
-    #first add all matricies
-    for k,v in lsts.items():
+    res = get_package_data_arrays(datafn,parser)
+    for k in res:
         if k.endswith('mat'):
-            mat = matrix(v,dtype=float)
-            res[k] = mat.reshape(sqrt(mat.size),sqrt(mat.size))
-    
-    #now construct all the x,y,z combination series'
-    coeffnms = set([k[:-1] for k in lsts.keys() if not k.endswith('mat')])
-        
-    #bad any coeff sets where x,y, and z don't match so that the missing entries are 0
-    for cnm in coeffnms:
-        xs = lsts[cnm+'x']
-        ys = lsts[cnm+'y']
-        zs = lsts[cnm+'z']
-        mx = max(max(len(xs),len(ys)),len(zs))
-        
-        if len(xs)<mx:
-            for i in range(mx-len(xs)):
-                xs.append(0)
-        if len(ys)<mx:
-            for i in range(mx-len(ys)):
-                ys.append(0)
-        if len(zs)<mx:
-            for i in range(mx-len(zs)):
-                zs.append(0)
-                
-        res[cnm+'coeffs'] = array([xs,ys,zs],dtype=float)
-    
+            res[k] = asmatrix(res[k])
     return res
     
-_earth_series_coeffs = _load_earth_series()
+_earth_series_coeffs = None
+def _get_earth_series_coeffs():
+    """
+    Returns the earth series coefficients, loading them on first use.
+    """
+    global _earth_series_coeffs
+    if _earth_series_coeffs is None:
+        _earth_series_coeffs = _load_earth_series()
+    return _earth_series_coeffs
 
 def _compute_earth_series(t,coeffs0,coeffs1,coeffs2):
     """
     Internal function to computes Earth location/velocity components from series
     coefficients.
     
-    :param t:  T = JD - JD_J2000
+    :param t:  T = JD - JD_J2000 as a scalar or 1D array
     :param coeffs0: constant term
     :param coeffs1: T^1 term
     :param coeffs2: T^2 term
     
-    :returns: pos,vel
+    :returns: pos,vel as 3-arrays, or (N,3) arrays if `t` is an array
     """
+    #broadcast times against the (3,nterms) coefficient arrays
+    t = np.asarray(t)[...,np.newaxis,np.newaxis]
     
     #T^0 terms
     acs = coeffs0[:,0::3]
     bcs = coeffs0[:,1::3]
     ccs = coeffs0[:,2::3]
     ps = bcs + ccs*t
-    pos = np.sum(acs*np.cos(ps),axis=1)
-    vel = np.sum(-acs*ccs*np.sin(ps),axis=1)
+    pos = np.sum(acs*np.cos(ps),axis=-1)
+    vel = np.sum(-acs*ccs*np.sin(ps),axis=-1)
     
     #T^1 terms
     acs = coeffs1[:,0::3]
@@ -1005,8 +1827,8 @@ def _compute_earth_series(t,coeffs0,coeffs1,coeffs2):
     cts = ccs*t
     ps = bcs + cts
     cps = np.cos(ps)
-    pos += np.sum(acs*t*cps,axis=1)
-    vel += np.sum(acs*(cps - cts*np.sin(ps)),axis=1)
+    pos += np.sum(acs*t*cps,axis=-1)
+    vel += np.sum(acs*(cps - cts*np.sin(ps)),axis=-1)
     
     #T^2 terms
     acs = coeffs2[:,0::3]
@@ -1015,8 +1837,8 @@ def _compute_earth_series(t,coeffs0,coeffs1,coeffs2):
     cts = ccs*t
     ps = bcs + cts
     cps = np.cos(ps)
-    pos += np.sum(acs*cps*t*t,axis=1)
-    vel += np.sum(acs*t*(2.0*cps - cts*np.sin(ps)),axis=1)
+    pos += np.sum(acs*cps*t*t,axis=-1)
+    vel += np.sum(acs*t*(2.0*cps - cts*np.sin(ps)),axis=-1)
     
     return pos,vel
 
@@ -1040,7 +1862,14 @@ class Earth(EphemerisObject):
         from ..obstools import jd_to_epoch
         
         x,y,z = earth_pos_vel(self.jd,True)[0]
-        return RectangularICRSCoordinates(x=x,y=y,z=z,epoch=jd_to_epoch(self.jd))
+        return RectangularICRSCoordinates(x=x,y=y,z=z,epoch=jd_to_epoch(self.jd),
+                                          unit='au')
+
+    def _positionArrays(self,jds):
+        from .coordsys import RectangularICRSCoordinates
+
+        pos = earth_pos_vel(jds,True)[0]
+        return RectangularICRSCoordinates,tuple(np.ascontiguousarray(pos.T))
     
     def getVelocity(self,jd=None,kms=True):
         """
@@ -1048,17 +1877,20 @@ class Earth(EphemerisObject):
         system barycenter.
         
         :params jd: 
-            The julian date at which to compute the velocity, or None to use the
-            :attr:`jd` attribute.
+            The julian date at which to compute the velocity, an array of
+            julian dates, or None to use the :attr:`jd` attribute.
         :params bool kms: 
             If True, velocities are returned in km/s, otherwise AU/yr.
             
-        :returns: vx,vy,vz in km/s if `kms` is True, otherwise AU/yr.
+        :returns: 
+            vx,vy,vz in km/s if `kms` is True, otherwise AU/yr.  If `jd` is an
+            array, an (N,3) array of velocities is returned (see
+            :func:`earth_pos_vel`).
             
         """
         return earth_pos_vel(self.jd if jd is None else jd,True,kms)[1]
 
-def earth_pos_vel(jd,barycentric=False,kms=True):
+def earth_pos_vel(jd,barycentric=False,kms=True,maxmem=2**25):
     """
     Computes the earth's position and velocity at a given julian date. 
     
@@ -1068,16 +1900,23 @@ def earth_pos_vel(jd,barycentric=False,kms=True):
     Adapted from SOFA function epv00.c from fits to DE405, valid from ~
     1900-2100. 
     
-    :param jd: The julian date for the positions and velocities.
+    :param jd: 
+        The julian date for the positions and velocities, or an array of
+        julian dates.
     :param bool barycentric: 
         If True, the output positions and velocities are relative to the solar
         system barycenter. Otherwise, positions and velocities are heliocentric.
     :param bool kms: If True, velocity outputs are in km/s, otherwise AU/yr.
+    :param int maxmem:
+        Approximate maximum number of bytes to use for the intermediate
+        arrays when `jd` is an array - the series are evaluated in chunks of
+        julian dates of this size.
     
     :returns: 
         2 3-tuples (x,y,z),(vx,vy,vz) where x,y, and z are GCRS-aligned
         positions in AU, and vx,vy, and vz are velocities in km/s if `kms` is
-        True, or AU/yr.
+        True, or AU/yr. If `jd` is an array, the outputs are instead (N,3)
+        arrays of positions and velocities.
         
     
     """
@@ -1085,24 +1924,47 @@ def earth_pos_vel(jd,barycentric=False,kms=True):
     from ..constants import aupercm,secperyr
     from warnings import warn
     
-    coeffsd = _earth_series_coeffs
+    coeffsd = _get_earth_series_coeffs()
     
-    t = (jd-jd2000)/365.25 #Julian years since 2000.0 reference
+    t = (np.array(jd,dtype=float)-jd2000)/365.25 #Julian years since 2000.0 reference
     
-    if t > 100 or t < -100:
-        warn('JD {0} is not in range 1900-2100 CE for Earth position'.format(jd),EphemerisAccuracyWarning)
-        
-    pos,vel = _compute_earth_series(t,coeffsd['h0coeffs'],coeffsd['h1coeffs'],coeffsd['h2coeffs'])
+    outofrange = (t > 100) | (t < -100)
+    if np.any(outofrange):
+        if t.shape == ():
+            warn('JD {0} is not in range 1900-2100 CE for Earth position'.format(jd),EphemerisAccuracyWarning)
+        else:
+            warn('{0} JDs are not in range 1900-2100 CE for Earth position'.format(np.sum(outofrange)),EphemerisAccuracyWarning)
     
+    serieskeys = ['h0coeffs','h1coeffs','h2coeffs']
     if barycentric:
-        poff,voff = _compute_earth_series(t,coeffsd['b0coeffs'],coeffsd['b1coeffs'],coeffsd['b2coeffs'])
-        pos += poff
-        vel += voff
+        serieskeys.extend(['b0coeffs','b1coeffs','b2coeffs'])
+    
+    if t.shape == ():
+        ts = [t]
+    else:
+        #each series evaluation needs a few (ntimes,3,nterms) float arrays
+        nterms = max([coeffsd[k].shape[1]//3 for k in serieskeys])
+        chunksize = max(maxmem//(4*8*3*nterms),1)
+        t = t.ravel()
+        ts = [t[i:i+chunksize] for i in range(0,t.size,chunksize)] or [t]
+    
+    poss,vels = [],[]
+    for tc in ts:
+        pos,vel = _compute_earth_series(tc,*[coeffsd[k] for k in serieskeys[:3]])
+        if barycentric:
+            poff,voff = _compute_earth_series(tc,*[coeffsd[k] for k in serieskeys[3:]])
+            pos += poff
+            vel += voff
+        poss.append(pos)
+        vels.append(vel)
+    pos = poss[0] if len(poss)==1 else np.concatenate(poss)
+    vel = vels[0] if len(vels)==1 else np.concatenate(vels)
     
     #this rotates the analytic model from the series to DE405/BCRS
     #same as rotating by -23d26'21.4091" about x then 0.0475" about z        
-    pos = (coeffsd['ec2bcrsmat']*pos.reshape(3,1)).A.ravel()
-    vel = (coeffsd['ec2bcrsmat']*vel.reshape(3,1)).A.ravel()
+    rotT = coeffsd['ec2bcrsmat'].A.T
+    pos = np.dot(pos,rotT)
+    vel = np.dot(vel,rotT)
     
     if kms:
         #AU/yr*(   km/AU  *  yr/sec ) = km/sec
@@ -1159,7 +2021,10 @@ def _ecl_to_gcrs(x,y,z,jd):
     #xp,yp,zp = _ecl_icrs(x,y,z,jd)
     
     #Now offset to earth coordinates
-    (xe,ye,ze),(vxe,vye,vze) = earth_pos_vel(jd,barycentric=True)
+    if np.isscalar(jd):
+        (xe,ye,ze),(vxe,vye,vze) = earth_pos_vel(jd,barycentric=True)
+    else:
+        xe,ye,ze = earth_pos_vel(jd,barycentric=True)[0].T
     
     return xp-xe,yp-ye,zp-ze
 
@@ -447,7 +447,198 @@ def sky_sep_to_3d_sep(pos1,pos2,d1,d2):
         
     return (pos1-pos2).separation3d(d1,d2)
 
-def radec_str_to_decimal(*args):
+def _string_byte_matrix(strs):
+    """
+    Converts a sequence of strings, a string array, or a buffer of
+    newline-separated rows into an (N,W+1) uint8 array of the characters in
+    each row, padded with at least one trailing 0.
+    
+    :returns: (bytematrix,shape) where `shape` is the shape of the input array.
+    """
+    if isinstance(strs,basestring):
+        strs = strs.splitlines()
+    arr = np.asarray(strs)
+    if arr.dtype.kind == 'U':
+        arr = np.char.encode(arr,'ascii','replace')
+    elif arr.dtype.kind != 'S':
+        arr = arr.astype('S')
+    shape = arr.shape
+    arr = np.ascontiguousarray(arr.ravel())
+    
+    n,w = arr.size,arr.dtype.itemsize
+    A = np.zeros((n,w+1),dtype=np.uint8)
+    if n > 0 and w > 0:
+        A[:,:w] = arr.view(np.uint8).reshape(n,w)
+    return A,shape
+
+def _isws(c):
+    return (c==32)|(c==9)|(c==0)|(c==10)|(c==13)
+
+def _parse_sexagesimal_bytes(A,hms):
+    """
+    Parses the common sexagesimal forms directly from a byte matrix (as
+    returned by :func:`_string_byte_matrix`).
+    
+    :returns: 
+        (degrees,parsed,empty) arrays, where `parsed` is False for rows that
+        are not in one of the simple forms handled here, and `empty` is True for
+        rows with only whitespace.
+    """
+    n,w = A.shape
+    rows = np.arange(n)
+    J = np.arange(w)
+    
+    isdig = (A>=48)&(A<=57)
+    isdot = A==46
+    isnum = isdig|isdot
+    isws = _isws(A)
+    
+    #numerical fields are runs of digits and '.'
+    starts = isnum.copy()
+    starts[:,1:] &= ~isnum[:,:-1]
+    fieldid = np.cumsum(starts,axis=1)
+    nfields = fieldid[:,-1].copy()
+    fieldid[~isnum] = 0
+    
+    ok = (nfields>=1)&(nfields<=3)
+    fieldmasks,fstarts,fends = [],[],[]
+    for k in (1,2,3):
+        mk = fieldid==k
+        present = nfields>=k
+        start = np.argmax(mk,axis=1)
+        #absent fields get the position of the (always present) 0 padding
+        end = np.where(present,w - np.argmax(mk[:,::-1],axis=1),w-1)
+        #like the AngularCoordinate regex, fields are \d+(?:[.]\d*)?
+        ok &= ~present | (isdig[rows,start] & (np.sum(mk&isdot,axis=1)<=1))
+        fieldmasks.append(mk)
+        fstarts.append(start)
+        fends.append(end)
+        
+    #leading whitespace and an optional sign
+    sign = A[rows,fstarts[0]-1] #0-padding if the first field is at the start
+    neg = sign==45
+    hassign = neg|(sign==43)
+    leadend = fstarts[0] - hassign
+    ok &= np.all(isws|(J>=leadend[:,None]),axis=1)
+    
+    #the separators following each field and the marker after the last one
+    lastend = np.choose(np.clip(nfields-1,0,2),fends)
+    m1 = A[rows,fends[0]]
+    m2 = A[rows,fends[1]]
+    tchar = A[rows,lastend]
+    contig12 = fstarts[1] == fends[0]+1
+    contig23 = fstarts[2] == fends[1]+1
+    unit1 = (m1==104)|(m1==100) #h or d
+    minmark = (m2==109)|(m2==39) #m or '
+    secmark = (tchar==115)|(tchar==34) #s or "
+    sgsep = (m1==m2)&((m1==58)|(m1==32)) #: or space
+    
+    form1 = (nfields==1)&(_isws(tchar)|unit1)
+    form2 = (nfields==2)&contig12&unit1&minmark
+    #the regex only allows a seconds mark after ':' separators
+    form3 = (nfields==3)&contig12&contig23&((unit1&minmark)|sgsep)& \
+            (_isws(tchar)|(secmark&(m1!=58)))
+    
+    skip = (form1&unit1)|form2|(form3&secmark)
+    ok &= form1|form2|form3
+    ok &= np.all(isws|(J<(lastend+skip)[:,None]),axis=1)
+    
+    if hms is None:
+        sghours = ~hassign
+    else:
+        sghours = np.ones(n,dtype=bool) if hms else np.zeros(n,dtype=bool)
+    hours = np.where(form3&sgsep,sghours,unit1&(m1==104))
+    
+    #replace everything but the field with spaces and let numpy parse the floats
+    val = np.zeros(n)
+    for k,mk in enumerate(fieldmasks):
+        mk &= ok[:,None]
+        if np.any(mk):
+            fld = np.where(mk,A,32).astype(np.uint8)
+            fld[~np.any(mk,axis=1),0] = 48
+            val += fld.view('S%i'%w).ravel().astype(float)/60**k
+    val[neg] *= -1
+    val[hours] *= 15
+    
+    return val,ok,np.all(isws,axis=1)
+
+def sexagesimal_to_decimal(strs,hms=None,chunksize=65536):
+    """
+    Converts many angle strings to decimal degrees at once.  This accepts the
+    same string forms as :class:`~astropysics.coords.coordsys.AngularCoordinate`
+    (e.g. '12:30:15.2', '-12 30 15.2', '12h30m15.2s', "+12d30'15.2\"", or plain
+    decimal degrees).  The common forms are parsed as whole-array operations,
+    and only unusual ones (e.g. '12.3hours' or '1.2rads') are passed on to
+    :class:`~astropysics.coords.coordsys.AngularCoordinate` one at a time.
+    
+    :param strs: 
+        The strings to convert as a sequence of strings, a numpy string array,
+        or a single string with one value per line.
+    :param hms: 
+        Determines how sexigesimal strings without units are interpreted: if
+        True as hours,minutes, and seconds, if False as degrees, arcmin, and
+        arcsec, or if None as hours unless a + or - sign is present (the same as
+        the `sghms` argument of
+        :class:`~astropysics.coords.coordsys.AngularCoordinate`).
+    :type hms: bool or None
+    :param chunksize: 
+        The number of strings to process at a time, setting the size of the
+        temporary arrays.
+    :type chunksize: int
+    
+    :returns: 
+        (degrees,invalid) arrays with the same shape as `strs`. `invalid` is a
+        boolean array that is True for empty or unparsable strings, and the
+        corresponding entries of `degrees` are NaN.
+    
+    **Examples**
+    
+    >>> degs,invalid = sexagesimal_to_decimal(['1:00:00','-1:30:00','x'])
+    >>> print degs[:2]
+    [ 15.   -1.5]
+    >>> print invalid
+    [False False  True]
+    
+    .. seealso:: :func:`iter_radec_str_to_decimal` for streaming input.
+    """
+    from .coordsys import AngularCoordinate
+    
+    A,shape = _string_byte_matrix(strs)
+    n = A.shape[0]
+    
+    degs = np.empty(n)
+    invalid = np.zeros(n,dtype=bool)
+    for i in range(0,n,chunksize):
+        sl = slice(i,i+chunksize)
+        val,ok,empty = _parse_sexagesimal_bytes(A[sl],hms)
+        for j in np.where(~ok&~empty)[0]:
+            sval = A[i+j].tostring().rstrip('\x00')
+            try:
+                val[j] = AngularCoordinate(sval,sghms=hms).degrees
+                ok[j] = True
+            except ValueError:
+                pass
+        val[~ok] = np.nan
+        degs[sl] = val
+        invalid[sl] = ~ok
+        
+    return degs.reshape(shape),invalid.reshape(shape)
+
+def _split_radec_bytes(A):
+    """
+    Splits each row of a byte matrix (from :func:`_string_byte_matrix`) into
+    its first two whitespace-separated tokens.
+    
+    :returns: (rabytes,decbytes) matricies of the same shape as `A`
+    """
+    isws = _isws(A)
+    starts = ~isws
+    starts[:,1:] &= isws[:,:-1]
+    tokid = np.cumsum(starts,axis=1)
+    tokid[isws] = 0
+    return np.where(tokid==1,A,32).astype(np.uint8),np.where(tokid==2,A,32).astype(np.uint8)
+
+def radec_str_to_decimal(*args,**kwargs):
     """
     Convert a sequence of string coordinate specifiers to decimal degree arrays.
     
@@ -457,38 +648,300 @@ def radec_str_to_decimal(*args):
         In this form, `rastrs` and `decstrs` are sequences of strings with the
         RA and Dec, respectively.  
     * `radec_str_to_decimal(radecstrs)`
-        In this form, `radecstrs` is a sequence of strings in any form accepted
-        by the :class:`EquatorialCoordinatesBase` constructor. (typically
-        canonical from like 17:43:54.23 +32:23:12.3)
+        In this form, `radecstrs` is a sequence of strings with the RA and Dec
+        seperated by whitespace (typically canonical from like 17:43:54.23
+        +32:23:12.3), or a single string with one such position per line.
+        
+    In both cases, sexigesimal RAs without units are taken to be in hours and
+    Decs in degrees.  The strings are parsed with
+    :func:`sexagesimal_to_decimal`.
+    
+    :param invalid: 
+        Keyword-only.  If 'raise' (default), a ValueError is raised if any of
+        the strings cannot be parsed.  If 'mask', (ras,decs,invalid) is returned
+        where `invalid` is a boolean array that is True for rows where either
+        coordinate could not be parsed (and those values are NaN).
     
     :returns: 
         (ras,decs) where `ras` and `decs` are  :class:`ndarrays <numpy.ndarray>`
         specifying the ra and dec in decimal degrees.
     
+    :except ValueError: 
+        If the arguments are invalid, or an invalid string is found and
+        `invalid` is 'raise'.
+    
     """
-    from .coordsys import AngularCoordinate,ICRSCoordinates
-    from itertools import izip
+    invalidmode = kwargs.pop('invalid','raise')
+    if kwargs:
+        raise TypeError('unexpected keyword arguments '+', '.join(kwargs))
+    if invalidmode not in ('raise','mask'):
+        raise ValueError('invalid must be "raise" or "mask"')
     
     if len(args)==1:
-        for s in args[0]:
-            c = ICRSCoordinates(s)
-            ras.append(c.ra.d)
-            decs.append(c.dec.d)
+        A,shape = _string_byte_matrix(args[0])
+        rab,decb = _split_radec_bytes(A)
+        ras,rainv = sexagesimal_to_decimal(rab.view('S%i'%A.shape[1]).reshape(shape),True)
+        decs,decinv = sexagesimal_to_decimal(decb.view('S%i'%A.shape[1]).reshape(shape),False)
     elif len(args)==2:
         ra,dec = args
         if len(ra) != len(dec):
             raise ValueError("length of ra and dec don't match")
-        
-        ras,decs=[],[]
-        for r,d in izip(ra,dec):
-            ras.append(AngularCoordinate(r,sghms=True).d)
-            decs.append(AngularCoordinate(d,sghms=False).d)
+        ras,rainv = sexagesimal_to_decimal(ra,True)
+        decs,decinv = sexagesimal_to_decimal(dec,False)
     else:
         raise ValueError('radec_str_to_decimal only accepts (rastr,decstr) or (radecstr)')
     
-    return np.array(ras),np.array(decs)
+    invalid = rainv|decinv
+    if invalidmode == 'mask':
+        ras[invalid] = decs[invalid] = np.nan
+        return ras,decs,invalid
+    elif np.any(invalid):
+        i = np.where(invalid.ravel())[0][0]
+        raise ValueError('Invalid coordinate string in row %i'%i)
+    return ras,decs
+
+def iter_radec_str_to_decimal(lines,chunksize=65536):
+    """
+    Converts a stream of RA/Dec strings to decimal degrees in chunks, so that
+    catalogs too large for memory (or that are still being read) can be
+    processed.
+    
+    :param lines: 
+        An iterable (e.g. an open file) of strings with the RA and Dec
+        seperated by whitespace, in the forms accepted by
+        :func:`radec_str_to_decimal`.
+    :param chunksize: The number of lines to convert at a time.
+    :type chunksize: int
+    
+    :returns: 
+        An iterator over (ras,decs,invalid) tuples of arrays for each chunk of
+        `lines`, as for :func:`radec_str_to_decimal` with `invalid` = 'mask'.
+    """
+    from itertools import islice
+    
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines,chunksize))
+        if len(chunk)==0:
+            break
+        yield radec_str_to_decimal(chunk,invalid='mask')
+
+def _int_digit_matrix(vals,width):
+    """
+    Converts an array of non-negative integers into an (N,`width`) array of the
+    character codes for their zero-padded decimal digits.
+    """
+    pows = 10**np.arange(width-1,-1,-1,dtype=np.int64)
+    return (vals[:,None]//pows)%10 + 48
+
+def _format_sexagesimal(vals,divisor,secprec,sep,sign,unicode):
+    """
+    Formats an array of decimal degrees (divided by `divisor`) as fixed-width
+    sexagesimal strings, returning a string array of the same shape.
+    """
+    vals = np.asarray(vals,dtype=float)
+    shape = vals.shape
+    vals = vals.ravel()
+    n = vals.size
+    
+    if isinstance(sep,basestring):
+        if sep == 'hms' or sep == 'dms':
+            sep = tuple(sep)
+        else:
+            sep = (sep,sep)
+    sep = tuple(sep)+('',)*(3-len(sep))
+    sepcodes = [[ord(c) for c in sp] for sp in sep]
+    if not unicode and max([0]+sum(sepcodes,[])) > 127:
+        raise ValueError('non-ASCII seperators require unicode output')
+    
+    finite = np.isfinite(vals)
+    vals = np.where(finite,vals,0)
+    #round the whole value at once so that carries propogate (no 60.00 seconds)
+    secmul = 10**secprec
+    scale = 3600*secmul
+    tot = np.round(np.abs(vals)*(scale/divisor)).astype(np.int64)
+    #values that round to zero should not be shown as negative
+    neg = (vals < 0) & (tot > 0)
+    d = tot//scale
+    if divisor == 15:
+        #a carry can round up to 24 hours, which should wrap to 0
+        d %= 24
+    m = (tot//(60*secmul))%60
+    sec = tot%(60*secmul)
+    
+    pieces = []
+    if sign:
+        pieces.append(np.where(neg,45,43)[:,None])
+    elif np.any(neg):
+        pieces.append(np.where(neg,45,32)[:,None])
+    pieces.append(_int_digit_matrix(d,max(2,len(str(d.max())) if n>0 else 2)))
+    pieces.append(sepcodes[0])
+    pieces.append(_int_digit_matrix(m,2))
+    pieces.append(sepcodes[1])
+    pieces.append(_int_digit_matrix(sec//secmul,2))
+    if secprec > 0:
+        pieces.append([46])
+        pieces.append(_int_digit_matrix(sec%secmul,secprec))
+    pieces.append(sepcodes[2])
+    
+    width = sum([np.shape(p)[-1] for p in pieces])
+    chrs = np.empty((n,width),dtype=np.uint32 if unicode else np.uint8)
+    i = 0
+    for p in pieces:
+        w = np.shape(p)[-1]
+        chrs[:,i:i+w] = p
+        i += w
+    chrs[~finite] = 32
+    
+    return chrs.view(('U%i' if unicode else 'S%i')%width).reshape(shape)
+
+def decimal_to_dms_str(degs,secprec=2,sep=':',sign=True,canonical=False,unicode=False):
+    """
+    Converts an array of decimal degrees into fixed-width strings of degrees,
+    arcminutes, and arcseconds.  This is the array form of
+    :meth:`AngularCoordinate.getDmsStr
+    <astropysics.coords.coordsys.AngularCoordinate.getDmsStr>`, except that all
+    components are zero-padded to the same width for all of the values, and the
+    value is rounded before it is split into components (so the seconds are
+    never shown as 60).
+    
+    :param degs: The angles in decimal degrees.
+    :type degs: scalar or array-like
+    :param secprec: The number of decimal places for the arcseconds.
+    :type secprec: int
+    :param sep: 
+        The seperator between components.  If a string, it is used after the
+        degrees and arcminutes, unless it is 'dms' (in which case 'd', 'm', and
+        's' are used). Otherwise, a 2- or 3-tuple of strings to follow each
+        component.
+    :type sep: string or tuple of strings
+    :param sign: Forces sign to be present before degree component.
+    :type sign: boolean
+    :param canonical: forces [+/-]dd:mm:ss.ss , overriding other arguments
+    :param unicode: 
+        If True, a unicode string array is returned (needed for non-ASCII
+        seperators like the degree sign), otherwise a byte string array.
+    :type unicode: boolean
+    
+    :returns: 
+        A numpy string array of the same shape as `degs`. Entries for NaN or
+        infinite values are blank.
+    
+    **Examples**
+    
+    >>> print decimal_to_dms_str([12.5,-0.25])
+    ['+12:30:00.00' '-00:15:00.00']
+    >>> print decimal_to_dms_str([12.5,-0.25],secprec=0,sep='dms')
+    ['+12d30m00s' '-00d15m00s']
+    
+    """
+    if canonical:
+        secprec,sep,sign = 2,':',True
+    return _format_sexagesimal(degs,1,secprec,sep,sign,unicode)
+
+def decimal_to_hms_str(degs,secprec=3,sep=':',sign=False,canonical=False,unicode=False):
+    """
+    Converts an array of decimal degrees into fixed-width strings of hours,
+    minutes, and seconds.  This is the array form of
+    :meth:`AngularCoordinate.getHmsStr
+    <astropysics.coords.coordsys.AngularCoordinate.getHmsStr>`, with the same
+    differences as for :func:`decimal_to_dms_str`.
+    
+    :param degs: The angles in decimal degrees.
+    :type degs: scalar or array-like
+    :param secprec: The number of decimal places for the seconds.
+    :type secprec: int
+    :param sep: 
+        The seperator between components. If a string, it is used after the
+        hours and minutes, unless it is 'hms' (in which case 'h', 'm', and 's'
+        are used). Otherwise, a 2- or 3-tuple of strings to follow each
+        component.
+    :type sep: string or tuple of strings
+    :param sign: 
+        Forces sign to be present before the hours (it is always present if
+        any of the values are negative).
+    :type sign: boolean
+    :param canonical: forces hh:mm:ss.sss , overriding other arguments
+    :param unicode: 
+        If True, a unicode string array is returned, otherwise a byte string
+        array.
+    :type unicode: boolean
+    
+    :returns: 
+        A numpy string array of the same shape as `degs`. Entries for NaN or
+        infinite values are blank.
+    
+    **Examples**
+    
+    >>> print decimal_to_hms_str([187.5,15])
+    ['12:30:00.000' '01:00:00.000']
+    >>> print decimal_to_hms_str(187.5,secprec=1,sep='hms')
+    12h30m00.0s
+    
+    """
+    if canonical:
+        secprec,sep,sign = 3,':',False
+    return _format_sexagesimal(degs,15,secprec,sep,sign,unicode)
+
+def _get_kdtree_class():
+    """
+    Returns the C-based :class:`scipy.spatial.cKDTree` if it is available, or
+    the pure-python :class:`scipy.spatial.KDTree` (with a warning) if not.
+    """
+    try:
+        from scipy.spatial import cKDTree as KDTree
+    except ImportError:
+        from warnings import warn
+        warn('C-based scipy kd-tree not available - coordinate matching will be much slower!')
+        from scipy.spatial import KDTree
+    return KDTree
+
+def _match_pairs(c1,c2,eps,kdt1=None,kdt2=None):
+    """
+    Finds all pairs of points within `eps` of each other using kd-trees.
+    
+    :param c1: N x D array of points for the first set
+    :param c2: M x D array of points for the second set, or None to match `c1`
+        to itself.
+    :param eps: maximum separation for a pair (inclusive)
+    :param kdt1: A pre-built tree for `c1` or None to build one.
+    :param kdt2: A pre-built tree for `c2` or None to build one.
+    
+    :returns: 
+        (ind1,ind2) integer index arrays for each matched pair, ordered by
+        `ind1` and then `ind2` (i.e. the same ordering as :func:`numpy.where`
+        would give for the full boolean match matrix).
+    """
+    from itertools import chain
+    
+    if len(c1)==0 or (c2 is not None and len(c2)==0):
+        return np.array([],dtype=int),np.array([],dtype=int)
+    
+    KDTree = _get_kdtree_class()
+    if kdt1 is None:
+        kdt1 = KDTree(c1)
+    if kdt2 is None:
+        kdt2 = kdt1 if c2 is None else KDTree(c2)
+        
+    matchlists = kdt1.query_ball_tree(kdt2,eps)
+    
+    counts = np.fromiter((len(l) for l in matchlists),int,len(matchlists))
+    ind1 = np.repeat(np.arange(len(matchlists)),counts)
+    ind2 = np.fromiter(chain.from_iterable(matchlists),int,np.sum(counts))
+    
+    srt = np.lexsort((ind2,ind1))
+    return ind1[srt],ind2[srt]
 
-def match_coords(a1,b1,a2,b2,eps=1,mode='mask'):
+def _match_mask(inds,n):
+    """
+    Converts an index array into a boolean mask of length `n` that is True
+    wherever the index appears.
+    """
+    mask = np.zeros(n,dtype=bool)
+    mask[inds] = True
+    return mask
+
+def match_coords(a1,b1,a2,b2,eps=1,mode='mask',spherical=False,nprocs=None):
     """
     Match one pair of coordinate :class:`arrays <numpy.ndarray>` to another
     within a specified tolerance (`eps`).
@@ -496,7 +949,13 @@ def match_coords(a1,b1,a2,b2,eps=1,mode='mask'):
     Distance is determined by the cartesian distance between the two arrays,
     implying the small-angle approximation if the input coordinates are
     spherical. Units are arbitrary, but should match between all coordinates
-    (and `eps` should be in the same units)
+    (and `eps` should be in the same units). Alternatively, if `spherical` is
+    True, the coordinates are taken to be longitude/latitude pairs in degrees
+    and the great-circle separation is used instead.
+    
+    Matched pairs are found using kd-trees (:class:`scipy.spatial.cKDTree`), so
+    the full separation matrix between the two sets is never constructed, and
+    the time required scales as O((N+M) log M) rather than O(N M).
     
     :param a1: the first coordinate for the first set of coordinates
     :type a1: array-like
@@ -508,7 +967,7 @@ def match_coords(a1,b1,a2,b2,eps=1,mode='mask'):
     :type b2: array-like
     :param eps: 
         The maximum separation allowed for coordinate pairs to be considered
-        matched.
+        matched. If `spherical` is True, this is an angle in degrees.
     :type eps: float
     :param mode:
         Determines behavior if more than one coordinate pair matches.  Can be:
@@ -535,9 +994,11 @@ def match_coords(a1,b1,a2,b2,eps=1,mode='mask'):
             a2[ind2[i]] will give the "a" coordinate for a matched pair
             of coordinates.
         * 'match2D'
-            Returns a 2-dimensional bool array. The array element M[i,j] is True
-            if the ith coordinate of the first coordinate set
-            matches the jth coordinate of the second set.
+            Returns a 2-dimensional sparse boolean matrix (a
+            :class:`scipy.sparse.csr_matrix`). The matrix element M[j,i] is True
+            if the ith coordinate of the first coordinate set matches the jth
+            coordinate of the second set. Use the `toarray` method of the output
+            to get a dense array.
         * 'nearest'
             Returns (nearestind,distance,match). `nearestind` is an int array
             such that nearestind holds indecies into the *second* set of
@@ -550,6 +1011,20 @@ def match_coords(a1,b1,a2,b2,eps=1,mode='mask'):
             this finds the second-closest match (because the first will always
             be the object itself if the coordinate pairs are the same) This mode
             is a wrapper around :func:`match_nearest_coords`.
+            
+    :param bool spherical: 
+        If True, `a1` and `a2` are interpreted as longitudes and `b1` and `b2`
+        as latitudes (both in degrees), and matches are found using the
+        great-circle separation. This is correct near the poles and across the
+        longitude wrap at 0/360 degrees (where the cartesian distance is not).
+        Distances returned by the 'nearest' mode are then also angular
+        separations in degrees.
+    :param nprocs: 
+        If an integer greater than 1, the matching is split into tiles on the
+        sky which are matched in parallel by a pool of `nprocs` processes (see
+        :mod:`multiprocessing`). The output is identical to the serial case.
+        If None or 1, the matching is done in the current process.
+    :type nprocs: int or None
     
     :returns: See `mode` for a description of return types.
     
@@ -576,31 +1051,35 @@ def match_coords(a1,b1,a2,b2,eps=1,mode='mask'):
         #special casing so that match_nearest_coords dpes second nearest
         if identical: 
             t = (a1,b1)
-            seps,i2 = match_nearest_coords(t,t)
+            seps,i2 = match_nearest_coords(t,t,spherical=spherical,nprocs=nprocs)
         else:
-            seps,i2 = match_nearest_coords((a1,b1),(a2,b2))
+            seps,i2 = match_nearest_coords((a1,b1),(a2,b2),spherical=spherical,nprocs=nprocs)
         return i2,seps,(seps<=eps)
         
-    def find_sep(A,B):
-        At = np.tile(A,(len(B),1))
-        Bt = np.tile(B,(len(A),1))
-        return At.T-Bt
-    sep1 = find_sep(a1,a2)
-    sep2 = find_sep(b1,b2)
-    sep = np.hypot(sep1,sep2)
-    
-    matches =  sep <= eps
+    if spherical:
+        c1 = _lonlat_to_unitvec(a1,b1)
+        c2 = None if identical else _lonlat_to_unitvec(a2,b2)
+        treeeps = _angle_to_chord(eps)
+    else:
+        c1 = np.array((a1,b1)).T
+        c2 = None if identical else np.array((a2,b2)).T
+        treeeps = eps
+        
+    if nprocs is not None and nprocs > 1:
+        ind1,ind2 = _parallel_match(c1,c1 if c2 is None else c2,treeeps,nprocs)
+    else:
+        ind1,ind2 = _match_pairs(c1,c2,treeeps)
     
     if mode == 'mask':
-        return np.any(matches,axis=1),np.any(matches,axis=0)
+        return _match_mask(ind1,a1.size),_match_mask(ind2,a2.size)
     elif mode == 'maskexcept':
-        s1,s2 = np.sum(matches,axis=1),np.sum(matches,axis=0) 
+        s1,s2 = np.bincount(ind1,minlength=a1.size),np.bincount(ind2,minlength=a2.size) 
         if np.all(s1<2) and np.all(s2<2):
             return s1>0,s2>0
         else:
             raise ValueError('match_coords found multiple matches')
     elif mode == 'maskwarn':
-        s1,s2 = np.sum(matches,axis=1),np.sum(matches,axis=0) 
+        s1,s2 = np.bincount(ind1,minlength=a1.size),np.bincount(ind2,minlength=a2.size) 
         from warnings import warn
         
         for i in np.where(s1>1)[0]:
@@ -609,17 +1088,19 @@ def match_coords(a1,b1,a2,b2,eps=1,mode='mask'):
             warn('2nd index %i has %i matches!'%(j,s2[j]))
         return s1>0,s2>0
     elif mode == 'count':
-        return np.sum(np.any(matches,axis=1)),np.sum(np.any(matches,axis=0)) 
+        return np.sum(_match_mask(ind1,a1.size)),np.sum(_match_mask(ind2,a2.size))
     elif mode == 'index':
-        return np.where(matches)
+        return ind1,ind2
     elif mode == 'match2D':
-        return matches.T
+        from scipy.sparse import coo_matrix
+        data = np.ones(ind1.size,dtype=bool)
+        return coo_matrix((data,(ind2,ind1)),shape=(a2.size,a1.size)).tocsr()
     elif mode == 'nearest':
         assert False,"'nearest' should always return above this - code should be unreachable!"
     else:
         raise ValueError('unrecognized mode')
     
-def match_nearest_coords(c1,c2=None,n=None):
+def match_nearest_coords(c1,c2=None,n=None,spherical=False,nprocs=None):
     """
     Match a set of coordinates to their nearest neighbor(s) in another set of
     coordinates.
@@ -633,7 +1114,10 @@ def match_nearest_coords(c1,c2=None,n=None):
         :class:`AngularPosition` objects) or a sequence of
         :class:`LatLongCoordinates` objects for the second set of coordinates.
         Alternatively, if this is None, `c2` will be set to `c1`, finding the 
-        nearest neighbor of a point in `c1` to another point in `c1`.
+        nearest neighbor of a point in `c1` to another point in `c1`. This may
+        also be a kd-tree generated by :func:`coordinate_kdtree` for the
+        second set, in which case the tree is re-used instead of rebuilt (the
+        tree must have been created with the same value of `spherical`).
     :param int n: 
         Specifies the nth nearest neighbor to be returned (1 means the closest
         match). If None, it will default to 2 if `c1` and `c2` are the same
@@ -641,53 +1125,638 @@ def match_nearest_coords(c1,c2=None,n=None):
         in-memory array), or 1 otherwise. This is because if `c1` and `c2` are
         the same, a coordinate matches to *itself* instead of the nearest other
         coordinate.
+    :param bool spherical:
+        If True, the coordinates are interpreted as (longitude,latitude) pairs
+        in degrees and the match is performed on the sphere (correctly handling
+        the poles and the longitude wrap). In this case, `seps` are great-circle
+        separations in degrees. Otherwise, distances are cartesian.
+    :param nprocs: 
+        If an integer greater than 1, the first set of coordinates is split
+        into tiles on the sky which are queried in parallel by a pool of
+        `nprocs` processes (see :mod:`multiprocessing`). The output is
+        identical to the serial case. If None or 1, the matching is done in the
+        current process.
+    :type nprocs: int or None
     
     :returns: 
         (seps,ind2) where both are arrays matching the shape of `c1`. `ind2` is
         indecies into `c2` to find the nearest to the corresponding `c1`
         coordinate, and `seps` are the distances.
     """
-    try:
-        from scipy.spatial import cKDTree as KDTree
-    except ImportError:
-        from warnings import warn
-        warn('C-based scipy kd-tree not available - match_nearest_coords will be much slower!')
-        from scipy.spatial import KDTree
-        
     if c2 is None:
         c2 = c1
     if n is None:    
         n = 2 if c1 is c2 else 1
         
-    c1 = np.array(c1,ndmin=1,copy=False)
-    c2 = np.array(c2,ndmin=1,copy=False)
-    
-    if len(c1.shape)==1:
-        a1 = np.empty(c1.size)
-        b1 = np.empty(c1.size)
-        a2 = np.empty(c1.size)
-        b2 = np.empty(c1.size)
-        for i in range(len(c1)):
-            a1[i] = c1[i].long.d
-            b1[i] = c1[i].lat.d
-            a2[i] = c2[i].long.d
-            b2[i] = c2[i].lat.d
-        c1 = np.array((a1,b1))
-        c2 = np.array((a2,b2))
-    elif len(c1.shape)!=2:
-        raise ValueError('match_nearest_coords inputs have incorrect number of dimensions')
+    if hasattr(c2,'query'):
+        kdt = c2
+    else:
+        kdt = coordinate_kdtree(c2,spherical)
+        
+    c1 = _coordinate_array(c1)
+    if spherical:
+        pts = _lonlat_to_unitvec(c1[0],c1[1])
+    else:
+        pts = c1.T
     
-    if c1.shape[0] != c2.shape[0]:
+    if pts.shape[1] != kdt.m:
         raise ValueError("match_nearest_coords inputs don't match in first dimension")
     
-    kdt = KDTree(c2.T)
-    if n==1:
-        return kdt.query(c1.T)
+    if nprocs is not None and nprocs > 1:
+        dist,inds = _parallel_match(pts,kdt,None,nprocs,n)
+    elif n==1:
+        dist,inds = kdt.query(pts)
+    else:
+        dist,inds = kdt.query(pts,n)
+        dist,inds = dist[:,n-1],inds[:,n-1]
+        
+    if spherical:
+        dist = _chord_to_angle(dist)
+    return dist,inds
+        
+def _parallel_match(c1,c2,eps,nprocs,n=None,tilesperproc=4):
+    """
+    Matches point sets in parallel over tiles of the sky.
+    
+    The points of `c1` are sorted on their last coordinate (the latitude for
+    cartesian coordinates or z for unit vectors), and split into contiguous
+    tiles that are matched by a pool of worker processes. The input points are
+    placed in shared memory so that they are not copied for every worker.
+    
+    For nearest-neighbor matching, every tile is queried against the same tree
+    for the (unsorted) second set, so that ties between equidistant points are
+    resolved exactly as in the serial case. Where worker processes are forked,
+    they share the parent's tree rather than building their own.
+    
+    :param c1: N x D array of points for the first set
+    :param c2: 
+        M x D array of points for the second set, or a kd-tree for the second
+        set if `eps` is None.
+    :param eps: 
+        The maximum separation for pair matching, or None for nearest-neighbor
+        matching.
+    :param int nprocs: The number of processes to use.
+    :param int n: The nth nearest neighbor to find if `eps` is None.
+    :param int tilesperproc: The number of tiles to use for each process.
+    
+    :returns: 
+        (ind1,ind2) as for :func:`_match_pairs` if `eps` is given, otherwise
+        (dist,ind2) as for :meth:`scipy.spatial.cKDTree.query` for the nth
+        nearest neighbor.
+    """
+    from multiprocessing import Pool
+    from multiprocessing.sharedctypes import RawArray
+    
+    c1 = np.array(c1,dtype=float,copy=False)
+    if hasattr(c2,'query'):
+        kdt = c2
+        c2 = np.array(kdt.data,dtype=float,copy=False)
+    else:
+        kdt = None
+        c2 = np.array(c2,dtype=float,copy=False)
+    
+    if len(c1)==0:
+        #nothing to match, so don't bother with shared memory or workers
+        if eps is None:
+            return np.array([],dtype=float),np.array([],dtype=int)
+        else:
+            return np.array([],dtype=int),np.array([],dtype=int)
+    
+    srt1 = np.argsort(c1[:,-1],kind='mergesort')
+    if eps is None:
+        #the tree is over the unsorted second set, so indecies need no mapping
+        if kdt is None:
+            kdt = _get_kdtree_class()(c2)
+        leafsize = getattr(kdt,'leafsize',10)
     else:
-        dist,inds = kdt.query(c1.T,n)
-        return dist[:,n-1],inds[:,n-1]
+        srt2 = np.argsort(c2[:,-1],kind='mergesort')
+        c2 = c2[srt2]
+        leafsize = None
+    
+    shared = []
+    for arr in (c1[srt1],c2):
+        buf = RawArray('d',arr.size)
+        np.frombuffer(buf,dtype=float)[:] = arr.ravel()
+        shared.append((buf,arr.shape))
+    
+    ntiles = min(nprocs*tilesperproc,len(c1))
+    edges = np.linspace(0,len(c1),ntiles+1).astype(int)
+    tiles = [(e0,e1,eps,n) for e0,e1 in zip(edges[:-1],edges[1:]) if e1>e0]
+    
+    #forked workers inherit the tree - others rebuild it from the shared data
+    _parallel_match_data['kdt'] = kdt
+    try:
+        pool = Pool(nprocs,_parallel_match_init,(shared,leafsize))
+    finally:
+        _parallel_match_data.clear()
+    try:
+        results = pool.map(_parallel_match_tile,tiles)
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    
+    if eps is None:
+        dist = np.empty(len(c1))
+        inds = np.empty(len(c1),dtype=int)
+        dist[srt1] = np.concatenate([r[0] for r in results])
+        inds[srt1] = np.concatenate([r[1] for r in results])
+        return dist,inds
+    else:
+        if len(results)==0:
+            return np.array([],dtype=int),np.array([],dtype=int)
+        ind1 = srt1[np.concatenate([r[0] for r in results])]
+        ind2 = srt2[np.concatenate([r[1] for r in results])]
+        srt = np.lexsort((ind2,ind1))
+        return ind1[srt],ind2[srt]
+    
+_parallel_match_data = {}
+def _parallel_match_init(shared,leafsize):
+    """
+    Initializer for :func:`_parallel_match` worker processes - sets up numpy
+    views of the shared input arrays, and for nearest-neighbor matching (if
+    `leafsize` is not None) the tree for the second set if it was not
+    inherited from the parent process.
+    """
+    for k,(buf,shape) in zip(('c1','c2'),shared):
+        _parallel_match_data[k] = np.frombuffer(buf,dtype=float).reshape(shape)
+    if leafsize is not None and _parallel_match_data.get('kdt') is None:
+        _parallel_match_data['kdt'] = _get_kdtree_class()(_parallel_match_data['c2'],leafsize)
+        
+def _parallel_match_tile(args):
+    """
+    Matches one tile for :func:`_parallel_match` in a worker process.  Indecies
+    are into the sorted arrays (except that nearest-neighbor indecies are into
+    the unsorted second set).
+    """
+    e0,e1,eps,n = args
+    c1 = _parallel_match_data['c1'][e0:e1]
+    c2 = _parallel_match_data['c2']
+    
+    if eps is None:
+        if n==1:
+            return _parallel_match_data['kdt'].query(c1)
+        else:
+            dist,inds = _parallel_match_data['kdt'].query(c1,n)
+            return dist[:,n-1],inds[:,n-1]
+    else:
+        #only the part of the second set within eps of this tile can match
+        lo = np.searchsorted(c2[:,-1],c1[0,-1]-eps,'left')
+        hi = np.searchsorted(c2[:,-1],c1[-1,-1]+eps,'right')
+        ind1,ind2 = _match_pairs(c1,c2[lo:hi],eps)
+        return ind1+e0,ind2+lo
+    
+def coordinate_kdtree(c,spherical=False):
+    """
+    Generates a kd-tree for a set of coordinates that can be passed into
+    :func:`match_nearest_coords` to match many different sets of coordinates
+    against the same reference set without rebuilding the tree each time.
+    
+    :param c: 
+        A D x N array with coordinate values or a sequence of
+        :class:`LatLongCoordinates` objects (see :func:`match_nearest_coords`).
+    :param bool spherical:
+        If True, the coordinates are (longitude,latitude) in degrees and the
+        tree is built on the unit vectors for those positions, so that queries
+        are performed in terms of great-circle distance.
+        
+    :returns: A :class:`scipy.spatial.cKDTree` object.
+    """
+    KDTree = _get_kdtree_class()
+    c = _coordinate_array(c)
+    if spherical:
+        return KDTree(_lonlat_to_unitvec(c[0],c[1]))
+    else:
+        return KDTree(c.T)
+    
+class CoordinateIndex(object):
+    """
+    A spatial index for a fixed reference set of coordinates, intended for
+    many repeated queries against the same (possibly very large) catalog.
+    
+    The index is built once, and supports nearest neighbor queries
+    (:meth:`queryNearest`), queries for all reference objects within a radius
+    (:meth:`queryRadius`), and pairs within the reference set itself
+    (:meth:`queryPairs`). It can be saved to disk with :meth:`save` and
+    reloaded with :meth:`load`, in which case the data is memory-mapped so that
+    many processes can share the same index without each holding their own
+    copy. When pickled (e.g. to send to a :mod:`multiprocessing` worker), an
+    index that was loaded from disk only sends the file name.
+    
+    **Examples**
+    
+    >>> from numpy import array
+    >>> idx = CoordinateIndex((array([10,20,30.]),array([0,0,5.])))
+    >>> seps,inds = idx.queryNearest((array([10.5,29]),array([0,5])))
+    >>> inds
+    array([0, 2])
+    >>> '%.3f'%seps[0]
+    '0.500'
+    
+    """
+    def __init__(self,coords,spherical=True,leafsize=16):
+        """
+        :param coords: 
+            A D x N array with coordinate values or a sequence of
+            :class:`LatLongCoordinates` objects (see
+            :func:`match_nearest_coords`).
+        :param bool spherical: 
+            If True, the coordinates are (longitude,latitude) in degrees, and
+            all distances are great-circle separations in degrees. Otherwise,
+            the coordinates are treated as cartesian.
+        :param int leafsize: The leaf size of the kd-tree.
+        """
+        c = _coordinate_array(coords)
+        if spherical:
+            data = _lonlat_to_unitvec(c[0],c[1])
+        else:
+            data = np.array(c.T,dtype=float,order='C')
+        self._setData(data,spherical,leafsize,None)
         
+    def _setData(self,data,spherical,leafsize,filename):
+        self.data = data
+        self.spherical = spherical
+        self.leafsize = leafsize
+        self.filename = filename
+        self._kdt = None
         
+    def __len__(self):
+        return len(self.data)
+    
+    def __getstate__(self):
+        if self.filename is not None and isinstance(self.data,np.memmap):
+            return {'filename':self.filename,'leafsize':self.leafsize}
+        else:
+            return {'data':np.asarray(self.data),'spherical':self.spherical,
+                    'leafsize':self.leafsize}
+        
+    def __setstate__(self,d):
+        if 'filename' in d:
+            data,spherical = self._loadData(d['filename'],True)
+            self._setData(data,spherical,d['leafsize'],d['filename'])
+        else:
+            self._setData(d['data'],d['spherical'],d['leafsize'],None)
+    
+    @property
+    def kdtree(self):
+        """
+        The kd-tree for this index (built on first use).
+        """
+        if self._kdt is None:
+            KDTree = _get_kdtree_class()
+            self._kdt = KDTree(self.data,self.leafsize)
+        return self._kdt
+    
+    def _queryPoints(self,coords):
+        c = _coordinate_array(coords)
+        if self.spherical:
+            if c.shape[0] != 2:
+                raise ValueError('spherical CoordinateIndex requires 2D coordinates')
+            return _lonlat_to_unitvec(c[0],c[1])
+        else:
+            if c.shape[0] != self.data.shape[1]:
+                raise ValueError('query coordinates do not match CoordinateIndex dimension')
+            return c.T
+        
+    def _toSep(self,dist):
+        if self.spherical:
+            #misses from the tree have infinite distance - keep them that way
+            return np.where(np.isfinite(dist),_chord_to_angle(dist),np.inf)
+        else:
+            return dist
+    
+    def _toTreeDist(self,sep):
+        return _angle_to_chord(sep) if self.spherical else sep
+        
+    def queryNearest(self,coords,n=1,maxsep=None):
+        """
+        Finds the nearest reference object(s) for a set of coordinates.
+        
+        :param coords: 
+            A D x N array with coordinate values or a sequence of
+            :class:`LatLongCoordinates` objects to query.
+        :param int n: The number of nearest neighbors to find.
+        :param maxsep: 
+            The maximum separation to search or None for no limit. Objects
+            without a neighbor within this distance will have a separation of
+            inf and an index equal to the length of this index.
+        
+        :returns: 
+            (seps,inds) where `inds` are indecies into the reference set and
+            `seps` are the separations (in degrees for spherical indices). If
+            `n` is 1, these have length N, otherwise they have shape (N,n),
+            sorted from nearest to farthest.
+        """
+        pts = self._queryPoints(coords)
+        if maxsep is None:
+            dist,inds = self.kdtree.query(pts,n)
+        else:
+            dist,inds = self.kdtree.query(pts,n,distance_upper_bound=self._toTreeDist(maxsep))
+        return self._toSep(dist),inds
+    
+    def queryRadius(self,coords,radius):
+        """
+        Finds all reference objects within a given radius of a set of
+        coordinates.
+        
+        :param coords: 
+            A D x N array with coordinate values or a sequence of
+            :class:`LatLongCoordinates` objects to query.
+        :param float radius: 
+            The search radius (in degrees for spherical indices).
+        
+        :returns: 
+            (ind1,ind2,seps) where `ind1` are indecies into `coords`, `ind2`
+            are indecies into the reference set, and `seps` are the separations
+            of each pair. These are ordered by `ind1` and then `ind2`.
+        """
+        pts = self._queryPoints(coords)
+        ind1,ind2 = _match_pairs(pts,self.data,self._toTreeDist(radius),kdt2=self.kdtree)
+        return ind1,ind2,self._pairSeps(pts[ind1],self.data[ind2])
+    
+    def queryPairs(self,radius):
+        """
+        Finds all pairs of objects in the reference set that are within a given
+        distance of each other.
+        
+        :param float radius: 
+            The maximum separation (in degrees for spherical indices).
+        
+        :returns: 
+            (ind1,ind2,seps) where `ind1` and `ind2` are indecies into the
+            reference set with ind1 < ind2, and `seps` are the separations of
+            each pair. These are ordered by `ind1` and then `ind2`.
+        """
+        ind1,ind2 = _match_pairs(self.data,None,self._toTreeDist(radius),self.kdtree)
+        upper = ind1 < ind2
+        ind1,ind2 = ind1[upper],ind2[upper]
+        return ind1,ind2,self._pairSeps(self.data[ind1],self.data[ind2])
+    
+    def _pairSeps(self,p1,p2):
+        dist = np.sum((p1-p2)**2,axis=1)**0.5
+        return self._toSep(dist)
+    
+    def save(self,fn):
+        """
+        Saves this index to a numpy .npy file that can be loaded (and
+        memory-mapped) with :meth:`load`.
+        
+        :param str fn: 
+            The file name to save to. If it does not end in '.npy', that
+            extension will be added.
+        """
+        if not fn.endswith('.npy'):
+            fn += '.npy'
+        if self.spherical:
+            names = ['x','y','z']
+        else:
+            names = ['c%i'%i for i in range(self.data.shape[1])]
+        rec = np.empty(len(self.data),dtype=[(nm,float) for nm in names])
+        for i,nm in enumerate(names):
+            rec[nm] = self.data[:,i]
+        np.save(fn,rec)
+    
+    @staticmethod
+    def _loadData(fn,mmap):
+        if not fn.endswith('.npy'):
+            fn += '.npy'
+        rec = np.load(fn,mmap_mode='r' if mmap else None)
+        names = rec.dtype.names
+        if names is None:
+            raise ValueError('file %s is not a saved CoordinateIndex'%fn)
+        spherical = names==('x','y','z')
+        #all fields are float64, so this is a zero-copy view of the memmap
+        data = rec.view(float).reshape((len(rec),len(names)))
+        return data,spherical
+        
+    @classmethod
+    def load(cls,fn,mmap=True,leafsize=16):
+        """
+        Loads an index saved with :meth:`save`.
+        
+        :param str fn: 
+            The file name to load from. If it does not end in '.npy', that
+            extension will be added.
+        :param bool mmap: 
+            If True, the data are memory-mapped (read-only) instead of read
+            into memory.
+        :param int leafsize: The leaf size of the kd-tree.
+        
+        :returns: A :class:`CoordinateIndex` object.
+        """
+        data,spherical = cls._loadData(fn,mmap)
+        obj = cls.__new__(cls)
+        obj._setData(data,spherical,leafsize,fn if mmap else None)
+        return obj
+    
+def _coordinate_array(c):
+    """
+    Converts a D x N array or a sequence of :class:`LatLongCoordinates` objects
+    into a D x N float array (in degrees for :class:`LatLongCoordinates`).
+    """
+    c = np.array(c,ndmin=1,copy=False)
+    
+    if len(c.shape)==1:
+        #read the internal radian values directly to avoid AngularCoordinate
+        #property overhead for each object
+        a = np.fromiter((o._long._decval for o in c),float,c.size)
+        b = np.fromiter((o._lat._decval for o in c),float,c.size)
+        c = np.degrees((a,b))
+    elif len(c.shape)!=2:
+        raise ValueError('match_nearest_coords inputs have incorrect number of dimensions')
+    
+    return c
+    
+def _lonlat_to_unitvec(lon,lat,degrees=True):
+    """
+    Converts longitude and latitude arrays to an N x 3 array of unit vectors.
+    """
+    lon = np.array(lon,copy=False,dtype=float).ravel()
+    lat = np.array(lat,copy=False,dtype=float).ravel()
+    if degrees:
+        lon = np.radians(lon)
+        lat = np.radians(lat)
+        
+    uv = np.empty((lon.size,3))
+    coslat = np.cos(lat)
+    uv[:,0] = coslat*np.cos(lon)
+    uv[:,1] = coslat*np.sin(lon)
+    uv[:,2] = np.sin(lat)
+    return uv
+    
+def _angle_to_chord(ang,degrees=True):
+    """
+    Converts an angular separation on the unit sphere to a chord length.
+    """
+    if degrees:
+        ang = np.radians(ang)
+    return 2*np.sin(np.clip(ang,0,pi)/2)
+
+def _chord_to_angle(chord,degrees=True):
+    """
+    Converts a chord length on the unit sphere to an angular separation.
+    """
+    ang = 2*np.arcsin(np.clip(np.asarray(chord)/2,0,1))
+    return np.degrees(ang) if degrees else ang
+    
+def match_coords_zoned(cat1,cat2,eps,zoneheight=1,chunksize=1000000,
+                       cols=('ra','dec'),ext=1,tmpdir=None):
+    """
+    Cross-match two catalogs that may be too large to fit in memory, yielding
+    the matched pairs one declination zone at a time.
+    
+    Both catalogs are first read in chunks of `chunksize` rows and partitioned
+    into declination zones of height `zoneheight` in temporary files (the
+    second catalog with an overlap margin of `eps` on each side of the zone).
+    Each zone is then matched independently using great-circle separations
+    (see :func:`match_coords` with `spherical` True), so peak memory is set by
+    `chunksize` and the number of objects in a zone rather than by the size
+    of the catalogs.
+    
+    Each catalog may be any of:
+    
+    * A file name for a .npy file. The file is memory-mapped and may hold a
+      structured array (with the fields given by `cols`) or an N x 2 array of
+      (longitude,latitude).
+    * A file name for a FITS file with a binary table in extension `ext` that
+      has columns named by `cols`. Requires :mod:`pyfits`.
+    * A numpy structured array or record array with fields given by `cols`.
+    * A 2-sequence (long,lat) of arrays.
+    
+    :param cat1: The first catalog (see above).
+    :param cat2: The second catalog (see above).
+    :param float eps: The maximum separation for a match in degrees.
+    :param float zoneheight: The height of the declination zones in degrees.
+    :param int chunksize: The number of rows to read from a catalog at once.
+    :param cols: 
+        A 2-sequence of the names of the (longitude,latitude) fields/columns
+        for structured catalogs.
+    :param int ext: The FITS extension to use for FITS catalogs.
+    :param tmpdir: 
+        The directory to create the temporary zone files in, or None to use
+        the system default.
+        
+    :returns: 
+        A generator that yields (ind1,ind2,seps) for each zone with at least
+        one match. `ind1` and `ind2` are row indecies into the first and second
+        catalog for each matched pair, and `seps` are the separations of the
+        pairs in degrees. Within a zone the pairs are ordered by `ind1` and
+        then `ind2`, and every pair appears in exactly one zone.
+        
+    """
+    import tempfile,shutil,os
+    
+    nzones = int(np.ceil(180/zoneheight))
+    zdir = tempfile.mkdtemp(prefix='zonematch',dir=tmpdir)
+    fn1 = os.path.join(zdir,'cat1_%i.bin')
+    fn2 = os.path.join(zdir,'cat2_%i.bin')
+    try:
+        for cat,zfn,margin in ((cat1,fn1,0),(cat2,fn2,eps)):
+            with _CatalogReader(cat,cols,ext) as reader:
+                for start in range(0,len(reader),chunksize):
+                    stop = min(start+chunksize,len(reader))
+                    lon,lat = reader.read(start,stop)
+                    _write_zones(zfn,np.arange(start,stop),lon,lat,
+                                 zoneheight,nzones,margin)
+                
+        chord = _angle_to_chord(eps)
+        for i in range(nzones):
+            if not (os.path.exists(fn1%i) and os.path.exists(fn2%i)):
+                continue
+            z1 = np.fromfile(fn1%i,dtype=_zone_dtype)
+            z2 = np.fromfile(fn2%i,dtype=_zone_dtype)
+            os.remove(fn1%i)
+            os.remove(fn2%i)
+            
+            uv1 = _lonlat_to_unitvec(z1['lon'],z1['lat'])
+            uv2 = _lonlat_to_unitvec(z2['lon'],z2['lat'])
+            zi1,zi2 = _match_pairs(uv1,uv2,chord)
+            if len(zi1)>0:
+                ind1,ind2 = z1['ind'][zi1],z2['ind'][zi2]
+                seps = _chord_to_angle(np.sum((uv1[zi1]-uv2[zi2])**2,axis=1)**0.5)
+                srt = np.lexsort((ind2,ind1))
+                yield ind1[srt],ind2[srt],seps[srt]
+    finally:
+        shutil.rmtree(zdir,ignore_errors=True)
+        
+_zone_dtype = np.dtype([('ind',np.int64),('lon',float),('lat',float)])
+        
+def _write_zones(zfn,inds,lon,lat,zoneheight,nzones,margin):
+    """
+    Appends rows to the files for the declination zones they fall in (or
+    within `margin` of).
+    """
+    lo = np.clip(np.floor((lat-margin+90)/zoneheight),0,nzones-1).astype(int)
+    hi = np.clip(np.floor((lat+margin+90)/zoneheight),0,nzones-1).astype(int)
+    
+    for k in range(np.max(hi-lo)+1 if len(lo)>0 else 0):
+        inzone = lo+k <= hi
+        zones = lo[inzone]+k
+        rows = np.empty(np.sum(inzone),dtype=_zone_dtype)
+        rows['ind'] = inds[inzone]
+        rows['lon'] = lon[inzone]
+        rows['lat'] = lat[inzone]
+        
+        srt = np.argsort(zones,kind='mergesort')
+        zones,rows = zones[srt],rows[srt]
+        edges = np.r_[0,np.where(np.diff(zones))[0]+1,len(zones)]
+        for e0,e1 in zip(edges[:-1],edges[1:]):
+            if e1>e0:
+                with open(zfn%zones[e0],'ab') as f:
+                    rows[e0:e1].tofile(f)
+                    
+class _CatalogReader(object):
+    """
+    Context manager providing chunked access to the (longitude,latitude) 
+    values of a catalog for :func:`match_coords_zoned`.
+    """
+    def __init__(self,cat,cols,ext):
+        self.cat = cat
+        self.cols = cols
+        self.ext = ext
+        self._fitsfile = None
+        
+    def __enter__(self):
+        cat = self.cat
+        if isinstance(cat,basestring):
+            if cat.lower().endswith('.npy'):
+                cat = np.load(cat,mmap_mode='r')
+            else:
+                import pyfits
+                self._fitsfile = pyfits.open(cat,memmap=True)
+                cat = self._fitsfile[self.ext].data
+                
+        if getattr(cat,'dtype',None) is not None and cat.dtype.names is not None:
+            self.lon = cat.field(self.cols[0]) if hasattr(cat,'field') else cat[self.cols[0]]
+            self.lat = cat.field(self.cols[1]) if hasattr(cat,'field') else cat[self.cols[1]]
+        elif isinstance(cat,np.ndarray) and len(cat.shape)==2 and cat.shape[1]==2:
+            self.lon = cat[:,0]
+            self.lat = cat[:,1]
+        elif len(cat)==2:
+            self.lon = np.array(cat[0],copy=False).ravel()
+            self.lat = np.array(cat[1],copy=False).ravel()
+        else:
+            raise ValueError('Could not interpret catalog for matching')
+        
+        if len(self.lon) != len(self.lat):
+            raise ValueError("catalog longitude and latitude lengths don't match")
+        return self
+    
+    def __exit__(self,exc_type,exc_val,exc_tb):
+        if self._fitsfile is not None:
+            self._fitsfile.close()
+        self.lon = self.lat = None
+        return False
+        
+    def __len__(self):
+        return len(self.lon)
+        
+    def read(self,start,stop):
+        lon = np.array(self.lon[start:stop],dtype=float)
+        lat = np.array(self.lat[start:stop],dtype=float)
+        return lon,lat
     
 def separation_matrix(v,w=None,tri=False):
     """
@@ -714,6 +1783,9 @@ def separation_matrix(v,w=None,tri=False):
         and flexible at computing distances if individual components and sign
         information is unnecessary.
         
+        :func:`separation_matrix_blocks` computes the same matrix in blocks, for
+        inputs where the full matrix does not fit in memory.
+        
     """
     if w is None:
         w = v
@@ -731,14 +1803,97 @@ def separation_matrix(v,w=None,tri=False):
         return A
     
 
+def separation_matrix_blocks(v,w=None,tri=False,maxmem=2**27,norm=False):
+    """
+    Computes the same separations as :func:`separation_matrix`, but as a
+    generator over rectangular blocks of the separation matrix, so that the
+    full matrix never needs to be in memory at once. This allows reductions
+    (e.g. pair counts or the minimum separation) over catalogs for which the
+    full matrix would be far too large.
+    
+    :param v: The first array with first dimension n
+    :param w: 
+        The second array with first dimension m, and all following dimensions
+        matched to `v`. If None, `v` will be treated as `w` (e.g. the separation
+        matrix of `v` with itself will be generated).
+    :param bool tri: 
+        If True, the elements with column index less than the row index are
+        set to 0, and blocks that are entirely below the diagonal are skipped
+        (this is really only useful if w is None).
+    :param int maxmem: 
+        The approximate maximum size of each block in bytes. At least one 
+        row-column pair is always included.
+    :param bool norm: 
+        If True, the blocks are the euclidean norm of the separation over the
+        dimensions after the first (i.e. distances between the points) instead 
+        of the separations themselves.
+        
+    :returns: 
+        A generator yielding (rowslice,colslice,block) where `block` is equal to
+        ``separation_matrix(v,w)[rowslice,colslice]`` (or its norm, if `norm` is
+        True).
+        
+    **Examples**
+    
+    Count the pairs of points within a distance of 0.1 of each other, without
+    ever having more than 64 kB of separations in memory:
+    
+    >>> import numpy as np
+    >>> pts = np.random.rand(500,3)
+    >>> npairs = 0
+    >>> for rs,cs,d in separation_matrix_blocks(pts,tri=True,maxmem=2**16,norm=True):
+    ...     npairs += np.sum((d>0)&(d<=0.1))
+    >>> full = np.sum(separation_matrix(pts)**2,axis=-1)**0.5
+    >>> npairs == np.sum((full>0)&(full<=0.1))//2
+    True
+    
+    """
+    v = np.array(v,copy=False)
+    if w is None:
+        w = v
+    else:
+        w = np.array(w,copy=False)
+        
+    n,m = v.shape[0],w.shape[0]
+    rest = int(np.prod(v.shape[1:]))
+    itemsize = np.result_type(v,w).itemsize
+    maxelem = max(maxmem//itemsize,1)
+    
+    ncol = int(min(m,max(1,(maxelem/rest)**0.5)))
+    nrow = int(min(n,max(1,maxelem//(ncol*rest))))
+    
+    for r0 in range(0,n,nrow):
+        r1 = min(r0+nrow,n)
+        for c0 in range(0,m,ncol):
+            c1 = min(c0+ncol,m)
+            if tri and c1 <= r0:
+                continue
+            rs,cs = slice(r0,r1),slice(c0,c1)
+            A = separation_matrix(v[rs],w[cs])
+            if norm:
+                A = np.sum(A.reshape((r1-r0,c1-c0,rest))**2,axis=-1)**0.5
+            if tri and c0 < r1:
+                lower = np.arange(c0,c1) < np.arange(r0,r1)[:,np.newaxis]
+                A[lower] = 0
+            yield rs,cs,A
+    
+
 #<--------------------Cosmological distances and conversions------------------->
-def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}):
+_cosmo_disttypemap = {'comoving':0,'luminosity':1,'angular':2,'lookback':3,'distmod':4}
+
+def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={},
+                    method='auto'):
     """
     Calculates the cosmolgical distance to some object given a redshift. Note
     that this uses H0,omegaM,omegaL, and omegaR from the current
     :class:`astropyscs.constants.Cosmology` -- if any of those do not exist in
     the current cosmology this will fail.
     
+    Results for scalar redshifts (including the normalizations used for
+    `normed`) are stored in the current cosmology's result cache (see
+    :func:`astropysics.constants.get_cosmology_cache`), which is cleared when
+    the cosmology changes.
+    
     The distance type can be one of the following:
     
     * 'comoving'(0) : comoving distance (in Mpc)
@@ -766,7 +1921,22 @@ def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
     :type normed: boolean
     :param intkwargs: keywords for integrals (see :mod:`scipy.integrate`)
     :type intkwargs: a dictionary   
-    
+    :param method: 
+        Determines how the distance integrals are computed. Can be:
+        
+        * 'quad'
+            Each redshift is integrated individually with
+            :func:`scipy.integrate.quad`.
+        * 'table'
+            The integral is cumulatively tabulated once for the current
+            cosmological parameters (and `inttol`) and then interpolated, which
+            is much faster for large arrays of redshifts. The table is refined
+            until its fractional error is below `inttol`. Redshifts outside the
+            table range (z<0 or z>1e4) fall back to 'quad'.
+        * 'auto'
+            Uses 'table' for array inputs and 'quad' for scalars.
+            
+    :type method: string
     
     :returns: 
         Distance of type selected by `disttype` in above units or normalized as
@@ -804,6 +1974,10 @@ def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
     '0.956971'
         
     """
+    key = _cosmo_cache_key('cosmo_z_to_dist',z,zerr,disttype,inttol,normed,intkwargs,method)
+    return _cosmo_cached(key,_cosmo_z_to_dist,z,zerr,disttype,inttol,normed,intkwargs,method)
+    
+def _cosmo_z_to_dist(z,zerr,disttype,inttol,normed,intkwargs,method):
     from operator import isSequenceType
     from scipy.integrate import quad as integrate
     from numpy import array,vectorize,abs,isscalar
@@ -812,9 +1986,8 @@ def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
     
     c=c/1e5 #convert to km/s
     if type(disttype) == str:
-        disttypemap={'comoving':0,'luminosity':1,'angular':2,'lookback':3,'distmod':4}
         try:
-            disttype=disttypemap[disttype]
+            disttype=_cosmo_disttypemap[disttype]
         except KeyError,e:
             e.message='invalid disttype string'
             raise
@@ -831,18 +2004,18 @@ def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
             res = upper = 5
             while abs(res-upper) < inttol:
                 #-2 flips sign so that we get a minimum instead of a maximum
-                res = fminbound(cosmo_z_to_dist,0,upper,(None,-2,inttol,normed,intkwargs),inttol,full_output=1)
+                res = fminbound(cosmo_z_to_dist,0,upper,(None,-2,inttol,normed,intkwargs,method),inttol,full_output=1)
                 res = -res[1] #this is the actual value -- res[0] is the redshift at which it occurs
             return res
         else:
             #iterate towards large numbers until convergence achieved
             iterz = 1e6
-            currval = cosmo_z_to_dist(iterz,None,disttype,inttol,False,intkwargs)
+            currval = cosmo_z_to_dist(iterz,None,disttype,inttol,False,intkwargs,'quad')
             lastval = currval + 2*inttol
             while(abs(lastval-currval)>inttol):
                 lastval = currval
                 iterz *= 10
-                currval = cosmo_z_to_dist(iterz,None,disttype,inttol,False,intkwargs)
+                currval = cosmo_z_to_dist(iterz,None,disttype,inttol,False,intkwargs,'quad')
             return currval
         
     z = array(z,copy=False)
@@ -859,26 +2032,45 @@ def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
         def integrand(a,H0,R,M,L,K): #1/(a^2 H)
             return a*(R + M*a + L*a**4 + K*a**2)**-0.5/H0
         
-    if isSequenceType(a0):
-        integratevec = vectorize(lambda x:integrate(integrand,x,1,args=(H0,omegaR,
-                                             omegaM,omegaL,omegaK),**intkwargs))
-        res=integratevec(a0)
-        intres,interr = res[0],res[1]        
-        try:
-            if np.any(interr/intres > inttol):
-                raise Exception('Integral fractional error for one of the integrals is beyond tolerance')
-        except ZeroDivisionError:
-            pass
-        
+    def quadint(a0):
+        if isSequenceType(a0):
+            integratevec = vectorize(lambda x:integrate(integrand,x,1,args=(H0,omegaR,
+                                                 omegaM,omegaL,omegaK),**intkwargs))
+            res=integratevec(a0)
+            intres,interr = res[0],res[1]        
+            try:
+                if np.any(interr/intres > inttol):
+                    raise Exception('Integral fractional error for one of the integrals is beyond tolerance')
+            except ZeroDivisionError:
+                pass
+            
+        else:
+            res=integrate(integrand,a0,1,args=(H0,omegaR,omegaM,omegaL,omegaK),**intkwargs)
+            intres,interr=res[0],res[1]
+            
+            try:
+                if interr/intres > inttol:
+                    raise Exception('Integral fractional error is '+str(interr/intres)+', beyond tolerance'+str(inttol))
+            except ZeroDivisionError:
+                pass
+        return intres
+    
+    if method == 'auto':
+        method = 'quad' if z.shape==() else 'table'
+    
+    if method == 'table':
+        table = _get_cosmo_dist_table(H0,omegaM,omegaL,omegaR,disttype==3,inttol)
+        intres = table(z)
+        outside = np.isnan(intres)
+        if np.any(outside):
+            if intres.shape == ():
+                intres = quadint(a0)
+            else:
+                intres[outside] = quadint(a0[outside])
+    elif method == 'quad':
+        intres = quadint(a0)
     else:
-        res=integrate(integrand,a0,1,args=(H0,omegaR,omegaM,omegaL,omegaK),**intkwargs)
-        intres,interr=res[0],res[1]
-        
-        try:
-            if interr/intres > inttol:
-                raise Exception('Integral fractional error is '+str(interr/intres)+', beyond tolerance'+str(inttol))
-        except ZeroDivisionError:
-            pass
+        raise ValueError('unrecognized method %s'%method)
     
     if disttype == 3: #lookback integrand
         d = c*intres*3.26163626e-3
@@ -903,7 +2095,7 @@ def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
             raise KeyError('unknown disttype')
         
     if normed:
-        nrm = 1/cosmo_z_to_dist(None if normed is True else normed,None,disttype,inttol,intkwargs)
+        nrm = 1/cosmo_z_to_dist(None if normed is True else normed,None,disttype,inttol,False,intkwargs,method)
     else:
         nrm = 1
         
@@ -915,20 +2107,180 @@ def cosmo_z_to_dist(z,zerr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
     else:
         if not isscalar(zerr):
             zerr = array(zerr,copy=False) 
-        upper=cosmo_z_to_dist(z+zerr,None,disttype,inttol,intkwargs)
-        lower=cosmo_z_to_dist(z-zerr,None,disttype,inttol,intkwargs)
+        upper=cosmo_z_to_dist(z+zerr,None,disttype,inttol,False,intkwargs,method)
+        lower=cosmo_z_to_dist(z-zerr,None,disttype,inttol,False,intkwargs,method)
         return nrm*d,nrm*(upper-d),nrm*(d-lower)
     
-def cosmo_dist_to_z(d,derr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}):
+class _CosmoDistanceTable(object):
+    """
+    A cumulative table of the comoving distance (or lookback time) integral for
+    a particular set of cosmological parameters, used by
+    :func:`cosmo_z_to_dist` for the 'table' method.
+    
+    The integral is tabulated on a uniform grid in x = ln(1+z), using Simpson's
+    rule on each interval, and interpolated with cubic Hermite polynomials using
+    the exact integrand as the derivative. The grid is refined until the
+    interpolated values of the coarser table match the finer one to within
+    the fractional tolerance `inttol`.
+    """
+    def __init__(self,H0,omegaM,omegaL,omegaR,lookback,inttol,zmax=1e4,nstart=128):
+        self.H0 = H0
+        self.R,self.M,self.L = omegaR,omegaM,omegaL
+        self.K = 1 - omegaM - omegaL - omegaR
+        self.lookback = lookback
+        self.zmax = zmax
+        self.xmax = np.log1p(zmax)
+        
+        n = nstart
+        x,I,g = self._tabulate(n)
+        while True:
+            n *= 2
+            if n > 2**22:
+                raise ValueError('Could not construct cosmological distance table to tolerance %g'%inttol)
+            x2,I2,g2 = self._tabulate(n)
+            #compare coarse table interpolation to new nodes
+            Ic = self._hermite(x2[1::2],x,I,g)
+            if np.max(np.abs(Ic-I2[1::2])/I2[1::2]) < inttol:
+                break
+            x,I,g = x2,I2,g2
+        self.x,self.I,self.g = x2,I2,g2
+        
+    def _integrand(self,x):
+        """
+        The integrand in terms of x = ln(1+z), i.e. a/(a^2 H) or a^2/(a^2 H) 
+        """
+        a = np.exp(-x)
+        res = a*(self.R + self.M*a + self.L*a**4 + self.K*a**2)**-0.5/self.H0
+        if self.lookback:
+            res *= a
+        return res
+        
+    def _tabulate(self,n):
+        x = np.linspace(0,self.xmax,n+1)
+        h = x[1]-x[0]
+        g = self._integrand(x)
+        gmid = self._integrand(x[:-1]+h/2)
+        I = np.empty_like(x)
+        I[0] = 0
+        np.cumsum(h*(g[:-1]+4*gmid+g[1:])/6,out=I[1:])
+        return x,I,g
+    
+    @staticmethod
+    def _hermite(xi,x,I,g):
+        h = x[1]-x[0]
+        k = np.clip((xi/h).astype(int),0,len(x)-2)
+        t = xi/h - k
+        t2 = t*t
+        t3 = t2*t
+        return ((2*t3-3*t2+1)*I[k] + (t3-2*t2+t)*h*g[k] +
+                (-2*t3+3*t2)*I[k+1] + (t3-t2)*h*g[k+1])
+    
+    def __call__(self,z):
+        """
+        Computes the integral for the given redshift(s).  NaN is returned for
+        redshifts outside the table.
+        """
+        z = np.array(z,dtype=float,copy=False)
+        valid = (z>=0)&(z<=self.zmax)
+        x = np.log1p(np.where(valid,z,0))
+        res = self._hermite(x,self.x,self.I,self.g)
+        return np.where(valid,res,np.nan)
+    
+def _get_cosmo_dist_table(H0,omegaM,omegaL,omegaR,lookback,inttol):
+    """
+    Retrieves the :class:`_CosmoDistanceTable` for the given parameters from
+    the current cosmology's cache, building it if necessary.
+    """
+    from ..constants import get_cosmology_cache
+    
+    cache = get_cosmology_cache()
+    key = ('_CosmoDistanceTable',H0,omegaM,omegaL,omegaR,lookback,inttol)
+    try:
+        return cache[key]
+    except KeyError:
+        table = cache[key] = _CosmoDistanceTable(*key[1:])
+        return table
+    
+def _cosmo_cache_key(*args):
+    """
+    Generates a key for the current cosmology's result cache from the arguments
+    of a function, or returns None if the arguments are not suitable for 
+    caching (e.g. arrays).
+    """
+    def tagbool(a):
+        #True == 1 and False == 0 as keys, but e.g. normed=True and normed=1
+        #do not give the same result
+        return ('bool',a) if isinstance(a,(bool,np.bool_)) else a
+    
+    key = []
+    for a in args:
+        if isinstance(a,dict):
+            a = tuple(sorted([(k,tagbool(v)) for k,v in a.items()]))
+        elif isinstance(a,np.ndarray):
+            if a.shape == ():
+                a = a.item()
+            else:
+                return None
+        key.append(tagbool(a))
+    key = tuple(key)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+    
+def _cosmo_cached(key,func,*args):
+    """
+    Calls `func` with the given arguments, first checking if the result is in
+    the current cosmology's result cache under `key` (unless it is None).
+    """
+    from ..constants import get_cosmology_cache
+    
+    if key is None:
+        return func(*args)
+    
+    cache = get_cosmology_cache()
+    try:
+        return cache[key]
+    except KeyError:
+        res = cache[key] = func(*args)
+        return res
+    
+def cosmo_dist_to_z(d,derr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={},
+                    method='auto',branch='low'):
     """
     Convert a distance to a redshift. See :func:`cosmo_z_to_dist` for meaning of
     parameters. Note that if `d` is None, the maximum distance will be returned.
+    
+    For the 'table' `method`, the distance curve tabulated for
+    :func:`cosmo_z_to_dist` is inverted directly (by bracketing each distance
+    between table nodes and refining with safeguarded Newton iterations), so
+    arrays of distances are converted in a few vectorized passes. Distances 
+    that are not reached by the distance curve give NaN for this method. The
+    'auto' method uses 'table' for array inputs and for the angular diameter
+    distance, and otherwise does a root-find on each scalar value.
+    
+    :param branch:
+        The angular diameter distance increases to a maximum and then decreases
+        with redshift, so each distance corresponds to two redshifts. If
+        `branch` is 'low', the redshift below the turnover is returned, and if
+        'high', the redshift above it. Ignored for other distance types.
+    :type branch: string
+    
+    :returns: 
+        The redshift for `d`. If `derr` is not None, the output is
+        (z,zupper,zlower) where `zupper` and `zlower` are the changes in
+        redshift for `d` + `derr` and `d` - `derr`.
     """
+    key = _cosmo_cache_key('cosmo_dist_to_z',d,derr,disttype,inttol,normed,intkwargs,method,branch)
+    return _cosmo_cached(key,_cosmo_dist_to_z,d,derr,disttype,inttol,normed,intkwargs,method,branch)
+    
+def _cosmo_dist_to_z(d,derr,disttype,inttol,normed,intkwargs,method,branch):
     from scipy.optimize import brenth
     maxz=10000.0
     
-    if derr is not None:
-        raise NotImplementedError
+    if isinstance(disttype,basestring):
+        disttype = _cosmo_disttypemap[disttype]
     
     if d is None:
         if disttype==2:
@@ -942,6 +2294,21 @@ def cosmo_dist_to_z(d,derr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
             return res
         else:
             d = cosmo_z_to_dist(None,None,disttype,inttol,normed,intkwargs)
+            
+    if derr is not None:
+        d = np.array(d,copy=False)
+        z = cosmo_dist_to_z(d,None,disttype,inttol,normed,intkwargs,method,branch)
+        upper = cosmo_dist_to_z(d+derr,None,disttype,inttol,normed,intkwargs,method,branch)
+        lower = cosmo_dist_to_z(d-derr,None,disttype,inttol,normed,intkwargs,method,branch)
+        return z,upper-z,z-lower
+            
+    if method == 'auto':
+        method = 'quad' if np.isscalar(d) and disttype != 2 else 'table'
+    
+    if method == 'table':
+        return _cosmo_table_inverse(d,disttype,inttol,normed,intkwargs,branch)
+    elif method != 'quad':
+        raise ValueError('unrecognized method %s'%method)
     
     f=lambda z,dmin:dmin-cosmo_z_to_dist(z,None,disttype,inttol,normed,intkwargs)
     try:
@@ -953,7 +2320,75 @@ def cosmo_dist_to_z(d,derr=None,disttype=0,inttol=1e-6,normed=False,intkwargs={}
     zval = brenth(f,0,maxz,(d,),xtol=inttol)
     
     return zval
+
+def _cosmo_table_inverse(d,disttype,inttol,normed,intkwargs,branch,maxiter=50):
+    """
+    Inverts the tabulated distance curve used by :func:`cosmo_z_to_dist` to get
+    redshifts for an array of distances.
+    """
+    from ..constants import H0,omegaM,omegaL,omegaR
     
+    d = np.array(d,dtype=float,copy=False)
+    
+    def dist(x):
+        return cosmo_z_to_dist(np.expm1(x),None,disttype,inttol,normed,intkwargs,'table')
+    
+    table = _get_cosmo_dist_table(H0,omegaM,omegaL,omegaR,abs(disttype)==3,inttol)
+    xs = table.x[1:] #skip z=0 because the distance modulus is infinite there
+    Ds = dist(xs)
+    
+    if abs(disttype) == 2:
+        zpeak = cosmo_dist_to_z(None,None,2,inttol,normed,intkwargs)
+        xpeak = np.log1p(zpeak)
+        if branch == 'low':
+            xs = np.r_[xs[xs<xpeak],xpeak]
+        elif branch == 'high':
+            xs = np.r_[xpeak,xs[xs>xpeak]]
+        else:
+            raise ValueError('unrecognized branch %s'%branch)
+        Ds = dist(xs)
+    if abs(disttype) == 4:
+        #distance modulus diverges at z=0, so add nodes approaching 0
+        xsmall = np.logspace(-10,np.log10(xs[0]),32)[:-1]
+        xs,Ds = np.r_[xsmall,xs],np.r_[dist(xsmall),Ds]
+    elif abs(disttype) != 2 or branch == 'low':
+        xs,Ds = np.r_[0,xs],np.r_[0,Ds]
+        
+    #make the curve increasing for searchsorted
+    sgn = 1 if Ds[-1] > Ds[0] else -1
+    Dsrt = sgn*Ds
+    dflat = sgn*d.ravel()
+    
+    k = np.searchsorted(Dsrt,dflat)-1
+    valid = (k>=0) & (k<len(xs)-1) | (dflat==Dsrt[0])
+    k = np.clip(k,0,len(xs)-2)
+    
+    xlo,xhi = xs[k],xs[k+1]
+    Dlo,Dhi = Dsrt[k],Dsrt[k+1]
+    x = xlo + (dflat-Dlo)*(xhi-xlo)/(Dhi-Dlo)
+    
+    hx = 1e-7
+    active = valid.copy()
+    for i in range(maxiter):
+        if not np.any(active):
+            break
+        xa = x[active]
+        fa = sgn*dist(xa)-dflat[active]
+        dfdx = sgn*(dist(xa+hx)-dist(xa-hx))/(2*hx)
+        xn = np.clip(xa-fa/dfdx,xlo[active],xhi[active])
+        x[active] = xn
+        #convergence criterion is on the absolute redshift, as for brenth 
+        conv = np.abs(xn-xa)*np.exp(xn) < inttol
+        active[active] = ~conv
+        
+    z = np.expm1(x)
+    z[~valid] = np.nan
+    if d.shape:
+        return z.reshape(d.shape)
+    elif valid[0]:
+        return float(z[0])
+    else:
+        raise ValueError('input distance %g impossible'%float(d))
     
 def cosmo_z_to_H(z,zerr=None):
     """
@@ -3801,7 +3801,9 @@ class TextTableAction(ActionNode):
         self.fmt = fmt
         """
         The formatting specifier for each of the columns. Must be a single
-        string or a sequence that matches arrnames.
+        string or a sequence that matches arrnames. The special values 'hms'
+        and 'dms' format columns of decimal degrees as fixed-width sexagesimal
+        strings (hours or degrees), with errors in arcseconds.
         """
         self.errors = errors
         """
@@ -3861,7 +3863,7 @@ class TextTableAction(ActionNode):
         if isinstance(self.fmt,basestring):
             fmts = [self.fmt]*len(titles)
         else:
-            fmts = self.fmt
+            fmts = list(self.fmt)
         if len(fmts) != len(self.arrnames):
             raise ValueError('fmt does not match arrnames')
 
@@ -3944,6 +3946,14 @@ class TextTableAction(ActionNode):
             sorti = np.argsort(arrs[int(i)])
             arrs = [arr[sorti] for arr in arrs]
 
+        #sexagesimal columns are formatted all at once, with errors in arcsec
+        efmts = list(fmts)
+        for j,fmt in enumerate(fmts):
+            if fmt == 'hms' or fmt == 'dms':
+                arrs[j] = _sexagesimal_column(arrs[j],fmt)
+                errs[j] = np.asarray(errs[j])*3600
+                fmts[j],efmts[j] = '%s','%.3f'
+
         if self.tabformat.startswith('ascii'):
             if self.tabformat[5:]=='':
                 sep = ' '
@@ -3963,15 +3973,15 @@ class TextTableAction(ActionNode):
             if self.details is not None:
                 for ti,det in zip(titles,self.details):
                     lines.append('#%s: %s'%(ti,det))
-            elif storesources is not None:
+            elif storesources:
                 lines.append('#'+srcannotation)
             if self.errors:
                 erravg = np.sum(errs,axis=-1)/2.
                 for i in range(len(arrs[0])):
                     ss = []
-                    for arr,err,fmt in zip(arrs,erravg,fmts):
+                    for arr,err,fmt,efmt in zip(arrs,erravg,fmts,efmts):
                         ss.append(fmt%arr[i])
-                        ss.append(fmt%err[i])
+                        ss.append(efmt%err[i])
                     lines.append(sep.join(ss))
             else:
                 for i in range(len(arrs[0])):
@@ -3987,11 +3997,11 @@ class TextTableAction(ActionNode):
             if self.errors:
                 for i in range(len(arrs[0])):
                     ss = []
-                    for arr,err,fmt in zip(arrs,errs,fmts):
+                    for arr,err,fmt,efmt in zip(arrs,errs,fmts,efmts):
                         if arr[i] is np.ma.masked:
                             ss.append('\\nodata')
                         else:
-                            errsubstrfmt = ('^{+'+fmt+'}_{-'+fmt+'}')
+                            errsubstrfmt = ('^{+'+efmt+'}_{-'+efmt+'}')
                             errsubstr = errsubstrfmt%tuple(err[i])
                             ss.append(fmt%arr[i]+errsubstr)
                     lines.append(' & '.join(ss)+r'\\')
@@ -4027,11 +4037,11 @@ class TextTableAction(ActionNode):
             if self.errors:
                 for i in range(len(arrs[0])):
                     ss = []
-                    for arr,err,fmt in zip(arrs,errs,fmts):
+                    for arr,err,fmt,efmt in zip(arrs,errs,fmts,efmts):
                         if arr[i] is np.ma.masked:
                             ss.append('\\nodata')
                         else:
-                            errsubstrfmt = ('^{+'+fmt+'}_{-'+fmt+'}')
+                            errsubstrfmt = ('^{+'+efmt+'}_{-'+efmt+'}')
                             errsubstr = errsubstrfmt%tuple(err[i])
                             ss.append(fmt%arr[i]+errsubstr)
                     lines.append(' & '.join(ss)+r'\\')
@@ -4063,6 +4073,19 @@ class TextTableAction(ActionNode):
         return tabtxt
 
 
+def _sexagesimal_column(arr,fmt):
+    """
+    Formats a (possibly masked) column of decimal degrees as a masked array of
+    'hms' or 'dms' strings for :class:`TextTableAction`.
+    """
+    from .coords.funcs import decimal_to_hms_str,decimal_to_dms_str
+
+    vals = np.ma.asarray(arr,dtype=float)
+    formatter = decimal_to_hms_str if fmt=='hms' else decimal_to_dms_str
+    strs = formatter(vals.filled(np.nan))
+    return np.ma.array(strs,mask=np.ma.getmaskarray(vals))
+
+
 class GraphAction(ActionNode):
     """
     This :class:`ActionNode` will generate a :class:`networkx.DiGraph` object
@@ -224,6 +224,71 @@ class _LinkedDict(dict):
             return default
         
         
+class LRUCache(MutableMapping):
+    """
+    A dict-like cache that holds at most :attr:`maxsize` items. When a new item
+    is added to a full cache, the least-recently used item is discarded.
+    
+    The number of successful and failed lookups are recorded in :attr:`hits`
+    and :attr:`misses`.
+    
+    .. warning::
+        This class is probably not at all thread safe.
+    
+    """
+    def __init__(self,maxsize=128):
+        """
+        :param int maxsize: The maximum number of items to store.
+        """
+        self._data = {}
+        self._tick = 0
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        
+    def _getMaxsize(self):
+        return self._maxsize
+    def _setMaxsize(self,val):
+        if val < 1:
+            raise ValueError('LRUCache maxsize must be at least 1')
+        self._maxsize = int(val)
+        while len(self._data) > self._maxsize:
+            self._evict()
+    maxsize = property(_getMaxsize,_setMaxsize,doc="""
+    The maximum number of items in the cache.
+    """)
+    
+    def _evict(self):
+        oldest = min(self._data.iteritems(),key=lambda kv:kv[1][0])[0]
+        del self._data[oldest]
+    
+    def __getitem__(self,key):
+        try:
+            entry = self._data[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        self._tick += 1
+        entry[0] = self._tick
+        return entry[1]
+    def __setitem__(self,key,val):
+        if key not in self._data and len(self._data) >= self._maxsize:
+            self._evict()
+        self._tick += 1
+        self._data[key] = [self._tick,val]
+    def __delitem__(self,key):
+        del self._data[key]
+    def __contains__(self,key):
+        return key in self._data
+    def __len__(self):
+        return len(self._data)
+    def __iter__(self):
+        return iter(self._data)
+    def clear(self):
+        self._data.clear()
+    def __str__(self):
+        return 'LRUCache(%i/%i items)'%(len(self._data),self._maxsize)
+        
 class DataObjectRegistry(dict):
     """
     A class to register data sets used throughout a module and enable easy 
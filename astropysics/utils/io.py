@@ -195,6 +195,69 @@ def get_package_data(dataname):
     path = dirname(rootfile)+'/data/'+dataname
     return get_loader(rootname).get_data(path)
 
+def get_package_data_arrays(dataname,parser,version=0):
+    """
+    Loads a package data file (see :func:`get_package_data`) that must be parsed
+    into numpy arrays, caching the parsed arrays as a binary file.
+
+    The first time this is called for a given data file, `parser` is called
+    with the content of the file and the result is saved as a .npz file in the
+    astropysics data directory (see :func:`astropysics.config.get_data_dir`).
+    The cache file name includes a hash of the file content, so a changed data
+    file will be re-parsed. Later calls (including from other processes) just
+    load the binary arrays. If the cache cannot be written (e.g. the home
+    directory is read-only), the parsed arrays are returned without caching.
+
+    :param str dataname:
+        The name of a file in the package data directory.
+    :param parser:
+        A callable that accepts the content of the data file as a string and
+        returns a dictionary mapping strings to arrays.
+    :param int version:
+        A version number for the `parser` output - this should be incremented
+        whenever `parser` changes to invalidate previously-cached files.
+
+    :returns: A dictionary mapping names to arrays, as returned by `parser`.
+    """
+    import os
+    from hashlib import sha1
+    from ..config import get_data_dir
+
+    content = get_package_data(dataname)
+    cachefn = '%s-%s-%i.npz'%(dataname,sha1(content).hexdigest()[:16],version)
+
+    try:
+        cachefn = os.path.join(get_data_dir(),'pkgcache',cachefn)
+    except OSError:
+        return parser(content)
+
+    if os.path.exists(cachefn):
+        try:
+            npz = np.load(cachefn)
+            try:
+                return dict([(k,npz[k]) for k in npz.files])
+            finally:
+                npz.close()
+        except (IOError,ValueError):
+            pass #corrupted cache file - just re-parse and overwrite it
+
+    res = parser(content)
+
+    #write to a temporary file and rename so that other processes never see
+    #a partially-written file
+    try:
+        cachedir = os.path.dirname(cachefn)
+        if not os.path.isdir(cachedir):
+            os.mkdir(cachedir)
+        tmpfn = '%s.%i.tmp'%(cachefn,os.getpid())
+        with open(tmpfn,'wb') as f:
+            np.savez(f,**res)
+        os.rename(tmpfn,cachefn)
+    except (IOError,OSError):
+        pass
+
+    return res
+
 def _readrem(remote,reportprogress=False):
     """
     Reads the provided remote url and returns the result, possible reporting
@@ -810,7 +873,7 @@ class FixedColumnDataParser(object):
         else:
             return recarr,masks
 
-    def writeFile(self,fn,data,masks=None,colstart='# '):
+    def writeFile(self,fn,data,masks=None,colstart='# ',formatters=None):
         """
         Writes a data array out to a data file using this format.
 
@@ -828,37 +891,64 @@ class FixedColumnDataParser(object):
         :type masks: None or dict
         :param colstart: the string to use to indicate a column specifier
         :type colstart: string
+        :param formatters:
+            If supplied, maps field names to functions that convert a whole
+            column of `data` into an array of strings, or to 'hms' or 'dms' to
+            write a column of decimal degrees as fixed-width sexagesimal strings
+            (see :func:`~astropysics.coords.funcs.decimal_to_hms_str` and
+            :func:`~astropysics.coords.funcs.decimal_to_dms_str`). The dtype of
+            these fields is not checked against the column format. Other fields
+            are written using :func:`str`.
+        :type formatters: None or dict
 
         :except TypeError: If the data dtype doesn't match the columns.
         """
-        for n,(l,u,f) in self.cols.iteritems():
-            for k,(dt,c) in data.dtype.fields.iteritems():
-                if k==n:
-                    if dt != f:
-                        raise TypeError('Data dtype %s does not match column type %s'%(dt,f))
-                    break
-            else:
+        if formatters is None:
+            formatters = {}
+        for n,(l,u,fmt,convs) in self.cols.iteritems():
+            if n not in data.dtype.names:
                 raise TypeError('Data field %s not a column'%n)
+            dt = data.dtype.fields[n][0]
+            if fmt is not None and n not in formatters and dt != fmt:
+                raise TypeError('Data dtype %s does not match column type %s'%(dt,fmt))
 
-        sortedcols = sorted([(l,n) for n,(l,u,f) in self.cols.iteritems()])
+        sortedcols = sorted([(l,n) for n,(l,u,fmt,convs) in self.cols.iteritems()])
         sortedcols = [e[1] for e in sortedcols]
 
+        #build each line from whole-column string arrays
+        lines = np.zeros(len(data),dtype='S1')
+        oldu = self.firstcolindx-1
+        for n in sortedcols:
+            l,u,fmt,convs = self.cols[n]
+            chrs = u-l+1
+            formatter = formatters.get(n,None)
+            if formatter is None:
+                strs = np.array([str(v) for v in data[n]],dtype=str)
+            elif formatter == 'hms' or formatter == 'dms':
+                from ..coords.funcs import decimal_to_hms_str,decimal_to_dms_str
+                sgfmtr = decimal_to_hms_str if formatter=='hms' else decimal_to_dms_str
+                strs = sgfmtr(data[n])
+            else:
+                strs = np.asarray(formatter(data[n]))
+            strs = np.char.ljust(strs.astype('S%i'%chrs),chrs)
+            if masks is not None and n in masks:
+                strs[~np.asarray(masks[n],dtype=bool)] = ' '*chrs
+            lines = np.char.add(lines,' '*(l-oldu-1))
+            lines = np.char.add(lines,strs)
+            oldu = u
 
         with open(fn,'w') as f:
             for n in sortedcols:
-                l,u,f = self.cols[n]
-                f.write(colstart+' '.join((n,l,u,f))+'\n')
+                l,u,fmt,convs = self.cols[n]
+                colspec = [n,str(l),str(u)]
+                if n in formatters:
+                    colspec.append('S%i'%(u-l+1))
+                elif fmt is not None:
+                    colspec.append(fmt.str)
+                f.write(colstart+' '.join(colspec)+'\n')
             f.write('\n')
-
-            for rec in data:
-                oldu=0
-                for n in sortedcols:
-                    l,u,f = self.cols[n]
-                    spaces = l-oldu-1
-                    chrs = u-l+1
-                    if spaces>0:
-                        f.write(' '*spaces)
-                    f.write(str(rec[n])[:(u-l+1)])
+            for line in lines:
+                f.write(line)
                 f.write('\n')
 
 
@@ -415,3 +415,665 @@ def test_EquatorialCoordinatesEquinox_initialization():
     assert m101_duplicate.decerr == m101.decerr
     assert m101_duplicate.epoch == m101.epoch
     assert m101_duplicate.distancepc == m101.distancepc
+
+def test_match_coords():
+    """Check tree-based match_coords against a brute-force separation matrix.
+    """
+    import numpy as np
+    from astropysics.coords.funcs import match_coords
+
+    rng = np.random.RandomState(12345)
+    a1,b1 = rng.uniform(0,10,300),rng.uniform(0,10,300)
+    a2,b2 = rng.uniform(0,10,200),rng.uniform(0,10,200)
+    eps = 0.3
+
+    sep = np.hypot(a1[:,np.newaxis]-a2,b1[:,np.newaxis]-b2)
+    matches = sep <= eps
+
+    m1,m2 = match_coords(a1,b1,a2,b2,eps,mode='mask')
+    assert np.all(m1 == np.any(matches,axis=1))
+    assert np.all(m2 == np.any(matches,axis=0))
+
+    i1,i2 = match_coords(a1,b1,a2,b2,eps,mode='index')
+    w1,w2 = np.where(matches)
+    assert np.all(i1 == w1) and np.all(i2 == w2)
+
+    assert match_coords(a1,b1,a2,b2,eps,mode='count') == (np.sum(m1),np.sum(m2))
+
+    m2d = match_coords(a1,b1,a2,b2,eps,mode='match2D')
+    assert np.all(m2d.toarray() == matches.T)
+
+def test_match_coords_spherical():
+    """Check spherical matching across the RA=0 seam and near the pole.
+    """
+    import numpy as np
+    from astropysics.coords.funcs import match_coords,match_nearest_coords,\
+                                         coordinate_kdtree
+
+    ra1,dec1 = np.array([359.99,10,45,180]),np.array([0,89.99,-30,0])
+    ra2,dec2 = np.array([0.005,190,45,10]),np.array([0.002,89.995,-30.01,50])
+    eps = 0.02
+
+    i1,i2 = match_coords(ra1,dec1,ra2,dec2,eps,mode='index',spherical=True)
+    assert list(i1)==[0,1,2] and list(i2)==[0,1,2],(i1,i2)
+    #the flat match misses the seam and pole pairs
+    assert match_coords(ra1,dec1,ra2,dec2,eps,mode='count') == (1,1)
+
+    seps,inds = match_nearest_coords((ra1,dec1),(ra2,dec2),spherical=True)
+    kdt = coordinate_kdtree((ra2,dec2),spherical=True)
+    seps2,inds2 = match_nearest_coords((ra1,dec1),kdt,spherical=True)
+    assert np.all(inds == inds2) and np.all(seps == seps2)
+
+    r1,d1,r2,d2 = [np.radians(a) for a in (ra1,dec1,ra2[inds],dec2[inds])]
+    hav = np.sin((d2-d1)/2)**2 + np.cos(d1)*np.cos(d2)*np.sin((r2-r1)/2)**2
+    assert np.allclose(seps,np.degrees(2*np.arcsin(np.sqrt(hav))),rtol=1e-8)
+
+def test_coordinate_index():
+    """Check CoordinateIndex queries and the save/memory-mapped load round trip.
+    """
+    import os,pickle,tempfile,shutil
+    import numpy as np
+    from astropysics.coords.funcs import CoordinateIndex,match_coords
+
+    rng = np.random.RandomState(42)
+    ra,dec = rng.uniform(0,360,2000),np.degrees(np.arcsin(rng.uniform(-1,1,2000)))
+    qra,qdec = rng.uniform(0,360,500),np.degrees(np.arcsin(rng.uniform(-1,1,500)))
+
+    idx = CoordinateIndex((ra,dec))
+    i1,i2,seps = idx.queryRadius((qra,qdec),3)
+    m1,m2 = match_coords(qra,qdec,ra,dec,3,mode='index',spherical=True)
+    assert np.all(i1 == m1) and np.all(i2 == m2)
+    assert np.all(seps <= 3)
+
+    p1,p2,pseps = idx.queryPairs(1)
+    assert np.all(p1 < p2) and np.all(pseps <= 1)
+
+    s0,n0 = idx.queryNearest((qra,qdec))
+    s1,n1 = idx.queryNearest((qra,qdec),maxsep=1)
+    miss = s0 > 1
+    assert np.any(miss) and not np.all(miss)
+    assert np.all(np.isinf(s1[miss])) and np.all(n1[miss] == len(ra))
+    assert np.all(s1[~miss] == s0[~miss]) and np.all(n1[~miss] == n0[~miss])
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        fn = os.path.join(tmpdir,'idx.npy')
+        idx.save(fn)
+        idx2 = CoordinateIndex.load(fn)
+        assert isinstance(idx2.data,np.memmap)
+        idx3 = pickle.loads(pickle.dumps(idx2,-1))
+        for ix in (idx2,idx3):
+            s1,n1 = idx.queryNearest((qra,qdec),3)
+            s2,n2 = ix.queryNearest((qra,qdec),3)
+            assert np.all(n1 == n2) and np.all(s1 == s2)
+        del idx2,idx3,ix
+    finally:
+        shutil.rmtree(tmpdir)
+
+def test_match_coords_zoned():
+    """Check the zone-partitioned cross-match against match_coords.
+    """
+    import os,tempfile,shutil
+    import numpy as np
+    from astropysics.coords.funcs import match_coords,match_coords_zoned
+
+    rng = np.random.RandomState(7)
+    cat1 = np.empty(3000,dtype=[('ra',float),('dec',float)])
+    cat1['ra'] = rng.uniform(0,360,3000)
+    cat1['dec'] = np.degrees(np.arcsin(rng.uniform(-1,1,3000)))
+    ra2 = cat1['ra'][::3] + rng.normal(0,0.3,1000)
+    dec2 = np.clip(cat1['dec'][::3] + rng.normal(0,0.3,1000),-90,90)
+    eps = 0.5
+
+    i1,i2 = match_coords(cat1['ra'],cat1['dec'],ra2,dec2,eps,'index',spherical=True)
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        fn = os.path.join(tmpdir,'cat1.npy')
+        np.save(fn,cat1)
+        res = list(match_coords_zoned(fn,(ra2,dec2),eps,zoneheight=5,chunksize=700))
+        z1 = np.concatenate([r[0] for r in res])
+        z2 = np.concatenate([r[1] for r in res])
+        srt = np.lexsort((z2,z1))
+        assert np.all(z1[srt] == i1) and np.all(z2[srt] == i2)
+        assert np.all(np.concatenate([r[2] for r in res]) <= eps)
+    finally:
+        shutil.rmtree(tmpdir)
+
+def test_match_coords_parallel():
+    """Check that parallel matching gives output identical to serial matching.
+    """
+    import numpy as np
+    from astropysics.coords.funcs import match_coords,match_nearest_coords,\
+                                         coordinate_kdtree
+
+    rng = np.random.RandomState(3)
+    ra1,dec1 = rng.uniform(0,360,5000),np.degrees(np.arcsin(rng.uniform(-1,1,5000)))
+    ra2,dec2 = rng.uniform(0,360,4000),np.degrees(np.arcsin(rng.uniform(-1,1,4000)))
+
+    for sph in (False,True):
+        ser = match_coords(ra1,dec1,ra2,dec2,1.5,'index',spherical=sph)
+        par = match_coords(ra1,dec1,ra2,dec2,1.5,'index',spherical=sph,nprocs=3)
+        assert len(ser[0])>0
+        assert np.all(ser[0] == par[0]) and np.all(ser[1] == par[1])
+
+        ser = match_nearest_coords((ra1,dec1),(ra2,dec2),2,spherical=sph)
+        par = match_nearest_coords((ra1,dec1),(ra2,dec2),2,spherical=sph,nprocs=3)
+        assert np.all(ser[0] == par[0]) and np.all(ser[1] == par[1])
+
+        #empty first set should give empty results, as for serial matching
+        e = np.array([])
+        par = match_nearest_coords((e,e),(ra2,dec2),spherical=sph,nprocs=2)
+        assert len(par[0])==0 and len(par[1])==0
+        par = match_coords(e,e,ra2,dec2,1.5,'index',spherical=sph,nprocs=2)
+        assert len(par[0])==0 and len(par[1])==0
+
+        #duplicate rows tie - the same index must be chosen as for serial
+        dra2,ddec2 = np.tile(ra2[:200],2),np.tile(dec2[:200],2)
+        ser = match_nearest_coords((ra1,dec1),(dra2,ddec2),spherical=sph)
+        par = match_nearest_coords((ra1,dec1),(dra2,ddec2),spherical=sph,nprocs=3)
+        assert np.all(ser[0] == par[0]) and np.all(ser[1] == par[1])
+        kdt = coordinate_kdtree((dra2,ddec2),sph)
+        par = match_nearest_coords((ra1,dec1),kdt,spherical=sph,nprocs=3)
+        assert np.all(ser[0] == par[0]) and np.all(ser[1] == par[1])
+
+def test_cosmo_dist_table():
+    """Check tabulated cosmological distances against direct integration.
+    """
+    import numpy as np
+    from astropysics.constants import choose_cosmology,get_cosmology
+    from astropysics.coords.funcs import cosmo_z_to_dist
+
+    oldcosmo = get_cosmology()
+    try:
+        choose_cosmology('wmap7baoh0')
+        z = np.array([0.001,0.03,0.2,0.5,1,2.5,10,1000,2e4])
+        for disttype in ('comoving','luminosity','angular','lookback','distmod'):
+            dq = cosmo_z_to_dist(z,disttype=disttype,inttol=1e-6,method='quad')
+            dt = cosmo_z_to_dist(z,disttype=disttype,inttol=1e-6,method='table')
+            assert np.all(np.abs(dt/dq-1) < 1e-6),disttype
+    finally:
+        choose_cosmology(oldcosmo)
+
+def test_cosmo_dist_to_z_array():
+    """Check the vectorized distance->redshift inversion, including both
+    branches of the angular diameter distance.
+    """
+    import numpy as np
+    from astropysics.constants import choose_cosmology,get_cosmology
+    from astropysics.coords.funcs import cosmo_z_to_dist,cosmo_dist_to_z
+
+    oldcosmo = get_cosmology()
+    try:
+        choose_cosmology('wmap7baoh0')
+        z = np.array([0.01,0.2,0.5,1,3,10])
+        for disttype in ('comoving','luminosity','lookback','distmod'):
+            d = cosmo_z_to_dist(z,disttype=disttype)
+            assert np.all(np.abs(cosmo_dist_to_z(d,disttype=disttype)-z) < 1e-6),disttype
+
+        d = cosmo_z_to_dist(z,disttype='angular')
+        zpeak = cosmo_dist_to_z(None,disttype='angular')
+        lo = cosmo_dist_to_z(d[z<zpeak],disttype='angular',branch='low')
+        hi = cosmo_dist_to_z(d[z>zpeak],disttype='angular',branch='high')
+        assert np.all(np.abs(lo-z[z<zpeak]) < 1e-6)
+        assert np.all(np.abs(hi-z[z>zpeak]) < 1e-6)
+
+        zd,zu,zl = cosmo_dist_to_z(np.array([500.,1000.]),derr=10)
+        assert np.all(zu > 0) and np.all(zl > 0)
+    finally:
+        choose_cosmology(oldcosmo)
+
+def test_cosmo_cache():
+    """Check that cosmological results are cached and invalidated on changes.
+    """
+    from astropysics.constants import choose_cosmology,get_cosmology,\
+                                      get_cosmology_cache
+    from astropysics.coords.funcs import cosmo_z_to_dist,cosmo_z_to_H
+    from astropysics.utils.gen import LRUCache
+
+    lru = LRUCache(2)
+    lru['a'] = 1
+    lru['b'] = 2
+    lru['a']
+    lru['c'] = 3
+    assert 'b' not in lru and 'a' in lru and 'c' in lru
+
+    oldcosmo = get_cosmology()
+    try:
+        choose_cosmology('wmap7baoh0')
+        d1 = cosmo_z_to_dist(0.5,disttype='angular',normed=True)
+        cache = get_cosmology_cache()
+        hits = cache.hits
+        assert cosmo_z_to_dist(0.5,disttype='angular',normed=True) == d1
+        assert cache.hits == hits + 1
+
+        c = choose_cosmology('wmap5',autoupdate=True)
+        assert len(get_cosmology_cache()) == 0
+        d5 = cosmo_z_to_dist(0.5,disttype='angular',normed=True)
+        assert d5 != d1
+
+        #normed=True and normed=1 are different normalizations
+        dtrue = cosmo_z_to_dist(0.5,disttype=2,normed=True)
+        done = cosmo_z_to_dist(0.5,disttype=2,normed=1)
+        assert dtrue != done
+        assert abs(done*cosmo_z_to_dist(1,disttype=2)/cosmo_z_to_dist(0.5,disttype=2) - 1) < 1e-12
+
+        c.H0 = 100
+        assert len(get_cosmology_cache()) == 0
+
+        #H(z) reads the live parameters, so must not be stale without autoupdate
+        c = choose_cosmology('wmap7baoh0',autoupdate=False)
+        H1 = cosmo_z_to_H(0.5)
+        c.H0 = 2*c.H0
+        assert abs(cosmo_z_to_H(0.5)/H1 - 2) < 1e-12
+    finally:
+        choose_cosmology(oldcosmo)
+
+def test_separation_matrix_blocks():
+    """Check that the separation matrix blocks tile the full matrix.
+    """
+    import numpy as np
+    from astropysics.coords.funcs import separation_matrix,separation_matrix_blocks
+
+    rng = np.random.RandomState(11)
+    v,w = rng.rand(53,2),rng.rand(37,2)
+
+    full = separation_matrix(v,w)
+    rebuilt = np.empty_like(full)
+    for rs,cs,A in separation_matrix_blocks(v,w,maxmem=1000):
+        assert A.nbytes <= 1000
+        rebuilt[rs,cs] = A
+    assert np.all(rebuilt == full)
+
+    full = np.sum(separation_matrix(v)**2,axis=-1)**0.5
+    rebuilt = np.zeros_like(full)
+    for rs,cs,A in separation_matrix_blocks(v,tri=True,maxmem=1000,norm=True):
+        rebuilt[rs,cs] = A
+    assert np.allclose(rebuilt,np.triu(full))
+
+def test_coordinate_array():
+    """Check CoordinateArray conversions against per-object conversions.
+    """
+    import numpy as np
+    from astropysics.coords import CoordinateArray,FK5Coordinates,\
+         ICRSCoordinates,FK4Coordinates,GalacticCoordinates,\
+         SupergalacticCoordinates,ITRSCoordinates
+
+    rng = np.random.RandomState(3)
+    long,lat = rng.rand(25)*360,rng.rand(25)*180-90
+
+    for fromsys,tosys,epoch in [(FK5Coordinates,GalacticCoordinates,2010),
+                                (ICRSCoordinates,FK4Coordinates,None),
+                                (GalacticCoordinates,SupergalacticCoordinates,None),
+                                (ICRSCoordinates,ITRSCoordinates,2012)]:
+        ca = CoordinateArray(fromsys,long,lat,epoch=epoch)
+        res = ca.convert(tosys)
+        objs = [o.convert(tosys) for o in ca]
+
+        assert res.coordclass is tosys
+        assert res.epoch == objs[0].epoch
+        assert np.allclose(res.long,[o.long.d for o in objs],rtol=0,atol=1e-9)
+        assert np.allclose(res.lat,[o.lat.d for o in objs],rtol=0,atol=1e-9)
+
+    ca = CoordinateArray(FK5Coordinates,long,lat,1e-3,2e-3,distancepc=100)
+    assert np.all(ca.dec == lat) and ca.decerr.shape == lat.shape
+    rt = ca.convert(GalacticCoordinates).convert(FK5Coordinates)
+    assert np.allclose(rt.lat,lat) and np.all(rt.laterr > 0)
+    assert np.all(rt.distancepc == 100)
+    assert len(ca[::5]) == 5 and ca[3].distancepc[0] == 100
+
+def test_transform_plan_cache():
+    """Check that transform plans are memoized and invalidated.
+    """
+    from astropysics.coords import CoordinateSystem,FK4Coordinates,\
+         GalacticCoordinates,SupergalacticCoordinates,ICRSCoordinates
+
+    CoordinateSystem._invalidateTransformCache()
+    stats0 = CoordinateSystem.getTransformPlanStats()
+    assert stats0['size'] == 0
+
+    path,convs = CoordinateSystem.getTransformPlan(ICRSCoordinates,SupergalacticCoordinates)
+    assert path[0] is ICRSCoordinates and path[-1] is SupergalacticCoordinates
+    assert len(convs) == len(path)-1
+    assert CoordinateSystem.getTransformPath(ICRSCoordinates,SupergalacticCoordinates) == list(path)
+
+    stats1 = CoordinateSystem.getTransformPlanStats()
+    assert stats1['misses'] == stats0['misses']+1
+    assert stats1['hits'] == stats0['hits']+1
+
+    s = ICRSCoordinates(10,20).convert(SupergalacticCoordinates)
+    assert CoordinateSystem.getTransformPlanStats()['hits'] == stats1['hits']+1
+
+    #deleting a transform must invalidate the plans that used it
+    f = CoordinateSystem.getTransform(FK4Coordinates,GalacticCoordinates)
+    CoordinateSystem.delTransform(FK4Coordinates,GalacticCoordinates)
+    try:
+        stats2 = CoordinateSystem.getTransformPlanStats()
+        assert stats2['size'] == 0
+        assert stats2['invalidations'] == stats1['invalidations']+1
+        path,convs = CoordinateSystem.getTransformPlan(FK4Coordinates,GalacticCoordinates)
+        assert len(path) > 2
+    finally:
+        CoordinateSystem.registerTransform(FK4Coordinates,GalacticCoordinates,
+                                           f.basetrans,transtype='smatrix',
+                                           depends=f.depends)
+    path,convs = CoordinateSystem.getTransformPlan(FK4Coordinates,GalacticCoordinates)
+    assert path == (FK4Coordinates,GalacticCoordinates)
+
+def test_convert_optimize():
+    """Check composed/cached smatrix conversions against stepwise conversion.
+    """
+    from astropysics.coords import CoordinateSystem,FK4Coordinates,\
+         GalacticCoordinates,SupergalacticCoordinates,ITRSCoordinates,\
+         ICRSCoordinates
+
+    def check(c,tosys):
+        c1 = c.convert(tosys)
+        c2 = c.convert(tosys,optimize=False)
+        assert abs(c1.lat.d-c2.lat.d) < 1e-9
+        assert abs(c1.long.d-c2.long.d) < 1e-9
+        assert c1.epoch == c2.epoch
+
+    CoordinateSystem._invalidateTransformCache()
+    for epoch in (1950,1960,1975.5):
+        check(FK4Coordinates(123.4,-56.7,epoch=epoch),SupergalacticCoordinates)
+    cache = CoordinateSystem._transformcache['smatrix']
+    assert len(cache) == 3
+
+    #constant transforms are cached independent of epoch
+    check(SupergalacticCoordinates(12,34,epoch=1990),GalacticCoordinates)
+    check(SupergalacticCoordinates(12,34,epoch=2010),GalacticCoordinates)
+    assert len(cache) == 4
+
+    #changing class-level transform parameters clears the cache
+    check(ICRSCoordinates(45,45,epoch=2010),ITRSCoordinates)
+    ITRSCoordinates.polarmotion = (1e-6,2e-6)
+    try:
+        assert len(CoordinateSystem._transformcache) == 0
+        check(ICRSCoordinates(45,45,epoch=2010),ITRSCoordinates)
+    finally:
+        ITRSCoordinates.polarmotion = None
+
+def test_epoch_cache():
+    """Check the epoch-quantized precession/nutation caches.
+    """
+    import numpy as np
+    from astropysics.coords import coordsys,ICRSCoordinates,CIRSCoordinates,\
+         EquatorialCoordinatesEquinox
+
+    try:
+        coordsys.set_epoch_cache(tolerance=0)
+        P1 = coordsys._precession_matrix_J2000_Capitaine(2012.5)
+        P2 = coordsys._precession_matrix_J2000_Capitaine(2012.5)
+        assert P1 is P2
+        assert coordsys.get_epoch_cache('_precession_matrix_J2000_Capitaine').hits == 1
+
+        for epoch in (2010.25,2010.25,2011):
+            c = ICRSCoordinates(20,30,epoch=epoch)
+            c.convert(CIRSCoordinates,optimize=False)
+            c.convert(EquatorialCoordinatesEquinox,optimize=False)
+        assert len(coordsys.get_epoch_cache('_nutation_matrix')) == 2
+        assert len(coordsys.get_epoch_cache('_CIOLocator')) == 2
+        assert coordsys.get_epoch_cache('_CMatrix').hits >= 1
+
+        #nearby epochs share matricies if the tolerance is set
+        coordsys.set_epoch_cache(tolerance=1e-3)
+        N1 = coordsys._nutation_matrix(2010.2503)
+        N2 = coordsys._nutation_matrix(2010.2498)
+        assert N1 is N2
+        assert np.allclose(N1,coordsys._nutation_matrix(2010.25),rtol=0,atol=1e-14)
+        assert not N1.flags.writeable
+    finally:
+        coordsys.set_epoch_cache(tolerance=0)
+
+def test_nutation_arrays():
+    """Check array evaluation of the nutation and CIO locator series.
+    """
+    import numpy as np
+    from astropysics.coords import coordsys
+
+    #SOFA reference values for 2006/2000A and 2000B at MJD 53736
+    jd = 2400000.5 + 53736.0
+    eps,dpsi,deps = coordsys._nutation_components20062000A(jd,False)
+    assert abs(dpsi - -0.9630912025820308797e-5) < 1e-13
+    assert abs(deps - 0.4063238496887249798e-4) < 1e-13
+    eps,dpsi,deps = coordsys._nutation_components2000B(jd,False)
+    assert abs(dpsi - -0.9632552291148362783e-5) < 1e-13
+    assert abs(deps - 0.4063197106621159367e-4) < 1e-13
+
+    #array results match the scalar ones, independent of chunking
+    epochs = np.linspace(1995,2025,7)
+    for f in (coordsys._nutation_components20062000A,
+              coordsys._nutation_components2000B):
+        arrres = f(epochs,maxmem=10000)
+        for i,epoch in enumerate(epochs):
+            for a,b in zip(arrres,f(epoch)):
+                assert abs(a[i]-b) < 1e-15
+
+    s = coordsys.CIRSCoordinates._CIOLocator(epochs)
+    C = coordsys.CIRSCoordinates._CMatrix(epochs)
+    assert C.shape == (7,3,3)
+    for i,epoch in enumerate(epochs):
+        assert abs(s[i]-coordsys.CIRSCoordinates._CIOLocator(epoch)) < 1e-15
+        assert np.allclose(C[i],coordsys.CIRSCoordinates._CMatrix(epoch),rtol=0,atol=1e-15)
+
+def test_package_data_cache():
+    """Check that parsed data tables are cached as binary files.
+    """
+    import os
+    import numpy as np
+    from astropysics.utils.io import get_package_data_arrays
+    from astropysics.coords import coordsys
+
+    ncalls = []
+    def parser(content):
+        ncalls.append(1)
+        return {'nlines':np.array([len(content.split('\n'))])}
+
+    #unique version so that the test always starts without a cache file
+    version = os.getpid()
+    res1 = get_package_data_arrays('iau00b_nutation.tab',parser,version)
+    res2 = get_package_data_arrays('iau00b_nutation.tab',parser,version)
+    assert res1['nlines'][0] == res2['nlines'][0]
+    assert len(ncalls) == 1
+
+    from astropysics.config import get_data_dir
+    cachedir = os.path.join(get_data_dir(),'pkgcache')
+    for fn in os.listdir(cachedir):
+        if fn.endswith('-%i.npz'%version):
+            os.remove(os.path.join(cachedir,fn))
+
+    dat = coordsys._get_nutation_data('00b')
+    assert dat is coordsys._get_nutation_data('00b')
+    assert isinstance(dat,np.recarray) and dat.nl.dtype.kind == 'i'
+
+def test_matrix_rotate_arrays():
+    """Check vectorized rotation with errors and per-position epochs.
+    """
+    import numpy as np
+    from astropysics.coords import CoordinateArray,FK5Coordinates, \
+                                   GalacticCoordinates,ICRSCoordinates
+    from astropysics.coords.coordsys import matrix_rotate_arrays
+
+    #scalar rotation with errors uses the same kernel and leaves the source alone
+    c = FK5Coordinates(10,20,raerr=0.01,decerr=0.02)
+    g = c.convert(GalacticCoordinates)
+    assert g.laterr.d > 0 and g.longerr.d > 0
+    assert c.raerr.d == 0.01 and c.decerr.d == 0.02
+
+    np.random.seed(3)
+    n = 50
+    ra = np.random.uniform(0,360,n)
+    dec = np.random.uniform(-80,80,n)
+    ep = np.random.choice([1980.,2000.,2015.5],n)
+    ca = CoordinateArray(FK5Coordinates,ra,dec,0.01,0.02,epoch=ep)
+    for tosys in (GalacticCoordinates,ICRSCoordinates):
+        res = ca.convert(tosys)
+        ref = CoordinateArray.fromObjects([o.convert(tosys) for o in ca],tosys)
+        assert np.allclose(res.lat,ref.lat,atol=1e-10)
+        assert np.allclose(res.long,ref.long,atol=1e-10)
+        assert np.allclose(res.laterr,ref.laterr,atol=1e-12)
+        assert np.allclose(res.longerr,ref.longerr,atol=1e-12)
+    assert np.all(CoordinateArray.fromObjects(list(ca)).epoch == ep)
+
+    #a stack of identical matricies is the same as the single matrix
+    m = FK5Coordinates._toICRS(FK5Coordinates(0,0,epoch=1950))
+    lat,long = np.radians(dec),np.radians(ra)
+    res1 = matrix_rotate_arrays(m,lat,long,1e-5,1e-5)
+    res2 = matrix_rotate_arrays(np.array([m]*n),lat,long,1e-5,1e-5)
+    for a1,a2 in zip(res1,res2):
+        assert np.allclose(a1,a2)
+    try:
+        matrix_rotate_arrays(np.eye(2),lat,long)
+        assert False,'bad matrix shape should raise ValueError'
+    except ValueError:
+        pass
+
+def test_sexagesimal_bulk():
+    """Check the bulk sexagesimal parser against AngularCoordinate.
+    """
+    import numpy as np
+    from astropysics.coords import AngularCoordinate,sexagesimal_to_decimal, \
+                                   radec_str_to_decimal,iter_radec_str_to_decimal
+
+    strs = ['12:30:15.2','-12 30 15.2','+12:30:15.2','12h30m15.2s',
+            "+12d30'15.2\"",'12.5','-3.25','12h30m','2.5h','1.2rads','3.5hours',
+            ' 12:30:15 ','12 30 15s','.5','1.2.3','12:30:15s','x','']
+    for hms in (None,True,False):
+        degs,invalid = sexagesimal_to_decimal(np.array(strs),hms)
+        for s,d,inv in zip(strs,degs,invalid):
+            try:
+                ref = AngularCoordinate(s,sghms=hms).degrees if s else None
+            except ValueError:
+                ref = None
+            if ref is None:
+                assert inv and np.isnan(d),s
+            else:
+                assert not inv and abs(d-ref)<1e-10,s
+
+    ras,decs = radec_str_to_decimal(['17:43:54.23','1:00:00'],['+32:23:12.3','-1:30:00'])
+    ras2,decs2 = radec_str_to_decimal('17:43:54.23 +32:23:12.3\n1:00:00 -1:30:00')
+    assert np.all(ras==ras2) and np.all(decs==decs2)
+    assert np.allclose(decs,(32.38675,-1.5))
+    try:
+        radec_str_to_decimal(['1:00:00','bad'],['+1:00:00','+2:00:00'])
+        assert False,'invalid row should raise ValueError'
+    except ValueError:
+        pass
+
+    lines = ['1:00:00 +1:00:00','bad +2:00:00','3:00:00 -3:00:00']
+    chunks = list(iter_radec_str_to_decimal(iter(lines),chunksize=2))
+    assert [len(c[0]) for c in chunks] == [2,1]
+    assert np.all(np.concatenate([c[2] for c in chunks]) == [False,True,False])
+
+def test_sexagesimal_format():
+    """Check bulk sexagesimal formatting and fixed-column output.
+    """
+    import os
+    import tempfile
+    import numpy as np
+    from astropysics.coords import AngularCoordinate,decimal_to_dms_str, \
+                                   decimal_to_hms_str,radec_str_to_decimal
+    from astropysics.utils.io import FixedColumnDataParser
+
+    np.random.seed(5)
+    decs = np.random.uniform(-89,89,200)
+    ras = np.random.uniform(0,359,200)
+    dstrs = decimal_to_dms_str(decs,canonical=True)
+    hstrs = decimal_to_hms_str(ras,canonical=True)
+    assert dstrs.dtype == np.dtype('S12') and hstrs.dtype == np.dtype('S12')
+    for d,ds in zip(decs[:20],dstrs[:20]):
+        ref = AngularCoordinate(d).getDmsStr(canonical=True)
+        assert ds == ref or ref.endswith('60.00'),(ds,ref)
+    ras2,decs2 = radec_str_to_decimal(hstrs,dstrs)
+    assert np.all(np.abs(ras2-ras)<0.001/240) and np.all(np.abs(decs2-decs)<0.01/3600)
+
+    assert decimal_to_dms_str(59.999999,secprec=1) == '+60:00:00.0'
+    assert decimal_to_dms_str(1.5,sep=(u'\xb0',"'",'"'),unicode=True) == u'+01\xb030\'00.00"'
+    assert decimal_to_hms_str([np.nan])[0].strip() == ''
+    #rounding carries wrap at 24h, and values rounding to 0 are not negative
+    assert decimal_to_hms_str(359.99999999) == '00:00:00.000'
+    assert decimal_to_hms_str(-1e-12) == '00:00:00.000'
+    assert decimal_to_dms_str(-1e-12) == '+00:00:00.00'
+
+    data = np.rec.fromarrays([np.arange(3),ras[:3],decs[:3]],names='id,ra,dec')
+    p = FixedColumnDataParser()
+    p.addColumn('id',1,3,data.dtype['id'])
+    p.addColumn('ra',5,16)
+    p.addColumn('dec',18,29)
+    fd,fn = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        p.writeFile(fn,data,formatters={'ra':'hms','dec':'dms'})
+        p2 = FixedColumnDataParser()
+        assert p2.addColumnsFromFile(fn,columnlinestart='# ',maxcols=3) == 3
+        res,masks = p2.parseFile(fn)
+    finally:
+        os.remove(fn)
+    assert np.all(res.id == data.id)
+    assert np.all(res.ra == hstrs[:3]) and np.all(res.dec == dstrs[:3])
+
+def test_convert_time_series():
+    """Check batched ICRS/GCRS/CIRS/ITRS conversion over a series of times.
+    """
+    import numpy as np
+    from astropysics.coords import CoordinateArray,ICRSCoordinates, \
+                                   GCRSCoordinates,CIRSCoordinates,ITRSCoordinates
+    from astropysics.coords.coordsys import convert_time_series
+
+    np.random.seed(7)
+    ra = np.random.uniform(0,360,4)
+    dec = np.random.uniform(-80,80,4)
+    epochs = [2010.3,2010.3001,2015.7]
+    ca = CoordinateArray(ICRSCoordinates,ra,dec)
+
+    long,lat = convert_time_series(ca,epochs,ITRSCoordinates,aberration=False)
+    assert long.shape == (4,3)
+    for i in range(4):
+        for j,ep in enumerate(epochs):
+            c = ICRSCoordinates(ra[i],dec[i],epoch=ep).convert(GCRSCoordinates)
+            c = c.convert(CIRSCoordinates).convert(ITRSCoordinates)
+            assert abs((c.long.d-long[i,j]+180)%360-180) < 1e-9
+            assert abs(c.lat.d-lat[i,j]) < 1e-9
+
+    #aberration is at most ~20.5 arcsec and is undone going back to ICRS
+    gl,gb = convert_time_series(ca,epochs,GCRSCoordinates)
+    gl0,gb0 = convert_time_series(ca,epochs,GCRSCoordinates,aberration=False)
+    dl = (gl-gl0)*np.cos(np.radians(gb0))
+    assert np.all(np.hypot(dl,gb-gb0)*3600 < 20.6)
+    back = CoordinateArray(GCRSCoordinates,gl[:,0],gb[:,0])
+    bl,bb = convert_time_series(back,epochs[0],ICRSCoordinates)
+    assert np.allclose(bl[:,0],ra,atol=1e-9) and np.allclose(bb[:,0],dec,atol=1e-9)
+
+def test_coordinate_structured_arrays():
+    """Check CoordinateArray round trips through structured arrays.
+    """
+    import numpy as np
+    from astropysics.coords import CoordinateArray,FK5Coordinates, \
+                                   GalacticCoordinates,objects_to_coordinate_arrays
+
+    ca = CoordinateArray(FK5Coordinates,[10,20,30],[-5,5,15],0.1,0.2,
+                         epoch=[2000,2010,2010],distancepc=[10,np.inf,3])
+    arr = ca.toStructuredArray()
+    assert arr.dtype.names == ('ra','dec','raerr','decerr','distancepc','epoch')
+
+    rt = CoordinateArray.fromStructuredArray(arr.view(np.recarray),FK5Coordinates)
+    for a in ('ra','dec','raerr','decerr','distancepc','epoch'):
+        assert np.all(getattr(rt,a) == getattr(ca,a)),a
+    #fields are used as views unless a copy is requested
+    assert np.may_share_memory(rt.ra,arr)
+    cp = CoordinateArray.fromStructuredArray(arr,FK5Coordinates,copy=True)
+    assert not np.may_share_memory(cp.ra,arr)
+
+    gal = CoordinateArray.fromStructuredArray(arr,FK5Coordinates).convert(GalacticCoordinates)
+    garr = gal.toStructuredArray({'long':'glon','lat':'glat'})
+    assert 'glon' in garr.dtype.names and 'berr' in garr.dtype.names
+    assert np.all(garr['glon'] == gal.l)
+
+    assert np.allclose(objects_to_coordinate_arrays(ca),objects_to_coordinate_arrays(list(ca)))
+    assert np.allclose(objects_to_coordinate_arrays(gal),objects_to_coordinate_arrays(list(gal)))
+    try:
+        CoordinateArray.fromStructuredArray(garr,GalacticCoordinates)
+        assert False,'missing longitude field should raise ValueError'
+    except ValueError:
+        pass
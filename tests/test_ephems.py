@@ -5593,4 +5593,219 @@ def test_radec():
 #        assert (ec.ra-hc.ra).arcsec<140,'RA diff too large for Jupiter:%g arcsec'%(ec.ra-hc.ra).arcsec
 #        assert (ec.dec-hc.dec).arcsec<60,'Dec diff too large for Jupiter:%g arcsec'%(ec.ra-hc.ra).arcsec
 
-    return dict(dras),dict(ddecs)
\ No newline at end of file
+    return dict(dras),dict(ddecs)
+
+
+def test_positions():
+    """
+    Test that array positions match the coordinates from calling the objects.
+    """
+    from astropysics.coords import CoordinateArray,GCRSCoordinates
+    
+    jds = np.linspace(2451000,2456000,25)
+    
+    for n in ('Mars','Moon','Earth'):
+        obj = ephems.get_solar_system_ephems(n)
+        jd0 = obj.jd
+        x,y,z = obj.positions(jds)
+        assert obj.jd==jd0,'positions changed jd for %s'%n
+        cs = obj(jds)
+        assert np.allclose(x,[c.x for c in cs],rtol=0,atol=1e-12),'x mismatch for '+n
+        assert np.allclose(y,[c.y for c in cs],rtol=0,atol=1e-12),'y mismatch for '+n
+        assert np.allclose(z,[c.z for c in cs],rtol=0,atol=1e-12),'z mismatch for '+n
+        
+    ca = ephems.get_solar_system_ephems('Mars').positions(jds,coordarray=True)
+    assert isinstance(ca,CoordinateArray)
+    assert ca.coordclass is GCRSCoordinates
+    c = ephems.get_solar_system_ephems('Mars',jds[7],GCRSCoordinates)
+    assert_almost_equal(ca[7].ra.d,c.ra.d,10)
+    assert_almost_equal(ca[7].dec.d,c.dec.d,10)
+    assert_almost_equal(ca[7].distanceau[0],c.distanceau[0],10)
+    
+    pm = ephems.ProperMotionObject('pmtest',10,20,dra=100,ddec=-50,distpc0=10,rv=30)
+    ra,dec = pm.positions(jds)
+    cs = pm(jds)
+    assert np.allclose(ra,[c.ra.d for c in cs])
+    assert np.allclose(dec,[c.dec.d for c in cs])
+    ca = pm.positions(jds,True)
+    assert np.allclose(ca.distancepc,[c.distancepc[0] for c in cs])
+
+def test_kepler_solver():
+    """
+    Test the vectorized Kepler's equation solver, including high eccentricity.
+    """
+    rs = np.random.RandomState(42)
+    M = rs.uniform(-np.pi,np.pi,2000)
+    e = np.concatenate((rs.uniform(0,1,1000),1-10**rs.uniform(-9,-1,1000)))
+    
+    E = ephems._kepler_eccentric_anomaly(M,e)
+    assert E.shape==M.shape
+    assert np.max(np.abs(E - e*np.sin(E) - M))<1e-12,'Kepler solution too inaccurate'
+    
+    E = ephems._kepler_eccentric_anomaly(M,e,Etol=1e-4)
+    assert np.max(np.abs(E - e*np.sin(E) - M))<1e-4
+    
+    E = ephems._kepler_eccentric_anomaly(0.3,0.5)
+    assert E.shape==()
+    assert_almost_equal(E - 0.5*np.sin(E),0.3,12)
+    
+    try:
+        ephems._kepler_eccentric_anomaly(M,1.2)
+        assert False,'hyperbolic eccentricity did not raise ValueError'
+    except ValueError:
+        pass
+    
+    mars = ephems.get_solar_system_ephems('Mars')
+    M = np.radians((mars.M + 180)%360 - 180)
+    E = np.radians(mars.E)
+    assert abs((E - mars.e*np.sin(E) - M + np.pi)%(2*np.pi) - np.pi)<1e-12
+
+def test_keplerian_ensemble():
+    """
+    Test batch propagation of many Keplerian bodies against KeplerianObject.
+    """
+    from astropysics.coords import GCRSCoordinates
+    
+    #JPL approximate planet elements as polynomial coefficient arrays
+    names = sorted(ephems._shortelems.keys())
+    oes = np.array([ephems._shortelems[n] for n in names])
+    kw = dict([(nm,oes[:,:,i]) for i,nm in enumerate(('a','e','i','L','Lp','Lan'))])
+    ens = ephems.KeplerianEnsemble(names=names,**kw)
+    assert len(ens)==len(names)
+    
+    jds = np.linspace(2451000,2455000,9)
+    x,y,z = ens.positions(jds,geocentric=True)
+    assert x.shape==(len(names),jds.size)
+    for j,n in enumerate(names):
+        cs = ephems.get_solar_system_ephems(n,jds)
+        assert np.allclose(x[j],[c.x for c in cs],rtol=0,atol=1e-10),'x mismatch for '+n
+        assert np.allclose(y[j],[c.y for c in cs],rtol=0,atol=1e-10),'y mismatch for '+n
+        assert np.allclose(z[j],[c.z for c in cs],rtol=0,atol=1e-10),'z mismatch for '+n
+    
+    #MPC-style osculating elements for Ceres, epoch 2010-Jul-23
+    a,e,i,Lan,ap,M0,epoch = 2.7653485,0.07913825,10.58682,80.39320,72.58981,113.41039,2455400.5
+    ceres = ephems.KeplerianEnsemble(a=[a],e=[e],i=[i],Lan=[Lan],ap=[ap],M=[M0],
+                                     epoch=epoch,names=['Ceres'])
+    x,y,z = ceres.positions(epoch)
+    assert x.shape==(1,)
+    
+    #independent two-body propagation away from the epoch
+    dts = np.array([0,100,400,-250])
+    x,y,z = ceres.positions(epoch+dts)
+    n = np.degrees(0.01720209895)/a**1.5 #deg/day
+    M = np.radians(M0 + n*dts)
+    E = M.copy()
+    for j in range(100): #fixed-point iteration, converges for small e
+        E = M + e*np.sin(E)
+    r = a*(1-e*np.cos(E))
+    nu = 2*np.arctan2((1+e)**0.5*np.sin(E/2),(1-e)**0.5*np.cos(E/2))
+    u = np.radians(ap) + nu
+    o,inc = np.radians(Lan),np.radians(i)
+    xe = r*(np.cos(o)*np.cos(u) - np.sin(o)*np.sin(u)*np.cos(inc))
+    ye = r*(np.sin(o)*np.cos(u) + np.cos(o)*np.sin(u)*np.cos(inc))
+    ze = r*np.sin(u)*np.sin(inc)
+    eps = np.radians(23.43928)
+    assert np.allclose(x[0],xe,rtol=0,atol=1e-9)
+    assert np.allclose(y[0],np.cos(eps)*ye - np.sin(eps)*ze,rtol=0,atol=1e-9)
+    assert np.allclose(z[0],np.sin(eps)*ye + np.cos(eps)*ze,rtol=0,atol=1e-9)
+    assert np.allclose((x[0]**2+y[0]**2+z[0]**2)**0.5,r,rtol=0,atol=1e-9)
+    assert abs(r[1]-r[0])>0.05 #actually moves along the orbit
+    
+    c = ceres.positions(2455197.5,geocentric=True,coordarray=True)[0]
+    assert isinstance(c,GCRSCoordinates)
+    try:
+        ceres.positions(2455197.5,coordarray=True)
+        assert False,'heliocentric CoordinateArray did not raise ValueError'
+    except ValueError:
+        pass
+    
+    obj = ceres.getObject(0)
+    assert obj.name=='Ceres'
+    co = obj(2455197.5,GCRSCoordinates)
+    assert_almost_equal(co.ra.d,c.ra.d,8)
+    assert_almost_equal(co.dec.d,c.dec.d,8)
+
+def test_earth_pos_vel_array():
+    """
+    Test array-mode earth_pos_vel against scalar evaluation.
+    """
+    jds = np.linspace(2420000,2480000,137)
+    
+    for bary in (False,True):
+        pos,vel = ephems.earth_pos_vel(jds,bary)
+        assert pos.shape==(jds.size,3) and vel.shape==(jds.size,3)
+        #small chunks should give the same result
+        pos2,vel2 = ephems.earth_pos_vel(jds,bary,maxmem=20000)
+        assert np.all(pos==pos2) and np.all(vel==vel2)
+        for i in (0,50,136):
+            p,v = ephems.earth_pos_vel(jds[i],bary)
+            assert p.shape==(3,)
+            assert np.allclose(pos[i],p,rtol=0,atol=1e-14)
+            assert np.allclose(vel[i],v,rtol=0,atol=1e-11)
+    
+    vels = ephems.Earth().getVelocity(jds,kms=False)
+    assert np.allclose(vels,ephems.earth_pos_vel(jds,True,False)[1])
+
+def test_chebyshev_ephemeris():
+    """
+    Test Chebyshev polynomial fits of ephemerides and their file cache.
+    """
+    import os,tempfile,shutil,warnings
+    from astropysics.coords import GCRSCoordinates
+    
+    jdrange = (2455197.5,2455562.5) #2010
+    jds = np.random.RandomState(3).uniform(jdrange[0],jdrange[1],500)
+    
+    moon = ephems.Moon()
+    cmoon = ephems.ChebyshevEphemeris(moon,jdrange,tol=1e-10)
+    assert cmoon.name=='Moon'
+    assert np.max(np.abs(np.array(cmoon.positions(jds)) - moon.positions(jds)))<1e-10
+    c,cc = moon(jds[5]),cmoon(jds[5])
+    assert isinstance(cc,c.__class__)
+    assert_almost_equal(c.epoch,cc.epoch,10)
+    assert_almost_equal(c.x,cc.x,10)
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore',ephems.EphemerisAccuracyWarning)
+        try:
+            cmoon.positions(jdrange[1]+1)
+            assert False,'JD outside fit range did not raise ValueError'
+        except ValueError:
+            pass
+    
+    pm = ephems.ProperMotionObject('pmtest',10,20,dra=100,ddec=-50,distpc0=10,rv=30)
+    cpm = ephems.ChebyshevEphemeris(pm,jdrange,tol=1e-12)
+    assert np.allclose(cpm.positions(jds),pm.positions(jds),rtol=0,atol=1e-9)
+    assert_almost_equal(cpm(jds[0]).distancepc[0],pm(jds[0]).distancepc[0],9)
+    
+    tmpdir = tempfile.mkdtemp()
+    try:
+        fn = os.path.join(tmpdir,'moon.npz')
+        cmoon.save(fn)
+        lmoon = ephems.ChebyshevEphemeris.load(fn)
+        assert lmoon.name=='Moon' and lmoon.validjdrange==jdrange
+        assert np.all(np.array(lmoon.positions(jds))==cmoon.positions(jds))
+        
+        ephems.set_solar_system_ephem_method('chebyshev',jdrange,1e-8,tmpdir)
+        assert os.path.exists(os.path.join(tmpdir,'Mars-%.1f-%.1f-1e-08.npz'%jdrange))
+        ephems.set_solar_system_ephem_method('chebyshev',jdrange,1e-8,tmpdir)
+        mars = ephems.get_solar_system_ephems('Mars')
+        assert isinstance(mars,ephems.ChebyshevEphemeris)
+        cmars = ephems.get_solar_system_ephems('Mars',jds[:3],GCRSCoordinates)
+        
+        #velocities come from the derivative of the fit
+        earth = ephems.get_solar_system_ephems('Earth')
+        assert isinstance(earth,ephems.ChebyshevEphemeris)
+        v = earth.getVelocity(jds[0])
+        assert v.shape==(3,)
+        assert np.allclose(v,ephems.earth_pos_vel(jds[0],True)[1],rtol=0,atol=1e-3)
+        vs = earth.getVelocity(jds[:10],kms=False)
+        assert np.allclose(vs,ephems.earth_pos_vel(jds[:10],True,False)[1],rtol=0,atol=1e-4)
+    finally:
+        ephems.set_solar_system_ephem_method()
+        shutil.rmtree(tmpdir)
+        
+    kmars = ephems.get_solar_system_ephems('Mars',jds[:3],GCRSCoordinates)
+    for c1,c2 in zip(cmars,kmars):
+        assert abs((c1.ra-c2.ra).arcsec)<0.01
+        assert abs((c1.dec-c2.dec).arcsec)<0.01